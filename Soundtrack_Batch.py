@@ -0,0 +1,232 @@
+# script to scrape & build playlists for many shows / seasons / films from a manifest file
+# usage: python Soundtrack_Batch.py manifest.csv [--workers 2] [--scrape-only] [--max-age 24] [--report report.json]
+#
+# manifest.csv columns: kind,title,season,year   eg  tv,Game of Thrones,1,
+#                                                     tv,Game of Thrones,all,     (every season, one combined playlist)
+#                                                     tv,The Wire,2-4,            (a season range)
+#                                                     film,The Hangover,,2009
+# manifest.json: [{"kind": "tv", "title": "Game of Thrones", "season": 1}, {"kind": "film", "title": "The Hangover", "year": "2009"}]
+
+
+# Soundtrack_Batch.py
+"""
+Batch runs for nightly bulk scrapes & builds.
+Every manifest entry becomes a Media descriptor; entries are scheduled across a worker pool that
+shares one warm browser pool and one Spotify client. An entry scraped (and built) within
+--max-age hours is skipped, using a record kept in the scrape cache file. A series with some
+seasons failed is reported as "partial" and not recorded, so the next run retries it. One JSON
+report with per-item status, timings & errors is written at the end.
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from Soundtrack_Media import Media
+from Soundtrack_Cache import SQLiteCache, scrape_soundtrack_tv_cached, scrape_soundtrack_tv_series_cached, scrape_soundtrack_film_cached
+import Soundtrack_Browser_Pool
+import Soundtrack_Builder
+import Soundtrack_Metrics
+
+
+def parse_entry(entry):
+    """
+    Turns one manifest row / object into a Media descriptor.
+
+    :param entry: dict with kind, title & season (tv) or year (film)
+    :return: Media
+    :raises ValueError: if the entry is incomplete
+    """
+    kind = str(entry.get("kind") or "").strip().lower()
+    title = str(entry.get("title") or "").strip()
+    if not title:
+        raise ValueError(f"Manifest entry without a title: {entry}")
+    if kind in ("tv", "show"):
+        season = str(entry.get("season") or "").strip().lower()
+        if season == "all":
+            return Media.series(title)
+        first, _, last = season.partition('-')
+        if first.strip().isdigit() and last.strip().isdigit():
+            return Media.series(title, int(first), int(last))
+        if not season.isdigit():
+            raise ValueError(f"Manifest entry for '{title}' needs a season number, range (eg 2-4) or 'all'")
+        return Media.tv(title, int(season))
+    if kind in ("film", "movie"):
+        return Media.film(title, str(entry.get("year") or "").strip())
+    raise ValueError(f"Manifest entry for '{title}' has unknown kind '{kind}' (use tv or film)")
+
+
+def load_manifest(path):
+    """
+    Reads a CSV or JSON manifest.
+
+    :param path: manifest file (.csv or .json)
+    :return: list of Media, in manifest order, without duplicates
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        entries = json.loads(path.read_text(encoding="utf-8"))
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            entries = [row for row in csv.DictReader(f) if any((v or "").strip() for v in row.values())]
+
+    media = {}
+    for entry in entries:
+        item = parse_entry(entry)
+        media.setdefault(item.key, item)
+    return list(media.values())
+
+
+def get_batch_state(max_age_hours):
+    """
+    Record of finished batch items; an entry is "fresh" (up to date) for max_age_hours.
+    Stored in the scrape cache file (SCRAPE_CACHE_PATH), table "batch".
+    """
+    return SQLiteCache(
+        os.getenv("SCRAPE_CACHE_PATH", "scrape_cache.sqlite3"),
+        table="batch", ttl=int(max_age_hours * 3600), stale_ttl=0, max_entries=10000
+    )
+
+
+def run_item(media, pool, sp, state, build=True, force=False):
+    """
+    Scrapes (and builds) one manifest entry.
+
+    :return: report dict (title, status: done / partial / skipped / failed, timings, tracks, playlist url / error)
+    """
+    report = {"key": media.key, "name": media.playlist_name, "kind": media.kind, "title": media.title,
+              "season": media.season_num, "last_season": media.last_season, "year": media.year, "timings": {}}
+
+    record, freshness = state.get(media.key)
+    if not force and freshness == "fresh" and (record.get("built") or not build):
+        report.update(status="skipped", tracks=record.get("tracks"), playlist_url=record.get("playlist_url"))
+        print(f"⏭️ {media.playlist_name}: up to date")
+        return report
+
+    # stale scrapes are re-scraped before building (a background refresh would die with the process)
+    cache_options = {"serve_stale": False, "force": force}
+    try:
+        started = time.perf_counter()
+        if media.kind == "tv":
+            playlist = scrape_soundtrack_tv_cached(media.title, media.season_num, pool=pool, **cache_options)
+        elif media.kind == "series":
+            seasons = None if media.season_num is None else range(media.season_num, media.last_season + 1)
+            result = scrape_soundtrack_tv_series_cached(media.title, seasons, pool=pool, **cache_options)
+            playlist = result["playlist"]
+            if result["failed"]:
+                report["failed_seasons"] = result["failed"]
+        else:
+            playlist = scrape_soundtrack_film_cached(media.title, media.year, pool=pool, **cache_options)
+        report["timings"]["scrape"] = round(time.perf_counter() - started, 2)
+        report["tracks"] = len(playlist or {})
+        if not playlist:
+            raise ValueError("No tracks found")
+
+        record = {"tracks": report["tracks"], "built": False, "playlist_url": None}
+        if build:
+            started = time.perf_counter()
+            result = Soundtrack_Builder.build_playlist_for_media(sp, media)
+            report["timings"]["build"] = round(time.perf_counter() - started, 2)
+            if result is None:
+                raise ValueError("No scraped tracks found after scrape")
+            report["playlist_url"] = result["playlist_url"]
+            report["missing"] = result["missing"]
+            record.update(built=True, playlist_url=result["playlist_url"])
+
+        if report.get("failed_seasons"):
+            # built from the seasons that did scrape; not recorded, so the next run retries the rest
+            seasons = ", ".join(str(season) for season in sorted(report["failed_seasons"]))
+            report.update(status="partial", error=f"seasons {seasons} failed")
+            print(f"⚠️ {media.playlist_name}: {report['tracks']} tracks, but seasons {seasons} failed")
+        else:
+            state.set(media.key, record)
+            report["status"] = "done"
+            print(f"✅ {media.playlist_name}: {report['tracks']} tracks")
+    except Exception as e:
+        report.update(status="failed", error=str(e), error_type=type(e).__name__)
+        print(f"❌ {media.playlist_name}: {e}")
+    return report
+
+
+def run_batch(media_list, workers=2, build=True, max_age_hours=24, force=False, pool=None, sp=None):
+    """
+    Runs every manifest entry across a worker pool.
+
+    :param media_list: list of Media (see load_manifest)
+    :param workers: entries processed at once
+    :param build: also build the Spotify playlists (False = scrape only)
+    :param max_age_hours: entries finished more recently than this are skipped
+    :param force: re-run every entry, even if up to date
+    :param pool: BrowserPool (defaults to the shared pool)
+    :param sp: Spotify client (defaults to one shared client for the whole batch)
+    :return: summary report dict
+    """
+    started_at = datetime.now().isoformat(timespec="seconds")
+    started = time.perf_counter()
+    pool = pool or Soundtrack_Browser_Pool.get_browser_pool()
+    if build and sp is None:
+        sp = Soundtrack_Builder.get_spotify_client()
+    state = get_batch_state(max_age_hours)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        items = list(executor.map(lambda media: run_item(media, pool, sp, state, build, force), media_list))
+
+    counts = {"done": 0, "partial": 0, "skipped": 0, "failed": 0}
+    for item in items:
+        counts[item["status"]] += 1
+    return {
+        "started_at": started_at,
+        "elapsed": round(time.perf_counter() - started, 2),
+        "workers": workers,
+        "build": build,
+        **counts,
+        "items": items,
+        "metrics": Soundtrack_Metrics.summary(),
+    }
+
+
+def write_report(summary, path=None):
+    """
+    Writes the batch report as JSON & prints a one-line-per-item summary.
+
+    :return: Path of the report
+    """
+    path = Path(path or f"batch_report_{datetime.now().strftime('%Y-%m-%d_%H-%M')}.json")
+    path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    print()
+    for item in summary["items"]:
+        timings = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in item["timings"].items())
+        detail = item.get("error") or item.get("playlist_url") or ""
+        print(f"{item['status']:>8}  {item['name']}  {timings}  {detail}")
+    print(f"\n📝 {summary['done']} done, {summary['partial']} partial, {summary['skipped']} skipped, {summary['failed']} failed "
+          f"in {summary['elapsed']:.1f}s — report: {path}")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape & build playlists for every entry in a manifest")
+    parser.add_argument("manifest", help="CSV or JSON manifest of shows / seasons / films")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BATCH_WORKERS", 2)), help="entries run at once")
+    parser.add_argument("--scrape-only", action="store_true", help="don't build Spotify playlists")
+    parser.add_argument("--max-age", type=float, default=24, help="skip entries finished within this many hours")
+    parser.add_argument("--force", action="store_true", help="re-run & re-scrape entries even if up to date")
+    parser.add_argument("--report", help="report file (default batch_report_<date>.json)")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(load_manifest(args.manifest), workers=args.workers, build=not args.scrape_only,
+                        max_age_hours=args.max_age, force=args.force)
+    write_report(summary, args.report)
+    Soundtrack_Metrics.print_summary()
+    return 1 if summary["failed"] or summary["partial"] else 0
+
+
+#####################################################
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,745 @@
+# script to benchmark the scrapers & the playlist builder offline
+# usage: python Soundtrack_Benchmark.py run [--fixtures DIR] [--scenarios tv_season film ...] [--baseline report.json]
+#        python Soundtrack_Benchmark.py record --show "Game of Thrones" --season 1 --film "The Hangover" --year 2009 --out DIR
+
+
+# Soundtrack_Benchmark.py
+"""
+Offline benchmark harness.
+Tunefind pages are served from a local fixture server (pages recorded with `record`, or a generated
+set in Tunefind's markup), the Spotify Web API is replaced by a local fake with configurable
+latency & 429 injection, and TMDB search by a local stand-in, so every run sees the same pages and
+the same API behaviour. Each scenario (a season scrape, a resumed scrape, a series, a film,
+cold / warm / throttled builds, TMDB autocomplete typing & concurrent searches) reports
+end-to-end & per-stage timings, WebDriver calls (by command), page requests and Spotify API calls
+(by endpoint) to a JSON report. Given a --baseline report, slower timings (beyond --tolerance) or
+higher call counts are flagged as regressions and the run exits 1.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# the project modules read their env settings (TUNEFIND_BASE_URL, SPOTIPY_API_PREFIX, cache paths) when first
+# imported or used, so they're imported inside the functions below, once the fixture servers are running
+
+
+class CallCounter:
+    """
+    Thread-safe counts by name, eg {"search": 120, "me": 3}.
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, name, count=1):
+        with self._lock:
+            self._counts[name] += count
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {"total": sum(self._counts.values()), **dict(sorted(self._counts.items()))}
+
+
+def _start_server(handler_class):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real sites
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        body = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status, obj, headers=None):
+        self._send(status, json.dumps(obj), "application/json", headers)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null") if length else None
+
+
+class FixtureServer:
+    """
+    Serves recorded Tunefind pages from a directory; a url path maps to "<directory>/<path>.html",
+    eg /show/game-of-thrones/season-1 -> show/game-of-thrones/season-1.html. Anything else is a 404.
+
+    :param directory: fixture directory (see write_fixtures / record_fixtures)
+    :param latency: seconds added to every response
+    """
+
+    def __init__(self, directory, latency=0.0):
+        self.directory = Path(directory)
+        self.latency = latency
+        self.requests = CallCounter()  # by page type: show, season, episode, movie, not_found
+        fixtures = self
+
+        class Handler(_Handler):
+            def do_GET(self):
+                time.sleep(fixtures.latency)
+                path = urlparse(self.path).path.strip('/')
+                page = fixtures.directory / f"{path}.html"
+                if not path or ".." in path or not page.is_file():
+                    fixtures.requests.add("not_found")
+                    return self._send(404, "<html><head><title>Page Not Found</title></head><body>404</body></html>")
+                fixtures.requests.add(fixtures.page_type(path))
+                self._send(200, page.read_bytes())
+
+        self._server = _start_server(Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    @staticmethod
+    def page_type(path):
+        parts = path.split('/')
+        if parts[0] == "movie":
+            return "movie"
+        return {2: "show", 3: "season"}.get(len(parts), "episode")
+
+    def shutdown(self):
+        self._server.shutdown()
+
+
+class FakeSpotify:
+    """
+    Local stand-in for the parts of the Spotify Web API the builder uses: search, current user,
+    playlist create, playlist items (read / add / remove).
+    Search results are derived from the query, so the same song always resolves to the same uri;
+    songs with "(Demo)" in the title aren't found.
+
+    :param latency: seconds added to every response
+    :param rate_limit_every: answer every Nth search with 429 Too Many Requests (0 = never)
+    :param retry_after: Retry-After seconds sent with a 429
+    """
+
+    def __init__(self, latency=0.0, rate_limit_every=0, retry_after=0.1):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.calls = CallCounter()  # by endpoint: search, me, create, items, add, remove, rate_limited
+        self.playlists = {}
+        self._searches = 0
+        self._lock = threading.Lock()
+        spotify = self
+
+        class Handler(_Handler):
+            def do_GET(self):
+                time.sleep(spotify.latency)
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path.rstrip('/').endswith("/me"):
+                    spotify.calls.add("me")
+                    return self._json(200, {"id": "benchmark-user"})
+                if url.path.endswith("/search"):
+                    return spotify._search(self, query.get("q", [""])[0])
+                if url.path.endswith("/items") or url.path.endswith("/tracks"):
+                    spotify.calls.add("items")
+                    return spotify._items(self, url.path.split('/')[-2], query)
+                self._json(404, {"error": {"status": 404, "message": "Not found"}})
+
+            def do_POST(self):
+                time.sleep(spotify.latency)
+                body = self._body()
+                path = urlparse(self.path).path
+                if path.endswith("/playlists"):
+                    spotify.calls.add("create")
+                    with spotify._lock:
+                        playlist_id = f"bench{len(spotify.playlists)}"
+                        spotify.playlists[playlist_id] = []
+                    return self._json(201, {"id": playlist_id, "external_urls": {"spotify": f"https://open.spotify.com/playlist/{playlist_id}"}})
+                spotify.calls.add("add")
+                uris = body if isinstance(body, list) else (body or {}).get("uris", [])
+                with spotify._lock:
+                    spotify.playlists.setdefault(path.split('/')[-2], []).extend(uris)
+                self._json(201, {"snapshot_id": "bench"})
+
+            def do_DELETE(self):
+                time.sleep(spotify.latency)
+                body = self._body() or {}
+                spotify.calls.add("remove")
+                removed = {item["uri"] for item in body.get("items", body.get("tracks", []))}
+                playlist_id = urlparse(self.path).path.split('/')[-2]
+                with spotify._lock:
+                    spotify.playlists[playlist_id] = [uri for uri in spotify.playlists.get(playlist_id, []) if uri not in removed]
+                self._json(200, {"snapshot_id": "bench"})
+
+        self._server = _start_server(Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def _search(self, handler, q):
+        with self._lock:
+            self._searches += 1
+            throttle = self.rate_limit_every and self._searches % self.rate_limit_every == 0
+        if throttle:
+            self.calls.add("rate_limited")
+            return handler._json(429, {"error": {"status": 429, "message": "API rate limit exceeded"}},
+                                 headers={"Retry-After": str(self.retry_after)})
+        self.calls.add("search")
+        if "(demo)" in q.lower():
+            return handler._json(200, {"tracks": {"items": []}})
+        uri = "spotify:track:" + hashlib.md5(q.lower().encode("utf-8")).hexdigest()[:22]
+        handler._json(200, {"tracks": {"items": [{"uri": uri}]}})
+
+    def _items(self, handler, playlist_id, query):
+        with self._lock:
+            uris = list(self.playlists.get(playlist_id, [])) if playlist_id in self.playlists else None
+        if uris is None:
+            return handler._json(404, {"error": {"status": 404, "message": "Not found"}})
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query.get("limit", ["100"])[0])
+        next_url = None
+        if offset + limit < len(uris):
+            next_url = f"{self.url}/playlists/{playlist_id}/items?offset={offset + limit}&limit={limit}"
+        handler._json(200, {"items": [{"track": {"uri": uri}} for uri in uris[offset:offset + limit]], "next": next_url})
+
+    def shutdown(self):
+        self._server.shutdown()
+
+
+class FakeTMDB:
+    """
+    Local stand-in for TMDB's /search/tv & /search/movie: every catalogue title containing the
+    query, returned as one complete page of results.
+
+    :param latency: seconds added to every response
+    """
+
+    TITLES = {
+        "tv": ["Game of Thrones", "Game Changer", "The Game", "Squid Game", "Game of Talents",
+               "Breaking Bad", "Better Call Saul", "The Last of Us", "House of the Dragon", "Succession"],
+        "movie": ["The Hangover", "The Hangover Part II", "The Hangover Part III", "The Game",
+                  "Game Night", "Molly's Game", "Inception", "Interstellar"],
+    }
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = CallCounter()  # by endpoint: tv, movie
+        tmdb = self
+
+        class Handler(_Handler):
+            def do_GET(self):
+                time.sleep(tmdb.latency)
+                url = urlparse(self.path)
+                endpoint = url.path.rstrip('/').split('/')[-1]
+                if endpoint not in tmdb.TITLES:
+                    return self._json(404, {"status_code": 34, "status_message": "The resource you requested could not be found."})
+                tmdb.calls.add(endpoint)
+                query = parse_qs(url.query).get("query", [""])[0].lower()
+                key = "name" if endpoint == "tv" else "title"
+                results = [{"id": i + 1, key: title} for i, title in enumerate(tmdb.TITLES[endpoint]) if query in title.lower()]
+                self._json(200, {"page": 1, "results": results, "total_pages": 1, "total_results": len(results)})
+
+        self._server = _start_server(Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}/3"
+
+    def shutdown(self):
+        self._server.shutdown()
+
+
+#####################################################
+# fixtures
+
+ARTISTS = ["Ramin Djawadi", "The National", "Sigur Rós", "Karliene", "Florence + The Machine",
+           "Hozier", "Of Monsters and Men", "Will Champion", "The Hold Steady", "Coldplay"]
+
+
+def _track_html(song, artists):
+    links = "".join(f'<a data-discover="true" href="/artist/{a.lower().replace(" ", "-")}"><small>{a}</small></a>'
+                    for a in artists)
+    return f'<div class="flex flex-col"><p class="font-bold text-[1rem]">{song}</p>{links}</div>'
+
+
+def _page(title, body):
+    return f"<!DOCTYPE html><html><head><title>{title} | Tunefind</title></head><body>{body}</body></html>"
+
+
+def _tracks_page(title, tracks):
+    if not tracks:
+        return _page(title, '<div class="scroll-mt-20"><p>No songs have been added yet.</p></div>')
+    return _page(title, '<div class="scroll-mt-20">' + "".join(_track_html(s, a) for s, a in tracks) + "</div>")
+
+
+def _fixture_tracks(seed, count):
+    # deterministic tracks; every episode repeats the theme, a few songs have two artists & a few aren't on Spotify
+    tracks = [("Main Title", ["Ramin Djawadi"])]
+    for t in range(1, count):
+        song = f"Song {seed}-{t}" + (" (Demo)" if t % 7 == 0 else "")
+        artists = [ARTISTS[(seed * 7 + t) % len(ARTISTS)]]
+        if t % 5 == 0:
+            artists.append(ARTISTS[(seed * 7 + t + 1) % len(ARTISTS)])
+        tracks.append((song, artists))
+    return tracks
+
+
+def write_fixtures(directory, show="Game of Thrones", seasons=2, episodes=10, tracks_per_episode=12,
+                   film=("The Hangover", "2009"), film_tracks=25):
+    """
+    Writes a generated fixture set in Tunefind's markup: a show page, its season pages & episode
+    pages (one episode per season lists no songs), and a film page; plus fixtures.json describing it.
+
+    :return: Path of the fixture directory
+    """
+    directory = Path(directory)
+    show_slug = '-'.join(show.lower().split())
+    film_slug = '-'.join(film[0].lower().split()) + (f"-{film[1]}" if film[1] else "")
+
+    def write(path, html):
+        page = directory / f"{path}.html"
+        page.parent.mkdir(parents=True, exist_ok=True)
+        page.write_text(html, encoding="utf-8")
+
+    season_links = "".join(f'<a href="/show/{show_slug}/season-{n}">Season {n}</a>' for n in range(1, seasons + 1))
+    write(f"show/{show_slug}", _page(show, f"<h1>{show}</h1>{season_links}"))
+    for season in range(1, seasons + 1):
+        cards = []
+        for e in range(1, episodes + 1):
+            episode_id = season * 1000 + e
+            tracks = [] if e == episodes // 2 else _fixture_tracks(episode_id, tracks_per_episode)
+            cards.append(f'<a class="card-border" data-discover="true" href="/show/{show_slug}/season-{season}/{episode_id}">'
+                         f'<h4>S{season} E{e} Episode {e}</h4><p>April {e}, 20{10 + season}</p><p>{len(tracks)} Tracks</p></a>')
+            write(f"show/{show_slug}/season-{season}/{episode_id}", _tracks_page(f"{show} S{season} E{e}", tracks))
+        write(f"show/{show_slug}/season-{season}", _page(f"{show} Season {season}", "".join(cards)))
+    write(f"movie/{film_slug}", _tracks_page(film[0], _fixture_tracks(9000, film_tracks)))
+
+    manifest = {"show": show, "seasons": list(range(1, seasons + 1)), "film": list(film), "generated": True}
+    (directory / "fixtures.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return directory
+
+
+def record_fixtures(directory, show=None, seasons=(), film=None):
+    """
+    Records live Tunefind pages (show, seasons & every episode, film) into a fixture directory.
+
+    :param directory: where to write the pages
+    :param show: show title, eg "Game of Thrones"
+    :param seasons: season numbers to record
+    :param film: (title, year) or None
+    :return: Path of the fixture directory
+    """
+    import Soundtrack_Extractor
+    import Soundtrack_Scraper_utils
+    import Soundtrack_Slugs
+
+    directory = Path(directory)
+    base_url = Soundtrack_Scraper_utils.TUNEFIND_BASE_URL
+
+    def save(url):
+        path = urlparse(url).path.strip('/')
+        page = directory / f"{path}.html"
+        page.parent.mkdir(parents=True, exist_ok=True)
+        html = Soundtrack_Extractor.fetch_page(url)
+        page.write_text(html, encoding="utf-8")
+        print(f"📥 {path}")
+        return html
+
+    if show:
+        show_slug = Soundtrack_Slugs.resolve_show_slug(show)
+        save(f"{base_url}/show/{show_slug}")
+        for season in seasons:
+            season_url = Soundtrack_Scraper_utils.build_season_url(show_slug, season)
+            html = save(season_url)
+            for episode in Soundtrack_Extractor.parse_episode_cards_html(html, Soundtrack_Scraper_utils.TV_SELECTORS, season_url):
+                save(episode["url"])
+    if film:
+        save(f"{base_url}/movie/{Soundtrack_Slugs.resolve_film_slug(*film)}")
+
+    manifest = {"show": show, "seasons": list(seasons), "film": list(film) if film else None, "generated": False}
+    (directory / "fixtures.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return directory
+
+
+#####################################################
+# scenarios
+
+def _counting_pool(context):
+    # a browser pool whose browsers count every WebDriver command (all of them go through driver.execute)
+    import Soundtrack_Browser_Pool
+
+    class CountingBrowserPool(Soundtrack_Browser_Pool.BrowserPool):
+        def _new_browser(self):
+            pooled = super()._new_browser()
+            context.webdriver.add("browsers_started")
+            execute = pooled.driver.execute
+
+            def counted(command, params=None):
+                context.webdriver.add(command)
+                return execute(command, params)
+
+            pooled.driver.execute = counted
+            return pooled
+
+    return CountingBrowserPool(size=2, profile=os.getenv("BROWSER_BLOCK_PROFILE", "strict"))
+
+
+def _scrape_stages(events, total):
+    # per-stage timings from the scraper's progress events: season page (episode list) & episodes
+    # (timed as the events arrive; the events' own elapsed field is rounded to 0.1s)
+    stages = {}
+    for event in events:
+        if event.get("event") == "episodes" and "season_page" not in stages:
+            stages["season_page"] = round(event["received"], 3)
+    stages["episodes"] = round(total - stages.get("season_page", 0.0), 3)
+    return stages
+
+
+def scenario_tv_season(context, resume=False):
+    import Soundtrack_Scraper_tv
+
+    events = []
+    started = time.perf_counter()
+    playlist = Soundtrack_Scraper_tv.scrape_soundtrack_tv(
+        context.show, context.seasons[0], pool=context.pool, resume=resume,
+        progress=lambda **event: events.append({**event, "received": time.perf_counter() - started})
+    )
+    elapsed = time.perf_counter() - started
+    skipped = next((e["episode_total"] - e["episodes_to_scrape"] for e in events if e.get("event") == "episodes"), 0)
+    return {"stages": _scrape_stages(events, elapsed), "tracks": len(playlist), "episodes_from_checkpoint": skipped}
+
+
+def scenario_tv_season_selenium(context):
+    if not (shutil.which("firefox") and shutil.which("geckodriver")):
+        raise ScenarioSkipped("Firefox / geckodriver not installed")
+    os.environ["SCRAPER_ENGINE"] = "selenium"
+    try:
+        return scenario_tv_season(context)
+    finally:
+        os.environ["SCRAPER_ENGINE"] = "http"
+
+
+def scenario_tv_series(context):
+    import Soundtrack_Scraper_tv
+
+    result = Soundtrack_Scraper_tv.scrape_soundtrack_tv_series(context.show, context.seasons, pool=context.pool)
+    return {"tracks": len(result["playlist"]), "seasons": len(result["seasons"]), "failed_seasons": len(result["failed"])}
+
+
+def scenario_film(context):
+    import Soundtrack_Scraper_film
+
+    if not context.film:
+        raise ScenarioSkipped("No film in the fixtures")
+    playlist = Soundtrack_Scraper_film.scrape_soundtrack_film(*context.film, pool=context.pool)
+    return {"tracks": len(playlist)}
+
+
+def _build(context, media):
+    import Soundtrack_Builder
+
+    result = Soundtrack_Builder.build_playlist_for_media(context.sp, media)
+    if result is None:
+        raise RuntimeError(f"Nothing scraped for {media.playlist_name} (run a scrape scenario first)")
+    return {"stages": {stage: round(seconds, 3) for stage, seconds in result["timings"].items()},
+            "tracks": result["tracks_added"], "missing": result["missing"], "added": result["added"],
+            "removed": result["removed"], "created": result["created"], "cache": result["cache"]}
+
+
+def scenario_build_tv_cold(context):
+    from Soundtrack_Media import Media
+
+    context.reset_spotify_state()
+    return _build(context, Media.tv(context.show, context.seasons[0]))
+
+
+def scenario_build_tv_warm(context):
+    from Soundtrack_Media import Media
+
+    return _build(context, Media.tv(context.show, context.seasons[0]))
+
+
+def scenario_build_tv_throttled(context):
+    from Soundtrack_Media import Media
+
+    context.reset_spotify_state()
+    context.spotify.rate_limit_every = context.rate_limit_every
+    try:
+        return _build(context, Media.tv(context.show, context.seasons[0]))
+    finally:
+        context.spotify.rate_limit_every = 0
+
+
+def scenario_build_film_cold(context):
+    from Soundtrack_Media import Media
+
+    if not context.film:
+        raise ScenarioSkipped("No film in the fixtures")
+    context.reset_spotify_state()
+    return _build(context, Media.film(*context.film))
+
+
+def scenario_tmdb_autocomplete(context, typed="game of thrones", max_upstream_calls=2):
+    # one search per keystroke from the third character, as the autocomplete box sends them; later
+    # keystrokes should be answered from the cached results of an earlier prefix
+    from Soundtrack_TMDB import TMDBClient
+
+    client = TMDBClient("benchmark", base_url=context.tmdb.url)
+    keystrokes = range(3, len(typed) + 1)
+    for end in keystrokes:
+        results = client.search("tv", typed[:end])
+    if not any(r.get("name", "").lower() == typed for r in results):
+        raise RuntimeError(f"'{typed}' not in the autocomplete results")
+    if client.stats["upstream_calls"] > max_upstream_calls:
+        raise RuntimeError(f"typing '{typed}' made {client.stats['upstream_calls']} TMDB calls (budget {max_upstream_calls})")
+    return {"keystrokes": len(keystrokes), **client.stats, "tmdb_calls": context.tmdb.calls.snapshot()}
+
+
+def scenario_tmdb_coalescing(context, query="breaking bad", concurrent=5):
+    # identical searches in flight at the same time should share one TMDB call
+    from Soundtrack_TMDB import TMDBClient
+
+    client = TMDBClient("benchmark", base_url=context.tmdb.url)
+    barrier = threading.Barrier(concurrent)
+
+    def search(_):
+        barrier.wait()
+        return client.search("tv", query)
+
+    with ThreadPoolExecutor(max_workers=concurrent) as executor:
+        results = list(executor.map(search, range(concurrent)))
+    if any(r != results[0] for r in results):
+        raise RuntimeError("concurrent searches returned different results")
+    if client.stats["upstream_calls"] != 1:
+        raise RuntimeError(f"{concurrent} concurrent searches made {client.stats['upstream_calls']} TMDB calls (expected 1)")
+    return {"searches": concurrent, **client.stats, "tmdb_calls": context.tmdb.calls.snapshot()}
+
+
+# in run order: the build scenarios read what the scrape scenarios stored
+SCENARIOS = {
+    "tv_season": scenario_tv_season,
+    "tv_season_resume": lambda context: scenario_tv_season(context, resume=True),
+    "tv_season_selenium": scenario_tv_season_selenium,
+    "tv_series": scenario_tv_series,
+    "film": scenario_film,
+    "build_tv_cold": scenario_build_tv_cold,
+    "build_tv_warm": scenario_build_tv_warm,
+    "build_tv_throttled": scenario_build_tv_throttled,
+    "build_film_cold": scenario_build_film_cold,
+    "tmdb_autocomplete": scenario_tmdb_autocomplete,
+    "tmdb_coalescing": scenario_tmdb_coalescing,
+}
+
+
+class ScenarioSkipped(Exception):
+    """Raised by a scenario that can't run here (eg no browser installed)."""
+
+
+class BenchmarkContext:
+    """
+    Everything a scenario needs: the fixture servers, an isolated working directory & caches,
+    a counting browser pool & a Spotify client pointed at the fake API.
+    """
+
+    def __init__(self, fixtures, workdir, page_latency, spotify_latency, rate_limit_every):
+        manifest = json.loads((Path(fixtures) / "fixtures.json").read_text(encoding="utf-8"))
+        self.show = manifest.get("show")
+        self.seasons = manifest.get("seasons") or [1]
+        self.film = tuple(manifest["film"]) if manifest.get("film") else None
+        self.rate_limit_every = rate_limit_every
+        self.workdir = Path(workdir)
+        self.webdriver = CallCounter()
+
+        self.tunefind = FixtureServer(fixtures, latency=page_latency)
+        self.spotify = FakeSpotify(latency=spotify_latency)
+        self.tmdb = FakeTMDB(latency=spotify_latency)
+        os.environ.update({
+            "TUNEFIND_BASE_URL": self.tunefind.url,
+            "SPOTIPY_API_PREFIX": self.spotify.url,
+            "SCRAPER_ENGINE": "http",
+            "SCRAPE_CACHE_PATH": str(self.workdir / "scrape_cache.sqlite3"),
+            "SLUG_CACHE_PATH": str(self.workdir / "scrape_cache.sqlite3"),
+            "TRACK_STORE_PATH": str(self.workdir / "track_store.sqlite3"),
+            "TRACK_CACHE_PATH": str(self.workdir / "track_cache.sqlite3"),
+        })
+        os.chdir(self.workdir)  # playlist csvs, checkpoints & missing-track logs land here
+
+        import Soundtrack_Builder
+        self.pool = _counting_pool(self)
+        self.sp = Soundtrack_Builder.get_spotify_client()
+        self._spotify_resets = 0
+
+    def reset_spotify_state(self):
+        # a cold build: empty track cache & no remembered playlist
+        import Soundtrack_Builder
+
+        self._spotify_resets += 1
+        os.environ["TRACK_CACHE_PATH"] = str(self.workdir / f"track_cache_{self._spotify_resets}.sqlite3")
+        Soundtrack_Builder._track_cache = None
+        Soundtrack_Builder._playlist_store = None
+
+    def reset_counters(self):
+        self.webdriver.reset()
+        self.tunefind.requests.reset()
+        self.spotify.calls.reset()
+        self.tmdb.calls.reset()
+
+    def shutdown(self):
+        self.pool.shutdown()
+        self.tunefind.shutdown()
+        self.spotify.shutdown()
+        self.tmdb.shutdown()
+
+
+def run_scenario(context, name, verbose=False):
+    """
+    Runs one scenario with fresh counters.
+
+    :return: report dict: status, elapsed, stages, webdriver / page / api call counts, spans & counters
+             (see Soundtrack_Metrics.py) & the scenario's own results
+    """
+    from Soundtrack_Metrics import metrics
+
+    context.reset_counters()
+    metrics.reset()
+    output = io.StringIO()
+    report = {}
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sys.stdout if verbose else output):
+            result = SCENARIOS[name](context)
+        report.update(status="ok", **result)
+    except ScenarioSkipped as e:
+        report.update(status="skipped", reason=str(e))
+    except Exception as e:
+        report.update(status="failed", error=f"{type(e).__name__}: {e}", output_tail=output.getvalue()[-2000:])
+    report["elapsed"] = round(time.perf_counter() - started, 3)
+    report["webdriver_calls"] = context.webdriver.snapshot()
+    report["page_requests"] = context.tunefind.requests.snapshot()
+    report["api_calls"] = context.spotify.calls.snapshot()
+    report["metrics"] = metrics.snapshot()
+    return report
+
+
+def compare(report, baseline, tolerance=0.25, noise_floor=0.05):
+    """
+    Lists regressions against a baseline report: scenarios that got slower by more than `tolerance`
+    (and more than `noise_floor` seconds), or that make more WebDriver, page or API calls.
+
+    :return: list of regression strings
+    """
+    regressions = []
+    for name, current in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or current["status"] != "ok" or before["status"] != "ok":
+            continue
+        if current["elapsed"] > before["elapsed"] * (1 + tolerance) and current["elapsed"] - before["elapsed"] > noise_floor:
+            regressions.append(f"{name}: {before['elapsed']:.2f}s -> {current['elapsed']:.2f}s")
+        for counts in ("webdriver_calls", "page_requests", "api_calls"):
+            if current[counts]["total"] > before[counts]["total"]:
+                regressions.append(f"{name}: {counts} {before[counts]['total']} -> {current[counts]['total']}")
+    return regressions
+
+
+def run_benchmark(fixtures=None, scenarios=None, page_latency=0.02, spotify_latency=0.03, rate_limit_every=7, verbose=False):
+    """
+    Runs the scenarios (default: all, in SCENARIOS order) against the fixture servers.
+
+    :param fixtures: fixture directory (default: a generated set, see write_fixtures)
+    :return: report dict
+    """
+    if not verbose:
+        logging.getLogger("spotipy").setLevel(logging.CRITICAL)  # spotipy logs every (injected) 429
+    workdir = Path(tempfile.mkdtemp(prefix="soundtrack_bench_"))
+    fixtures = Path(fixtures).resolve() if fixtures else write_fixtures(workdir / "fixtures")
+    cwd = os.getcwd()
+    context = BenchmarkContext(fixtures, workdir, page_latency, spotify_latency, rate_limit_every)
+    started_at = datetime.now().isoformat(timespec="seconds")
+    try:
+        results = {name: run_scenario(context, name, verbose) for name in SCENARIOS if not scenarios or name in scenarios}
+    finally:
+        context.shutdown()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "started_at": started_at,
+        "python": platform.python_version(),
+        "fixtures": str(fixtures) if not str(fixtures).startswith(str(workdir)) else "generated",
+        "config": {"page_latency": page_latency, "spotify_latency": spotify_latency, "rate_limit_every": rate_limit_every},
+        "scenarios": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline scraper & builder benchmarks")
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="run the benchmark scenarios")
+    run_parser.add_argument("--fixtures", help="fixture directory (default: a generated set)")
+    run_parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), help="scenarios to run (default: all); builds read what tv_season / film scraped earlier in the run")
+    run_parser.add_argument("--page-latency", type=float, default=20, help="ms added to every fixture page")
+    run_parser.add_argument("--spotify-latency", type=float, default=30, help="ms added to every Spotify API call")
+    run_parser.add_argument("--rate-limit-every", type=int, default=7, help="every Nth search gets a 429 (throttled scenario)")
+    run_parser.add_argument("--report", help="report file (default bench_report_<date>.json)")
+    run_parser.add_argument("--baseline", help="earlier report to compare against; regressions exit 1")
+    run_parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slow-down vs the baseline (0.25 = 25%%)")
+    run_parser.add_argument("--verbose", action="store_true", help="show the scrapers' & builder's own output")
+
+    record_parser = commands.add_parser("record", help="record live Tunefind pages as fixtures")
+    record_parser.add_argument("--show", help="show title")
+    record_parser.add_argument("--season", type=int, action="append", default=[], help="season to record (repeatable)")
+    record_parser.add_argument("--film", help="film title")
+    record_parser.add_argument("--year", default="", help="film year")
+    record_parser.add_argument("--out", required=True, help="fixture directory")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        record_fixtures(args.out, args.show, args.season or [1], (args.film, args.year) if args.film else None)
+        return 0
+    if args.command is None:
+        args = run_parser.parse_args([])
+
+    report = run_benchmark(args.fixtures, args.scenarios, args.page_latency / 1000, args.spotify_latency / 1000,
+                           args.rate_limit_every, args.verbose)
+    if args.baseline:
+        report["regressions"] = compare(report, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+
+    path = Path(args.report or f"bench_report_{datetime.now().strftime('%Y-%m-%d_%H-%M')}.json")
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    for name, result in report["scenarios"].items():
+        detail = result.get("error") or result.get("reason") or ", ".join(
+            f"{stage} {seconds:.2f}s" for stage, seconds in result.get("stages", {}).items())
+        print(f"{result['status']:>8}  {name:<20} {result['elapsed']:7.2f}s  webdriver {result['webdriver_calls']['total']:>4}  "
+              f"pages {result['page_requests']['total']:>4}  api {result['api_calls']['total']:>4}  {detail}")
+    for regression in report.get("regressions", []):
+        print(f"❌ regression: {regression}")
+    print(f"📝 report: {path}")
+    failed = any(result["status"] == "failed" for result in report["scenarios"].values())
+    return 1 if failed or report.get("regressions") else 0
+
+
+#####################################################
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,222 @@
+# script to stop the scraper browsers downloading resources we never read
+# usage: Soundtrack_Browser_Pool.py
+#        python Soundtrack_Blocking.py <tunefind url>   (compares page weight under each profile)
+
+
+# Soundtrack_Blocking.py
+"""
+Resource-blocking profiles for the scraper's Firefox browsers.
+We only read text nodes, so artwork, web fonts, video, ads & analytics are wasted bandwidth and
+render time. A profile is a set of Firefox preferences plus, for "strict", a proxy auto-config
+(PAC) file that sends blocklisted third-party hosts to a dead local port. Each page's weight
+(requests & bytes, from the Performance API) is recorded per profile, so the savings can be read
+against the "off" baseline. A running app only uses one profile, so its savings are read against
+the baseline that `python Soundtrack_Blocking.py` saves (PAGE_WEIGHT_BASELINE_PATH).
+
+Profiles (BROWSER_BLOCK_PROFILE): off, light (images & fonts), strict (light + media + blocklist; default).
+"""
+
+import json
+import os
+import sys
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# third-party ad, analytics & tracking hosts seen on Tunefind pages (subdomains are blocked too)
+BLOCKED_HOSTS = [
+    "doubleclick.net", "googlesyndication.com", "googletagservices.com", "googletagmanager.com",
+    "google-analytics.com", "adservice.google.com", "amazon-adsystem.com", "adnxs.com",
+    "rubiconproject.com", "pubmatic.com", "openx.net", "criteo.com", "criteo.net", "casalemedia.com",
+    "taboola.com", "outbrain.com", "moatads.com", "scorecardresearch.com", "quantserve.com",
+    "hotjar.com", "facebook.net", "facebook.com", "connect.facebook.net", "twitter.com",
+    "ads-twitter.com", "tiktok.com", "sentry.io", "newrelic.com", "nr-data.net",
+    "fonts.googleapis.com", "fonts.gstatic.com", "use.typekit.net",
+]
+
+LIGHT_PREFS = {
+    "permissions.default.image": 2,              # don't load images
+    "gfx.downloadable_fonts.enabled": False,     # don't download web fonts
+    "browser.display.use_document_fonts": 0,
+}
+
+STRICT_PREFS = {
+    **LIGHT_PREFS,
+    "media.autoplay.default": 5,                 # block all autoplay
+    "media.autoplay.blocking_policy": 2,
+    "media.video_stats.enabled": False,
+    "dom.webnotifications.enabled": False,
+    "dom.push.enabled": False,
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+}
+
+PROFILES = {
+    "off": {"prefs": {}, "blocklist": False},
+    "light": {"prefs": LIGHT_PREFS, "blocklist": False},
+    "strict": {"prefs": STRICT_PREFS, "blocklist": True},
+}
+
+_pac_path = None
+_pac_lock = threading.Lock()
+
+
+def build_pac(hosts):
+    """
+    Returns a PAC script that sends `hosts` (and their subdomains) to a closed local port & everything else direct.
+    """
+    conditions = " ||\n        ".join(f'dnsDomainIs(host, "{h}") || host == "{h}"' for h in hosts)
+    return (
+        "function FindProxyForURL(url, host) {\n"
+        f"    if ({conditions})\n"
+        '        return "PROXY 127.0.0.1:9";\n'
+        '    return "DIRECT";\n'
+        "}\n"
+    )
+
+
+def pac_url():
+    """
+    Writes the blocklist PAC file once per process; returns its file:// url.
+    """
+    global _pac_path
+    with _pac_lock:
+        if _pac_path is None:
+            path = Path(tempfile.gettempdir()) / f"soundtrack_blocklist_{os.getpid()}.pac"
+            path.write_text(build_pac(BLOCKED_HOSTS))
+            _pac_path = path
+        return _pac_path.as_uri()
+
+
+def get_block_profile():
+    """
+    Returns the profile name set by BROWSER_BLOCK_PROFILE (default "strict").
+    """
+    profile = os.getenv("BROWSER_BLOCK_PROFILE", "strict").lower()
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown BROWSER_BLOCK_PROFILE '{profile}'. Choose from: {', '.join(PROFILES)}")
+    return profile
+
+
+def apply_profile(options, profile):
+    """
+    Sets a profile's Firefox preferences on WebDriver options.
+
+    :param options: selenium.webdriver.firefox.options.Options
+    :param profile: "off", "light" or "strict"
+    :return: the same options
+    """
+    settings = PROFILES[profile]
+    for name, value in settings["prefs"].items():
+        options.set_preference(name, value)
+    if settings["blocklist"]:
+        options.set_preference("network.proxy.type", 2)  # proxy auto-config
+        options.set_preference("network.proxy.autoconfig_url", pac_url())
+    return options
+
+
+def baseline_path():
+    return Path(os.getenv("PAGE_WEIGHT_BASELINE_PATH", "page_weight_baseline.json"))
+
+
+def load_baseline():
+    """
+    Returns the "off" page weight saved by `python Soundtrack_Blocking.py`, or None if there isn't one.
+
+    :return: dict of pages, avg_requests, avg_bytes & recorded_at
+    """
+    try:
+        saved = json.loads(baseline_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    baseline = saved.get("profiles", {}).get("off")
+    return {**baseline, "recorded_at": saved.get("recorded_at")} if baseline else None
+
+
+def save_baseline(snapshot, url):
+    """
+    Saves a page weight snapshot (with an "off" profile) as the baseline a running app measures its savings against.
+    """
+    saved = {"recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "url": url, "profiles": snapshot}
+    baseline_path().write_text(json.dumps(saved, indent=2), encoding="utf-8")
+
+
+class PageWeightStats:
+    """
+    Requests & bytes transferred per page, by blocking profile; savings are measured against "off",
+    recorded in this process or else saved by `python Soundtrack_Blocking.py` (see load_baseline).
+    """
+
+    def __init__(self):
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def record(self, profile, weight):
+        if not weight:
+            return
+        with self._lock:
+            stats = self._profiles.setdefault(profile, {"pages": 0, "requests": 0, "bytes": 0})
+            stats["pages"] += 1
+            stats["requests"] += int(weight.get("requests") or 0)
+            stats["bytes"] += int(weight.get("bytes") or 0)
+
+    def snapshot(self):
+        """
+        :return: dict of profile -> pages, avg requests & bytes per page, the baseline used
+                 ("measured" in this process, "stored <date>" or None) and, given a baseline, requests
+                 & bytes saved per page
+        """
+        with self._lock:
+            result = {
+                profile: {
+                    "pages": stats["pages"],
+                    "avg_requests": round(stats["requests"] / stats["pages"], 1),
+                    "avg_bytes": round(stats["bytes"] / stats["pages"]),
+                }
+                for profile, stats in self._profiles.items() if stats["pages"]
+            }
+        baseline, source = result.get("off"), "measured"
+        if baseline is None and any(profile != "off" for profile in result):
+            baseline = load_baseline()
+            source = f"stored {baseline['recorded_at']}" if baseline else None
+        for profile, stats in result.items():
+            if profile == "off":
+                continue
+            stats["baseline"] = source if baseline else None
+            if baseline:
+                stats["requests_saved_per_page"] = round(baseline["avg_requests"] - stats["avg_requests"], 1)
+                stats["bytes_saved_per_page"] = baseline["avg_bytes"] - stats["avg_bytes"]
+        return result
+
+
+page_weight_stats = PageWeightStats()
+
+
+#####################################################
+
+if __name__ == "__main__":
+    # load one page with each profile in a fresh browser, print what blocking saves & keep the result as the
+    # baseline the app's /jobs/metrics savings are measured against
+    import Soundtrack_Browser_Pool
+    import Soundtrack_Scraper_utils
+
+    url = sys.argv[1] if len(sys.argv) > 1 else Soundtrack_Scraper_utils.build_season_url("game-of-thrones", 1)
+    selectors = Soundtrack_Scraper_utils.TV_SELECTORS
+    outcomes = {"tracks": selectors["episode_div"], "episodes": selectors["episode_cards"]}
+    for profile in PROFILES:
+        pool = Soundtrack_Browser_Pool.BrowserPool(size=1, profile=profile)
+        try:
+            with pool.browser() as pooled:
+                pooled.load(url)
+                pooled.wait_ready(selectors, outcomes, page="compare")
+        finally:
+            pool.shutdown()
+
+    snapshot = page_weight_stats.snapshot()
+    for profile, stats in snapshot.items():
+        print(f"{profile:>6}: {stats}")
+    if "off" in snapshot:
+        save_baseline(snapshot, url)
+        print(f"📝 baseline: {baseline_path()}")
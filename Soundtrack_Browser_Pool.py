@@ -0,0 +1,292 @@
+# script to hold a pool of long-lived Firefox WebDriver instances
+# usage: Soundtrack_Scraper_tv.py, Soundtrack_Scraper_film.py & app.py
+
+
+# Soundtrack_Browser_Pool.py
+"""
+A warm pool of headless Firefox browsers shared across scrape requests.
+Starting Firefox is the slowest part of a film scrape, so browsers are leased from the pool
+and returned when the scrape is done instead of being quit. Each browser remembers whether
+the cookie banner has already been accepted, is health-checked before it is handed out and
+is recycled after a set number of page loads. Page loads are followed by wait_ready(), which
+returns as soon as the page settles (see Soundtrack_Readiness.py).
+"""
+
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import Soundtrack_Scraper_utils
+import Soundtrack_Readiness
+import Soundtrack_Blocking
+from Soundtrack_Metrics import metrics
+
+
+class PooledBrowser:
+    """
+    Wraps a WebDriver with the per-session state the pool tracks.
+
+    :param driver: Selenium WebDriver instance
+    :param profile: resource-blocking profile the browser was started with (see Soundtrack_Blocking.py)
+    """
+
+    def __init__(self, driver, profile="off"):
+        self.driver = driver
+        self.profile = profile
+        self.pages_loaded = 0
+        self.cookies_accepted = False
+        self.created_at = time.time()
+
+    def load(self, url):
+        """
+        Opens a url and counts it towards the recycle limit.
+
+        :param url: page to load
+        """
+        with metrics.span("page_load"):
+            self.driver.get(url)
+        self.pages_loaded += 1
+
+    def accept_cookies(self, selectors):
+        """
+        Clears the cookie banner once per browser session; later pages reuse the consent cookie.
+        Doesn't wait for a banner; if none is showing it is checked again on the next page.
+
+        :param selectors: dict containing 'cookies_agree_button' XPath
+        """
+        if self.cookies_accepted:
+            return
+        with metrics.span("cookie_handling"):
+            self.cookies_accepted = Soundtrack_Scraper_utils.handle_cookies(self.driver, selectors)
+
+    def wait_ready(self, selectors, outcomes, page="page", timeout=10):
+        """
+        Waits for the loaded page to reach one of `outcomes` (see Soundtrack_Readiness.py),
+        clearing the cookie banner if the wait saw one.
+
+        :param selectors: dict containing 'cookies_agree_button' XPath
+        :param outcomes: dict of outcome name -> xpath, in priority order
+        :param page: page type the wait time is recorded under
+        :param timeout: seconds before giving up
+        :return: outcome name, "not_found" or "timeout"
+        """
+        cookie_xpath = None if self.cookies_accepted else selectors.get("cookies_agree_button")
+        state = Soundtrack_Readiness.wait_for_page(self.driver, outcomes, page=page, cookie_xpath=cookie_xpath, timeout=timeout)
+        Soundtrack_Blocking.page_weight_stats.record(self.profile, state.weight)
+        if state.cookie_banner:
+            self.accept_cookies(selectors)
+        return state.outcome
+
+    def is_healthy(self):
+        """
+        Checks the browser is still responsive (ie the geckodriver session hasn't died).
+
+        :return: True if the browser answers a cheap command, False otherwise
+        """
+        try:
+            return len(self.driver.window_handles) > 0
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"Issue closing browser: {e}")
+
+
+class BrowserPool:
+    """
+    Lease/return pool of Firefox browsers. Browsers are started lazily up to `size`.
+
+    :param size: maximum number of browsers alive at once
+    :param max_pages: recycle a browser after this many page loads
+    :param headless: run Firefox without a window
+    :param profile: resource-blocking profile, "off", "light" or "strict" (see Soundtrack_Blocking.py)
+    """
+
+    def __init__(self, size=4, max_pages=50, headless=True, profile="strict"):
+        if profile not in Soundtrack_Blocking.PROFILES:
+            raise ValueError(f"Unknown blocking profile '{profile}'")
+        self.size = size
+        self.max_pages = max_pages
+        self.headless = headless
+        self.profile = profile
+        self._idle = []
+        self._total = 0  # idle + leased browsers
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _new_browser(self):
+        # selenium's webdriver package is slow to import; only load it once a browser is actually started
+        from selenium import webdriver
+        from selenium.webdriver.firefox.options import Options
+
+        options = Options()
+        if self.headless:
+            options.add_argument("-headless")  # True = don't show browser
+        # skip images, fonts, ads & third-party scripts; we only read text
+        Soundtrack_Blocking.apply_profile(options, self.profile)
+        driver = webdriver.Firefox(options=options)
+
+        # every WebDriver command goes through execute(); count them for /metrics
+        execute = driver.execute
+
+        def counted_execute(command, params=None):
+            metrics.count("webdriver_calls")
+            return execute(command, params)
+
+        driver.execute = counted_execute
+        return PooledBrowser(driver, profile=self.profile)
+
+    def lease(self, timeout=None):
+        """
+        Takes a healthy browser from the pool, starting a new one if the pool isn't full.
+        Blocks until a browser is returned when every browser is leased.
+
+        :param timeout: seconds to wait for a free browser (None = wait forever)
+        :return: PooledBrowser
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            pooled = self._take(deadline)
+            if pooled is None:
+                break
+            # health-checked outside the lock, so other leases don't wait on this WebDriver round trip
+            if pooled.is_healthy():
+                return pooled
+            # dead session; drop it & free its slot
+            print("Discarding unresponsive browser from pool.")
+            pooled.quit()
+            with self._condition:
+                self._total -= 1
+                self._condition.notify()
+
+        # start Firefox outside the lock so other leases aren't held up
+        try:
+            return self._new_browser()
+        except Exception:
+            with self._condition:
+                self._total -= 1
+                self._condition.notify()
+            raise
+
+    def _take(self, deadline):
+        # pops an idle browser, or reserves a slot for a new one & returns None; waits while every browser is leased
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool has been shut down")
+                if self._idle:
+                    return self._idle.pop()
+                if self._total < self.size:
+                    self._total += 1
+                    return None
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a free browser")
+                self._condition.wait(remaining)
+
+    def release(self, pooled, discard=False):
+        """
+        Returns a browser to the pool; browsers past their page limit (or discarded) are quit.
+
+        :param pooled: PooledBrowser from lease()
+        :param discard: True if the caller knows the browser is in a bad state
+        """
+        if discard or self._closed or pooled.pages_loaded >= self.max_pages:
+            pooled.quit()
+            with self._condition:
+                self._total -= 1
+                self._condition.notify()
+            return
+
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    @contextmanager
+    def browser(self, timeout=None):
+        """
+        Context manager around lease()/release(); the browser is discarded if the block raises
+        a WebDriver error so a broken session isn't handed to the next caller.
+        """
+        pooled = self.lease(timeout)
+        discard = False
+        try:
+            yield pooled
+        except Exception:
+            discard = not pooled.is_healthy()
+            raise
+        finally:
+            self.release(pooled, discard=discard)
+
+    def warm(self, count=1):
+        """
+        Starts browsers ahead of the first request.
+
+        :param count: number of browsers to have idle
+        """
+        leased = []
+        try:
+            for _ in range(min(count, self.size)):
+                leased.append(self.lease())
+        finally:
+            for pooled in leased:
+                self.release(pooled)
+
+    def warm_in_background(self, count=1):
+        """
+        Runs warm() in a daemon thread so start-up isn't held up by Firefox; a failure is only logged.
+
+        :param count: number of browsers to have idle
+        :return: the warm-up Thread
+        """
+        def run():
+            try:
+                self.warm(count)
+            except Exception as e:
+                print(f"Could not warm the browser pool: {e}")
+
+        thread = threading.Thread(target=run, name="browser-pool-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self):
+        """
+        Quits every idle browser; leased browsers are quit when they are returned.
+        """
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._condition.notify_all()
+        for pooled in idle:
+            pooled.quit()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """
+    Returns the process-wide browser pool, creating it on first use.
+    Size & recycle limit can be set with BROWSER_POOL_SIZE / BROWSER_POOL_MAX_PAGES,
+    and the resource-blocking profile with BROWSER_BLOCK_PROFILE.
+
+    :return: BrowserPool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(
+                size=int(os.getenv("BROWSER_POOL_SIZE", 4)),
+                max_pages=int(os.getenv("BROWSER_POOL_MAX_PAGES", 50)),
+                profile=Soundtrack_Blocking.get_block_profile(),
+            )
+            atexit.register(_pool.shutdown)
+        return _pool
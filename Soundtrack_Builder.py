@@ -18,14 +18,37 @@
 ###
 #####################################################################################
 
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
-import pandas as pd
+import csv
+import time
 from collections import OrderedDict
 from datetime import datetime
 import os
-from pathlib import Path
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import requests
+import threading
+from Soundtrack_Cache import SQLiteCache
+import Soundtrack_Resolver
+import Soundtrack_Track_Store
+from Soundtrack_Media import Media
+from Soundtrack_Metrics import metrics
+
+
+# resolved (song, artist) -> track uri lookups are kept between builds; not-found results are kept for less time
+TRACK_CACHE_TTL = 30 * 24 * 3600
+TRACK_CACHE_NEGATIVE_TTL = 24 * 3600
+_track_cache = None
+_track_cache_lock = threading.Lock()
+
+# Spotify playlist id per show/season or film, so re-runs sync the same playlist instead of creating another
+PLAYLIST_STORE_TTL = 10 * 365 * 24 * 3600
+_playlist_store = None
+_playlist_store_lock = threading.Lock()
+_cache_stats_lock = threading.Lock()
+
+# concurrent searches share one pooled session; keep enough connections for every resolver worker
+SPOTIFY_POOL_SIZE = 16
 
 
 def run_soundtrack_builder(tv_show, season_num, csv_dir="Playlist CSV Files", log_missing=True):
@@ -45,13 +68,27 @@ def run_soundtrack_builder_film(film_name, film_year="", csv_dir="Playlist CSV F
     Works both when imported (web-app) and when run standalone (__main__).
     """
     sp = get_spotify_client()
-    playlist_url = create_spotify_playlist_from_csv(sp, film_name, film_year, csv_dir, log_missing)
+    playlist_url = create_spotify_playlist_from_csv_film(sp, film_name, film_year, csv_dir, log_missing)
     return playlist_url
-    
 
 
 
+
+def run_soundtrack_builder_series(tv_show, first_season=None, last_season=None, csv_dir="Playlist CSV Files", log_missing=True):
+    """
+    TV Series (every season, or a season range) - Build a Spotify playlist from the combined series CSV
+    and return the playlist URL.
+    """
+    sp = get_spotify_client()
+    result = build_playlist_for_media(sp, Media.series(tv_show, first_season, last_season), csv_dir, log_missing)
+    return result["playlist_url"] if result else None
+
+
 def get_spotify_client():
+    # spotipy takes a quarter of a second to import, so it's loaded here rather than at startup
+    import spotipy
+    from spotipy.oauth2 import SpotifyOAuth
+
     # Get Spotify Credentials (avoids hard coding sensitive info)
     # this will look for the ".env" file in the project directory
     load_dotenv() # load env variables from .env
@@ -59,6 +96,29 @@ def get_spotify_client():
     client_secret = os.getenv("SPOTIPY_CLIENT_SECRET")
     redirect_uri = os.getenv("SPOTIPY_REDIRECT_URI")
 
+    # pooled session shared by the concurrent resolver workers
+    # 5xx responses are retried here, but 429s are left to Soundtrack_Resolver, which backs off every worker using Retry-After
+    # only reads are retried: a 502 can arrive after Spotify has already created the playlist or added the tracks
+    retry = Retry(
+        total=3,
+        status=3,
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=False
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=SPOTIFY_POOL_SIZE, max_retries=retry))
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=SPOTIFY_POOL_SIZE, max_retries=retry))
+    client_kwargs = dict(requests_session=session, requests_timeout=30)
+
+    # point the client at a local stand-in API (eg for tests), skipping OAuth
+    api_prefix = os.getenv("SPOTIPY_API_PREFIX")
+    if api_prefix:
+        sp = spotipy.Spotify(auth=os.getenv("SPOTIPY_ACCESS_TOKEN", "local-token"), **client_kwargs)
+        sp.prefix = api_prefix.rstrip('/') + '/'
+        return sp
+
     # Initialize Spotify client (credentials can be loaded from env/config later)
     return spotipy.Spotify(auth_manager=SpotifyOAuth(
         client_id=client_id,
@@ -66,127 +126,338 @@ def get_spotify_client():
         redirect_uri=redirect_uri,
         scope="playlist-modify-public"
         ),
-        requests_timeout=30
+        **client_kwargs
     )
 
 
 
-def create_spotify_playlist_from_csv(sp, tv_show, season_num, csv_dir="Playlist CSV Files", log_missing=True):
+def get_track_cache():
     """
-    Creates a Spotify playlist from a CSV of Song/Artist pairs.
-    Deduplicates tracks, preserves order, and logs missing entries.
+    Returns the persistent track uri cache shared by both builder functions.
+    The location can be set with the TRACK_CACHE_PATH env variable.
     """
-    
-    tv_show = '_'.join(word.capitalize() for word in tv_show.split())
-    csv_path = f"{csv_dir}/{tv_show}_Season_{season_num}_Playlist.csv"
-    
-    # check that the playlist exists
-    if not Path(csv_path).exists():
-        print(f"❌ CSV not found: {csv_path}")
-        return
-
-    df = pd.read_csv(csv_path)
-
-    track_uris = []
-    missing_tracks = []
-
-    for _, row in df.iterrows():
-        query = f"{row['Song']} {row['Artist']}"
-        results = sp.search(q=query, type="track", limit=1)
-        tracks = results.get('tracks', {}).get('items', [])
-        if tracks:
-            track_uris.append(tracks[0]['uri'])
-        else:
-            print(f"❌ Not found: {query}")
-            missing_tracks.append(query)
-
-    # Deduplicate while preserving order
-    track_uris = list(OrderedDict.fromkeys(track_uris))
-
-    # Log missing tracks
-    if log_missing and missing_tracks:
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
-        log_path = f"{csv_dir}/{tv_show}_Season_{season_num}_missing_tracks_log_{timestamp}.txt"
-        with open(log_path, "w", encoding="utf-8") as f:
-            for track in missing_tracks:
-                f.write(track + "\n")
-        print(f"📝 Missing tracks logged to: {log_path}")
-
-    # Create playlist and add tracks
-    tv_show_clean = tv_show.replace('_', ' ')
+    global _track_cache
+    with _track_cache_lock:
+        if _track_cache is None:
+            _track_cache = SQLiteCache(
+                os.getenv("TRACK_CACHE_PATH", "track_cache.sqlite3"),
+                table="tracks",
+                ttl=TRACK_CACHE_TTL,
+                stale_ttl=0,  # expired lookups are re-searched, never served
+                max_entries=100000
+            )
+        return _track_cache
+
+
+def resolve_track(sp, song, artist, track_cache, cache_stats):
+    """
+    Returns the Spotify uri for a song/artist pair, or None if Spotify has no match.
+    Only calls sp.search when the pair isn't in the track cache.
+    """
+    key = f"{' '.join(str(song).lower().split())}|{' '.join(str(artist).lower().split())}"
+    uri, state = track_cache.get(key)
+    with _cache_stats_lock:
+        cache_stats["hits" if state is not None else "misses"] += 1
+    if state is not None:
+        return uri
+
+    with metrics.span("spotify_search"):
+        results = sp.search(q=f"{song} {artist}", type="track", limit=1)
+    tracks = results.get('tracks', {}).get('items', [])
+    uri = tracks[0]['uri'] if tracks else None
+    track_cache.set(key, uri, ttl=TRACK_CACHE_TTL if uri else TRACK_CACHE_NEGATIVE_TTL)
+    return uri
+
+
+def report_track_cache(cache_stats):
+    # print the track cache hit rate for this build
+    lookups = cache_stats["hits"] + cache_stats["misses"]
+    if lookups:
+        print(f"🔎 Track cache: {cache_stats['hits']}/{lookups} hits ({cache_stats['hits'] / lookups:.0%}), "
+              f"{cache_stats['misses']} Spotify searches")
+
+
+def get_playlist_store():
+    """
+    Returns the store of Spotify playlist ids, keyed by Spotify user & media key.
+    Kept alongside the track cache (TRACK_CACHE_PATH), table "playlists".
+    """
+    global _playlist_store
+    with _playlist_store_lock:
+        if _playlist_store is None:
+            _playlist_store = SQLiteCache(
+                os.getenv("TRACK_CACHE_PATH", "track_cache.sqlite3"),
+                table="playlists",
+                ttl=PLAYLIST_STORE_TTL,
+                stale_ttl=0,
+                max_entries=100000
+            )
+        return _playlist_store
+
+
+def get_playlist_uris(sp, playlist_id):
+    """
+    Reads a playlist's current track uris, in order.
 
-    user_id = sp.current_user()["id"]
-    playlist = sp.user_playlist_create(user=user_id, name=f"{tv_show_clean} Season {season_num}", public=True)
+    :return: (uris, api_calls)
+    """
+    uris = []
+    with metrics.span("playlist_read"):
+        page = sp.playlist_items(playlist_id, fields="items(track(uri),item(uri)),next", limit=100, additional_types=("track",))
+        api_calls = 1
+        while page:
+            for entry in page.get("items", []):
+                track = entry.get("track") or entry.get("item") or {}
+                if track.get("uri"):
+                    uris.append(track["uri"])
+            page = sp.next(page) if page.get("next") else None
+            api_calls += 1 if page else 0
+    return uris, api_calls
+
+
+def create_playlist(sp, media, track_uris, user_id=None):
+    """
+    Creates a new playlist holding track_uris (added in batches of 100).
 
+    :return: dict of playlist id & url, tracks added/removed, api calls, created=True
+             & timings (seconds) of the create & add stages
+    """
+    timings = {}
+    stage_start = time.perf_counter()
+    api_calls = 0
+    if user_id is None:
+        user_id = sp.current_user()["id"]
+        api_calls += 1
+    with metrics.span("playlist_write"):
+        playlist = sp.user_playlist_create(user=user_id, name=media.playlist_name, public=True)
+    api_calls += 1
+    timings["create"] = time.perf_counter() - stage_start
+
+    # add tracks in batches (the API accepts up to 100 per call)
+    stage_start = time.perf_counter()
     for i in range(0, len(track_uris), 100):
-        sp.playlist_add_items(playlist_id=playlist["id"], items=track_uris[i:i+100])
+        with metrics.span("playlist_write"):
+            sp.playlist_add_items(playlist_id=playlist["id"], items=track_uris[i:i+100])
+        api_calls += 1
+    timings["add"] = time.perf_counter() - stage_start
+    return {"playlist_id": playlist["id"], "playlist_url": playlist["external_urls"]["spotify"],
+            "added": len(track_uris), "removed": 0, "api_calls": api_calls, "created": True, "timings": timings}
 
-    playlist_url = playlist['external_urls']['spotify']
-    print(f"✅ Playlist created: {playlist['external_urls']['spotify']}")
-    print(playlist_url)
 
-    return playlist_url
+def sync_playlist(sp, media, track_uris, store=None):
+    """
+    Brings the playlist remembered for `media` in line with track_uris: tracks no longer wanted are
+    removed, new tracks are appended (both in batches of 100). Creates (and remembers) a playlist
+    if there isn't one yet, or if the remembered one has been deleted.
 
+    :return: dict of playlist id & url, tracks added/removed, api calls, whether it was created
+             & stage timings (seconds): read (the remembered playlist), remove & add, or create & add
+    """
+    from spotipy.exceptions import SpotifyException
 
-def create_spotify_playlist_from_csv_film(sp, film_name, film_year, csv_dir="Playlist CSV Files", log_missing=True):
+    stage_start = time.perf_counter()
+    store = store or get_playlist_store()
+    user_id = sp.current_user()["id"]
+    key = f"{user_id}:{media.key}"
+    remembered, state = store.get(key)
+
+    current = None
+    api_calls = 1
+    if state is not None:
+        try:
+            current, calls = get_playlist_uris(sp, remembered["playlist_id"])
+            api_calls += calls
+        except SpotifyException as e:
+            if e.http_status != 404:
+                raise
+            print(f"Playlist {remembered['playlist_id']} no longer exists — creating a new one.")
+    timings = {"read": time.perf_counter() - stage_start}
+
+    if current is None:
+        result = create_playlist(sp, media, track_uris, user_id=user_id)
+        result["api_calls"] += api_calls
+        result["timings"] = {**timings, **result["timings"]}
+        store.set(key, {"playlist_id": result["playlist_id"], "playlist_url": result["playlist_url"]})
+        return result
+
+    wanted = set(track_uris)
+    present = set(current)
+    to_remove = list(OrderedDict.fromkeys(uri for uri in current if uri not in wanted))
+    to_add = [uri for uri in track_uris if uri not in present]
+
+    playlist_id = remembered["playlist_id"]
+    stage_start = time.perf_counter()
+    for i in range(0, len(to_remove), 100):
+        with metrics.span("playlist_write"):
+            sp.playlist_remove_all_occurrences_of_items(playlist_id, to_remove[i:i+100])
+        api_calls += 1
+    timings["remove"] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    for i in range(0, len(to_add), 100):
+        with metrics.span("playlist_write"):
+            sp.playlist_add_items(playlist_id=playlist_id, items=to_add[i:i+100])
+        api_calls += 1
+    timings["add"] = time.perf_counter() - stage_start
+
+    return {"playlist_id": playlist_id, "playlist_url": remembered["playlist_url"],
+            "added": len(to_add), "removed": len(to_remove), "api_calls": api_calls, "created": False,
+            "timings": timings}
+
+
+# the build pipeline; both tv seasons & films go through the same stages:
+#   load -> normalize -> dedupe -> resolve -> create (or read & diff against the existing playlist) -> add (batches of 100)
+# load/normalize/dedupe are generators, so rows are streamed rather than loaded into a DataFrame
+# rows come from the track store (every scraped track, in episode order; see Soundtrack_Track_Store.py),
+# or from the playlist csv for playlists scraped before the store existed
+def load_rows(csv_path):
+    # stream Song/Artist rows from the playlist csv
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            yield row.get("Song"), row.get("Artist")
+
+
+def normalize_rows(rows):
+    # tidy whitespace & drop rows without a song title
+    for song, artist in rows:
+        song = ' '.join((song or "").split())
+        artist = ' '.join((artist or "").split())
+        if song:
+            yield song, artist
+
+
+def dedupe_rows(rows):
+    # drop repeated song/artist pairs (case-insensitive) while preserving order
+    seen = set()
+    for song, artist in rows:
+        key = (song.lower(), artist.lower())
+        if key not in seen:
+            seen.add(key)
+            yield song, artist
+
+
+def timed_rows(rows, timings, stage):
+    # adds the time spent producing each row (including the stages upstream of this one) to timings[stage]
+    rows = iter(rows)
+    timings.setdefault(stage, 0.0)
+    while True:
+        stage_start = time.perf_counter()
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        finally:
+            timings[stage] += time.perf_counter() - stage_start
+        yield row
+
+
+def build_playlist_for_media(sp, media, csv_dir="Playlist CSV Files", log_missing=True, sync=True):
     """
-    Creates a Spotify playlist from a CSV of Song/Artist pairs.
+    Runs the build pipeline for a Media descriptor (see Soundtrack_Media.py).
     Deduplicates tracks, preserves order, and logs missing entries.
+    With sync=True (default) a re-run updates the playlist built last time rather than creating a new one;
+    sync=False always creates a new playlist.
+
+    Returns a dict with the playlist url, track counts & per-stage timings (seconds),
+    or None if there are no scraped tracks (neither track store rows nor a playlist csv).
     """
-    
-    film_name = '_'.join(word.capitalize() for word in film_name.split())
-    if film_year != "":
-        file_name = f'{film_name}_{film_year}_Playlist.csv'
-    else:
-        file_name = f'{film_name}_Playlist.csv'
-    csv_path = f"{csv_dir}/{file_name}"
-    
-    # check that the playlist exists
-    if not Path(csv_path).exists():
-        print(f"❌ CSV not found: {csv_path}")
-        return
+    timings = {}
+    csv_path = media.csv_path(csv_dir)
 
-    df = pd.read_csv(csv_path)
+    # check that the playlist exists
+    track_store = Soundtrack_Track_Store.get_track_store()
+    if track_store.has(media):
+        source = track_store.rows(media)
+    elif csv_path.exists():
+        source = load_rows(csv_path)
+    else:
+        print(f"❌ No scraped tracks for {media.playlist_name} (CSV not found: {csv_path})")
+        return None
+
+    # load, normalize & dedupe are streamed; they run (and are timed) as the rows are consumed.
+    # each stage's time includes the stages feeding it, so the one before is subtracted
+    upto = {}
+    rows = list(timed_rows(dedupe_rows(timed_rows(normalize_rows(timed_rows(source, upto, "load")), upto, "normalize")),
+                           upto, "dedupe"))
+    timings["load"] = upto["load"]
+    timings["normalize"] = upto["normalize"] - upto["load"]
+    timings["dedupe"] = upto["dedupe"] - upto["normalize"]
+
+    # resolve each row to a track uri; previously resolved (song, artist) pairs come from the track cache
+    # searches run concurrently (see Soundtrack_Resolver.py); uris come back in row order
+    stage_start = time.perf_counter()
+    track_cache = get_track_cache()
+    cache_stats = {"hits": 0, "misses": 0}
+    uris = Soundtrack_Resolver.resolve_tracks(
+        sp, rows, lambda client, song, artist: resolve_track(client, song, artist, track_cache, cache_stats)
+    )
+    timings["resolve"] = time.perf_counter() - stage_start
+    report_track_cache(cache_stats)
 
     track_uris = []
     missing_tracks = []
-
-    for _, row in df.iterrows():
-        query = f"{row['Song']} {row['Artist']}"
-        results = sp.search(q=query, type="track", limit=1)
-        tracks = results.get('tracks', {}).get('items', [])
-        if tracks:
-            track_uris.append(tracks[0]['uri'])
+    for (song, artist), uri in zip(rows, uris):
+        if uri:
+            track_uris.append(uri)
         else:
+            query = f"{song} {artist}"
             print(f"❌ Not found: {query}")
             missing_tracks.append(query)
 
-    # Deduplicate while preserving order
+    # different rows can resolve to the same track; deduplicate while preserving order
     track_uris = list(OrderedDict.fromkeys(track_uris))
 
     # Log missing tracks
     if log_missing and missing_tracks:
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M")
-        log_path = f"{csv_path}_missing_tracks_log_{timestamp}.txt"
+        log_path = media.missing_log_path(csv_dir, timestamp)
         with open(log_path, "w", encoding="utf-8") as f:
             for track in missing_tracks:
                 f.write(track + "\n")
         print(f"📝 Missing tracks logged to: {log_path}")
 
-    # Create playlist and add tracks
-    film_name_clean = film_name.replace('_', ' ')
+    # sync the remembered playlist (only the difference is sent), or create one on the first build;
+    # adds the create (or read & remove) & add stage timings
+    if sync:
+        synced = sync_playlist(sp, media, track_uris)
+    else:
+        synced = create_playlist(sp, media, track_uris)
+    timings.update(synced["timings"])
 
-    user_id = sp.current_user()["id"]
-    playlist = sp.user_playlist_create(user=user_id, name=f"{film_name_clean} {film_year}", public=True)
+    playlist_url = synced["playlist_url"]
+    if synced["created"]:
+        print(f"✅ Playlist created: {playlist_url}")
+    else:
+        print(f"✅ Playlist synced: {playlist_url} (+{synced['added']} / -{synced['removed']} tracks, {synced['api_calls']} API calls)")
+    print("⏱️ " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()))
+
+    return {
+        "playlist_url": playlist_url,
+        "tracks_added": len(track_uris),
+        "missing": len(missing_tracks),
+        "added": synced["added"],
+        "removed": synced["removed"],
+        "created": synced["created"],
+        "api_calls": synced["api_calls"],
+        "cache": cache_stats,
+        "timings": timings,
+    }
 
-    for i in range(0, len(track_uris), 100):
-        sp.playlist_add_items(playlist_id=playlist["id"], items=track_uris[i:i+100])
 
-    playlist_url = playlist['external_urls']['spotify']
-    print(f"✅ Playlist created: {playlist['external_urls']['spotify']}")
-    print(playlist_url)
+def create_spotify_playlist_from_csv(sp, tv_show, season_num, csv_dir="Playlist CSV Files", log_missing=True):
+    """
+    Creates a Spotify playlist from a tv season's CSV of Song/Artist pairs; returns the playlist url.
+    """
+    result = build_playlist_for_media(sp, Media.tv(tv_show, season_num), csv_dir, log_missing)
+    return result["playlist_url"] if result else None
 
-    return playlist_url
+
+def create_spotify_playlist_from_csv_film(sp, film_name, film_year, csv_dir="Playlist CSV Files", log_missing=True):
+    """
+    Creates a Spotify playlist from a film's CSV of Song/Artist pairs; returns the playlist url.
+    """
+    result = build_playlist_for_media(sp, Media.film(film_name, film_year), csv_dir, log_missing)
+    return result["playlist_url"] if result else None
 
 
 
@@ -0,0 +1,268 @@
+# script to cache scrape results on disk
+# usage: app.py (and anything else that wants a playlist without re-scraping Tunefind)
+
+
+# Soundtrack_Cache.py
+"""
+SQLite-backed cache for scrape results.
+Entries are keyed by a normalised show/season or film/year key, expire after a TTL and are
+evicted least-recently-used once the cache holds more than `max_entries`. Expired entries are
+still served for a grace period (stale-while-revalidate) while a background thread re-scrapes.
+Callers that exit once they have their result (the batch CLI) re-scrape stale entries before
+returning instead, since a background refresh would die with the process.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import Soundtrack_Scraper_utils
+import Soundtrack_Track_Store
+from Soundtrack_Media import Media
+from Soundtrack_Metrics import metrics
+
+
+class SQLiteCache:
+    """
+    Key/value cache stored in a single SQLite table; values are stored as JSON.
+
+    :param path: SQLite database file
+    :param table: table name (lets several caches share one file)
+    :param ttl: seconds an entry stays fresh
+    :param stale_ttl: extra seconds an expired entry may still be served while it is refreshed
+    :param max_entries: LRU size bound
+    """
+
+    def __init__(self, path, table="cache", ttl=7 * 24 * 3600, stale_ttl=7 * 24 * 3600, max_entries=500):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT, created_at REAL, expires_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        Looks up a key.
+
+        :param key: cache key
+        :return: (value, state) where state is "fresh", "stale" or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                metrics.count(f"cache.{self.table}.miss")
+                return None, None
+
+            value, expires_at = row
+            if now >= expires_at + self.stale_ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                metrics.count(f"cache.{self.table}.miss")
+                return None, None
+
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+            if now < expires_at:
+                self.hits += 1
+                state = "fresh"
+            else:
+                self.stale_hits += 1
+                state = "stale"
+            metrics.count(f"cache.{self.table}.{'hit' if state == 'fresh' else 'stale'}")
+        return json.loads(value), state
+
+    def set(self, key, value, ttl=None):
+        """
+        Stores a value, evicting the least recently used entries if the cache is full.
+
+        :param key: cache key
+        :param value: JSON-serialisable value
+        :param ttl: seconds this entry stays fresh (defaults to the cache ttl)
+        """
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value), now, expires_at, now)
+            )
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def stats(self):
+        """
+        :return: dict of hit/miss counters & the current number of entries
+        """
+        with self._lock:
+            size = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            "entries": size,
+        }
+
+
+def tv_cache_key(tv_show, season_num):
+    return Media.tv(tv_show, season_num).key
+
+
+def film_cache_key(film_name, film_year=""):
+    return Media.film(film_name, film_year).key
+
+
+_scrape_cache = None
+_scrape_cache_lock = threading.Lock()
+_refreshing = set()  # keys with a background re-scrape in flight
+
+
+def get_scrape_cache():
+    """
+    Returns the process-wide scrape cache, creating it on first use.
+    Location, TTLs & size can be set with SCRAPE_CACHE_PATH / SCRAPE_CACHE_TTL /
+    SCRAPE_CACHE_STALE_TTL / SCRAPE_CACHE_MAX_ENTRIES.
+
+    :return: SQLiteCache
+    """
+    global _scrape_cache
+    with _scrape_cache_lock:
+        if _scrape_cache is None:
+            _scrape_cache = SQLiteCache(
+                os.getenv("SCRAPE_CACHE_PATH", "scrape_cache.sqlite3"),
+                table="scrapes",
+                ttl=int(os.getenv("SCRAPE_CACHE_TTL", 24 * 3600)),
+                stale_ttl=int(os.getenv("SCRAPE_CACHE_STALE_TTL", 7 * 24 * 3600)),
+                max_entries=int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", 500)),
+            )
+        return _scrape_cache
+
+
+def _refresh_in_background(cache, key, scrape):
+    with _scrape_cache_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            playlist = scrape()
+            if playlist:
+                cache.set(key, playlist)
+        except Exception as e:
+            print(f"Background refresh of {key} failed: {e}")
+        finally:
+            with _scrape_cache_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def cached_scrape(key, scrape, csv_path, cache=None, media=None, serve_stale=True, force=False):
+    """
+    Returns a cached playlist for `key`, scraping (and caching) it on a miss.
+    Stale entries are returned immediately and refreshed in the background, unless serve_stale=False.
+
+    :param key: normalised cache key (see tv_cache_key / film_cache_key)
+    :param scrape: callable returning the playlist dict (writes its own csv & track store rows)
+    :param csv_path: csv export; re-written from the cache if it has been removed
+    :param cache: SQLiteCache (defaults to get_scrape_cache())
+    :param media: Media descriptor; a cached playlist missing from the track store is written to it
+    :param serve_stale: False re-scrapes a stale entry before returning (for short-lived processes)
+    :param force: re-scrape even if the cached entry is fresh
+    :return: playlist dict
+    """
+    cache = cache or get_scrape_cache()
+    playlist, state = cache.get(key)
+
+    if state is None or force or (state == "stale" and not serve_stale):
+        playlist = scrape()
+        if playlist:  # don't cache failed / empty scrapes
+            cache.set(key, playlist)
+        return playlist
+
+    if state == "stale":
+        _refresh_in_background(cache, key, scrape)
+
+    # the builder reads the track store (or the csv), so make sure both exist for cached results
+    # a playlist cached before the track store existed has no episode detail; it is stored as one unnamed episode
+    if media is not None:
+        store = Soundtrack_Track_Store.get_track_store()
+        if not store.has(media):
+            track_writer = store.writer(media)
+            track_writer.write_episode({"index": 0}, list(playlist.items()))
+            track_writer.finish()
+    if not csv_path.exists():
+        Soundtrack_Scraper_utils.save_playlist_csv(playlist, csv_path)
+    return playlist
+
+
+def scrape_soundtrack_tv_cached(tv_show, season_num, serve_stale=True, force=False, **scrape_kwargs):
+    """
+    Cached version of Soundtrack_Scraper_tv.scrape_soundtrack_tv (serve_stale & force: see cached_scrape).
+    """
+    import Soundtrack_Scraper_tv  # the scrapers are only loaded once a scrape is asked for (SQLiteCache users don't need them)
+
+    return cached_scrape(
+        tv_cache_key(tv_show, season_num),
+        lambda: Soundtrack_Scraper_tv.scrape_soundtrack_tv(tv_show, season_num, **scrape_kwargs),
+        Soundtrack_Scraper_utils.tv_playlist_csv_path(tv_show, season_num),
+        media=Media.tv(tv_show, season_num), serve_stale=serve_stale, force=force,
+    )
+
+
+def scrape_soundtrack_tv_series_cached(tv_show, seasons=None, **scrape_kwargs):
+    """
+    Version of Soundtrack_Scraper_tv.scrape_soundtrack_tv_series whose seasons come from the cache
+    (serve_stale & force are passed on to each season, see cached_scrape).
+    """
+    import Soundtrack_Scraper_tv
+
+    return Soundtrack_Scraper_tv.scrape_soundtrack_tv_series(
+        tv_show, seasons, scrape_season=scrape_soundtrack_tv_cached, **scrape_kwargs
+    )
+
+
+def scrape_soundtrack_film_cached(film_name, film_year="", serve_stale=True, force=False, **scrape_kwargs):
+    """
+    Cached version of Soundtrack_Scraper_film.scrape_soundtrack_film (serve_stale & force: see cached_scrape).
+    """
+    import Soundtrack_Scraper_film
+
+    return cached_scrape(
+        film_cache_key(film_name, film_year),
+        lambda: Soundtrack_Scraper_film.scrape_soundtrack_film(film_name, film_year, **scrape_kwargs),
+        Soundtrack_Scraper_utils.film_playlist_csv_path(film_name, film_year),
+        media=Media.film(film_name, film_year), serve_stale=serve_stale, force=force,
+    )
@@ -0,0 +1,87 @@
+# script to checkpoint a tv scrape episode-by-episode
+# usage: Soundtrack_Scraper_tv.py
+
+
+# Soundtrack_Checkpoint.py
+"""
+Per-episode checkpoints for tv scrapes.
+Each episode's tracks are written to a json file as soon as the episode finishes, so a scrape that
+fails part way through can be resumed without re-scraping the completed episodes. The Tunefind track
+count from each episode card is stored alongside, so an incremental refresh only re-scrapes the
+episodes whose count has changed since the last run.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class SeasonCheckpoint:
+    """
+    Checkpoint file for one show/season, eg "Playlist CSV Files/.checkpoints/Game_Of_Thrones_Season_1.json"
+
+    :param tv_show: show name as entered by the user
+    :param season_num: season number
+    :param csv_dir: directory holding the playlist csv files
+    """
+
+    def __init__(self, tv_show, season_num, csv_dir="Playlist CSV Files"):
+        name = '_'.join(word.capitalize() for word in tv_show.split())
+        self.path = Path(csv_dir) / ".checkpoints" / f"{name}_Season_{int(season_num)}.json"
+        self._lock = threading.Lock()
+        self.episodes = {}  # episode url -> {index, title, track_count, tracks, scraped_at}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.episodes = json.load(f).get("episodes", {})
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable checkpoint {self.path}: {e}")
+
+    def should_skip(self, episode, resume=False, refresh=False):
+        """
+        Decides whether an episode can be served from the checkpoint instead of being scraped.
+
+        :param episode: episode dict from the season page (url, track_count)
+        :param resume: skip any episode that already has a checkpoint
+        :param refresh: skip checkpointed episodes whose Tunefind track count hasn't changed
+        :return: True if the checkpointed tracks can be used
+        """
+        saved = self.episodes.get(episode["url"])
+        if saved is None:
+            return False
+        if refresh:
+            return episode.get("track_count") is not None and saved.get("track_count") == episode.get("track_count")
+        return resume
+
+    def tracks_for(self, episode):
+        """
+        :return: checkpointed tracks for an episode as a list of (song, artists) tuples
+        """
+        return [tuple(track) for track in self.episodes[episode["url"]]["tracks"]]
+
+    def save_episode(self, episode, tracks):
+        """
+        Records an episode's tracks & writes the checkpoint file straight away.
+
+        :param episode: episode dict from the season page
+        :param tracks: list of (song, artists) tuples
+        """
+        with self._lock:
+            self.episodes[episode["url"]] = {
+                "index": episode["index"],
+                "title": episode["title"],
+                "track_count": episode.get("track_count"),
+                "tracks": [list(track) for track in tracks],
+                "scraped_at": time.time(),
+            }
+            self._write()
+
+    def _write(self):
+        # write to a temp file then swap it in, so a crash mid-write can't corrupt the checkpoint
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"episodes": self.episodes}, f)
+        os.replace(tmp_path, self.path)
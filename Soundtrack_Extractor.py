@@ -0,0 +1,260 @@
+# script to pull soundtrack info from Tunefind pages without a browser
+# usage: Soundtrack_Scraper_tv.py & Soundtrack_Scraper_film.py
+
+
+# Soundtrack_Extractor.py
+"""
+Browserless extraction engine for Tunefind pages.
+Pages are fetched with the pooled HTTP session from Soundtrack_Scraper_utils and parsed locally
+with lxml, using the same selector dicts as the Selenium scrapers. If the page embeds its JSON
+state, tracks are read from that instead. The Selenium path is only used as a fallback when the
+fast path can't produce a complete track list.
+
+The parse_* functions only take an html string, so they can be run offline against saved pages.
+"""
+
+import json
+import os
+import re
+from collections import deque
+from urllib.parse import urljoin, urlparse
+
+import lxml.html
+
+import Soundtrack_Scraper_utils
+from Soundtrack_Metrics import metrics
+
+# "auto" = HTTP first, Selenium fallback; "http" = never launch a browser; "selenium" = always use the browser
+ENGINES = ("auto", "http", "selenium")
+
+# script tags that frameworks use to ship the page state to the client
+STATE_PATTERNS = [
+    re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S),
+    re.compile(r'window\.__remixContext\s*=\s*(\{.*?\});?\s*</script>', re.S),
+    re.compile(r'window\.__reactRouterContext\s*=\s*(\{.*?\});?\s*</script>', re.S),
+]
+
+
+class ExtractionError(Exception):
+    """Raised when the browserless path can't produce a complete result for a page."""
+
+
+def get_engine(engine=None):
+    """
+    Returns the extraction engine to use; defaults to the SCRAPER_ENGINE env variable, then "auto".
+
+    :param engine: explicit engine name (optional)
+    :return: one of ENGINES
+    """
+    engine = (engine or os.getenv("SCRAPER_ENGINE") or "auto").lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown scraper engine '{engine}'. Choose from: {', '.join(ENGINES)}")
+    return engine
+
+
+def fetch_page(url, timeout=10):
+    """
+    Fetches a page's html over the pooled HTTP session.
+
+    :param url: absolute url
+    :param timeout: seconds to wait for the response
+    :return: html string
+    """
+    with metrics.span("page_fetch"):
+        response = Soundtrack_Scraper_utils.http_session.get(url, timeout=timeout)
+    if response.status_code != 200:
+        raise ExtractionError(f"{url} returned HTTP {response.status_code}")
+    return response.text
+
+
+def extract_embedded_state(html):
+    """
+    Returns the JSON page state embedded in the html, if there is one.
+
+    :param html: page html string
+    :return: parsed JSON (dict) or None
+    """
+    for pattern in STATE_PATTERNS:
+        match = pattern.search(html)
+        if not match:
+            continue
+        try:
+            return json.loads(match.group(1))
+        except ValueError:
+            continue
+    return None
+
+
+def _track_from_state(item):
+    # a track object has a title & a list of artists; returns (song, artists) or None
+    if not isinstance(item, dict):
+        return None
+    song = item.get("name") or item.get("title")
+    artists = item.get("artists")
+    if not isinstance(song, str) or not isinstance(artists, list):
+        return None
+    names = [a.get("name", "") if isinstance(a, dict) else str(a) for a in artists]
+    return song.strip(), Soundtrack_Scraper_utils.join_artists(names)
+
+
+def page_id(url):
+    """
+    Returns the id Tunefind gives a page in its url, eg "12345" for /show/x/season-1/12345 or "inception" for /movie/inception.
+    """
+    return urlparse(url).path.rstrip('/').rsplit('/', 1)[-1]
+
+
+def _breadth_first(root):
+    # yields every dict & list under root, shallowest first
+    queue = deque([root])
+    while queue:
+        node = queue.popleft()
+        if isinstance(node, dict):
+            yield node
+            queue.extend(node.values())
+        elif isinstance(node, list):
+            yield node
+            queue.extend(node)
+
+
+def find_tracks_in_state(state, page):
+    """
+    Reads the requested episode's / film's tracks from the page state.
+    The state also carries other episodes, related titles & so on, so only the node for this page
+    (the shallowest dict whose id or slug is the page id) is searched, & within it the shallowest
+    list made up entirely of track objects is taken.
+
+    :param state: parsed JSON page state
+    :param page: the page's id (see page_id)
+    :return: list of (song, artists) tuples; empty if the page's node or its track list wasn't found
+    """
+    node = next((n for n in _breadth_first(state) if isinstance(n, dict)
+                 and (str(n.get("id")) == page or n.get("slug") == page)), None)
+    if node is None:
+        return []
+    for candidate in _breadth_first(node):
+        if isinstance(candidate, list) and candidate:
+            tracks = [t for t in (_track_from_state(item) for item in candidate) if t]
+            if len(tracks) == len(candidate):
+                return tracks
+    return []
+
+
+def _text(element):
+    return element.text_content().strip()
+
+
+def parse_tracks_html(html, selectors, container_key):
+    """
+    Parses the track list from page html with lxml, mirroring the Selenium scrapers.
+
+    :param html: page html string
+    :param selectors: TV_SELECTORS or FILM_SELECTORS
+    :param container_key: selectors key of the parent div ("episode_div" or "parent_container")
+    :return: list of (song, artists) tuples, in page order; [] if the page says it has no songs,
+             None if no tracks could be parsed
+    """
+    tree = lxml.html.fromstring(html)
+    # an episode / film with no songs listed is a definite (empty) result, not a parse failure
+    is_empty = bool(selectors.get("empty_state") and tree.xpath(selectors["empty_state"]))
+    parents = tree.xpath(selectors[container_key])
+    if not parents:
+        if is_empty:
+            return []
+        raise ExtractionError("Track container not found in page html")
+    parent_div = parents[0]
+
+    # the server only renders an abridged list when there's a "show all tracks" button
+    show_all_xpath = selectors.get("show_all_button")
+    if show_all_xpath and parent_div.xpath(show_all_xpath):
+        raise ExtractionError("Track list is truncated (needs 'Show all tracks')")
+
+    tracks = []
+    for track in parent_div.xpath(selectors["track_container"]):
+        songs = track.xpath(selectors["song"])
+        if not songs:
+            continue
+        artists = Soundtrack_Scraper_utils.join_artists(_text(a) for a in track.xpath(selectors["artist"]))
+        tracks.append((_text(songs[0]), artists))
+    if not tracks and not is_empty:
+        return None
+    return tracks
+
+
+def parse_episode_cards_html(html, selectors, page_url):
+    """
+    Parses the episode cards of a season page.
+
+    :param html: season page html string
+    :param selectors: TV_SELECTORS
+    :param page_url: url the html came from (used to make card links absolute)
+    :return: list of episode dicts (index, title, date, url, track_count)
+    """
+    tree = lxml.html.fromstring(html)
+    episodes = []
+    for j, card in enumerate(tree.xpath(selectors["episode_cards"])):
+        titles = card.xpath('.//h4')
+        dates = card.xpath('.//p[not(contains(text(), "Tracks")) and not(contains(text(), "Questions"))]')
+        episodes.append({
+            "index": j,
+            "title": _text(titles[0]) if titles else f"Episode {j+1}",
+            "date": _text(dates[0]) if dates else "Unknown",
+            "url": urljoin(page_url, card.get("href")),
+            "track_count": Soundtrack_Scraper_utils.parse_track_count(card.text_content()),
+        })
+    return episodes
+
+
+def extract_tracks(url, selectors, container_key, fallback=None, engine=None):
+    """
+    Returns a page's tracks using the configured engine.
+
+    :param url: page url
+    :param selectors: TV_SELECTORS or FILM_SELECTORS
+    :param container_key: selectors key of the parent div
+    :param fallback: callable running the Selenium path; returns the same shape as this function
+                     (required for the "selenium" engine)
+    :param engine: "auto", "http" or "selenium" (optional, see get_engine)
+    :return: list of (song, artists) tuples; [] if the page says it has no songs
+    """
+    engine = get_engine(engine)
+    if engine == "selenium" and fallback is None:
+        raise ValueError("The selenium engine needs a fallback that runs the browser scrape")
+    if engine != "selenium":
+        try:
+            html = fetch_page(url)
+            with metrics.span("track_extraction"):
+                state = extract_embedded_state(html)
+                tracks = find_tracks_in_state(state, page_id(url)) if state else []
+                if not tracks:
+                    tracks = parse_tracks_html(html, selectors, container_key)
+            if tracks is not None:
+                return tracks
+            raise ExtractionError("No tracks found in page html")
+        except Exception as e:
+            if engine == "http" or fallback is None:
+                raise
+            print(f"Fast path failed for {url} ({e}) — falling back to browser.")
+            metrics.count("retries.browser_fallback")
+
+    return fallback()
+
+
+def extract_episodes(season_url, selectors, engine=None, html=None):
+    """
+    Returns the episode cards of a season page without a browser.
+
+    :param season_url: season page url
+    :param selectors: TV_SELECTORS
+    :param engine: "auto", "http" or "selenium" (optional, see get_engine)
+    :param html: the season page's html, if already fetched (optional; fetched from season_url otherwise)
+    :return: list of episode dicts; raises ExtractionError if the browser should be used instead
+    """
+    if get_engine(engine) == "selenium":
+        raise ExtractionError("HTTP engine disabled")
+    if html is None:
+        html = fetch_page(season_url)
+    episodes = parse_episode_cards_html(html, selectors, season_url)
+    if not episodes:
+        raise ExtractionError("No episode cards found in page html")
+    return episodes
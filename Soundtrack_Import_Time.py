@@ -0,0 +1,140 @@
+# script to measure (and guard) how long the entry points take to import
+# usage: python Soundtrack_Import_Time.py [--runs 5] [--budget app=500] [--json]
+
+
+# Soundtrack_Import_Time.py
+"""
+Import-time benchmark for CLI start-up & gunicorn worker spawn.
+Each entry point is imported in a fresh interpreter several times. The median import time is
+checked against a budget, and the run fails if any of the heavy dependencies that are meant to be
+deferred to first use (pandas, spotipy, selenium's webdriver) were loaded by the import. The
+deferred check doesn't depend on machine speed, so it catches a stray top-level import even where
+the time budgets are loose. Exits 1 if any entry point fails.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# entry point -> import time budget (ms, median of --runs)
+BUDGETS = {
+    "Soundtrack_Main": 350,
+    "Soundtrack_Builder": 300,
+    "app": 500,
+}
+
+# modules that must only be imported on first use
+DEFERRED = ["pandas", "spotipy", "selenium.webdriver.remote.webdriver"]
+
+# app.py refuses to import without a session key
+CHILD_ENV = {**os.environ, "FLASK_SECRET_KEY": os.getenv("FLASK_SECRET_KEY") or "import-time-check"}
+
+# run in the child interpreter: time the import, then report which deferred modules it loaded
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [name for name in {deferred!r} if name in sys.modules]}}))
+"""
+
+
+def slowest_imports(module, count=5):
+    """
+    Runs one import under `python -X importtime` & returns the slowest imports it triggered.
+
+    :return: list of (name, cumulative ms), slowest first
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=Path(__file__).parent, env=CHILD_ENV, capture_output=True, text=True)
+    timings = {}
+    for line in result.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        depth = (len(parts[2]) - len(parts[2].lstrip()) - 1) // 2  # indented 2 spaces per level
+        if depth == 1:  # imports made by the module itself, not their dependencies
+            timings[parts[2].strip()] = int(parts[1]) / 1000
+    return sorted(timings.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def measure(module, runs=5):
+    """
+    Imports `module` in `runs` fresh interpreters.
+
+    :return: dict of median / min / max ms & the deferred modules the import loaded
+    """
+    samples = []
+    loaded = set()
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", CHILD_SCRIPT.format(module=module, deferred=DEFERRED)],
+                                cwd=Path(__file__).parent, env=CHILD_ENV, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()}")
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(sample["ms"])
+        loaded.update(sample["loaded"])
+    return {
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": round(min(samples), 1),
+        "max_ms": round(max(samples), 1),
+        "deferred_loaded": sorted(loaded),
+    }
+
+
+def run(budgets, runs=5):
+    """
+    Measures every entry point against its budget.
+
+    :param budgets: dict of module -> budget (ms)
+    :param runs: fresh interpreters per module
+    :return: dict of module -> measurement, budget & ok
+    """
+    report = {}
+    for module, budget in budgets.items():
+        result = measure(module, runs)
+        result["budget_ms"] = budget
+        result["ok"] = result["median_ms"] <= budget and not result["deferred_loaded"]
+        if not result["ok"]:
+            result["slowest_imports"] = slowest_imports(module)
+        report[module] = result
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the import time of the CLI & web-app entry points")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per entry point")
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="override a budget, eg app=800 (repeatable)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    budgets = dict(BUDGETS)
+    for override in args.budget:
+        module, _, ms = override.partition("=")
+        budgets[module] = float(ms)
+
+    report = run(budgets, args.runs)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for module, result in report.items():
+            status = "✅" if result["ok"] else "❌"
+            print(f"{status} {module}: {result['median_ms']:.0f} ms (budget {result['budget_ms']:.0f} ms, "
+                  f"range {result['min_ms']:.0f}-{result['max_ms']:.0f} ms)")
+            if result["deferred_loaded"]:
+                print(f"   imported at start-up: {', '.join(result['deferred_loaded'])}")
+            for name, ms in result.get("slowest_imports", []):
+                print(f"   {ms:7.1f} ms  {name}")
+    return 0 if all(result["ok"] for result in report.values()) else 1
+
+
+#####################################################
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,270 @@
+# script to run scrape & build jobs in the background
+# usage: app.py
+
+
+# Soundtrack_Jobs.py
+"""
+Background job queue for the web-app.
+Scrapes and playlist builds take minutes, so the Flask routes submit them here and return a job
+id straight away; a bounded worker pool runs the jobs. A job submitted while an identical one
+(same kind & show/season or film) is still queued or running is coalesced onto the existing job.
+Each job's status changes, and any progress the job function reports, go to the queue's ProgressBus.
+With a status store (eg the SQLite preview store's "jobs" table), every change is also written there,
+so a worker process other than the one running the job can answer status polls & stream its progress.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from Soundtrack_Preview_Store import get_preview_store
+from Soundtrack_Progress import ProgressBus
+
+
+class Job:
+    """
+    One unit of background work.
+
+    :param kind: "scrape" or "build"
+    :param key: coalescing key, eg "scrape:tv:game-of-thrones:season-1"
+    :param params: the job's inputs (shown in status responses)
+    :param share_result: also write the result to the status store (only for small results, eg a playlist url)
+    """
+
+    def __init__(self, kind, key, params=None, share_result=False):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.params = params or {}
+        self.share_result = share_result
+        self.status = "queued"  # queued -> running -> done | failed
+        self.result = None
+        self.error = None
+        self.error_type = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "error": self.error,
+            "error_type": self.error_type,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    @classmethod
+    def from_dict(cls, record):
+        """
+        Rebuilds a job another worker process wrote to the status store.
+        """
+        job = cls(record["kind"], None, record.get("params"))
+        job.id = record["id"]
+        job.status = record["status"]
+        job.result = record.get("result")
+        job.error = record.get("error")
+        job.error_type = record.get("error_type")
+        job.submitted_at = record.get("submitted_at")
+        job.started_at = record.get("started_at")
+        job.finished_at = record.get("finished_at")
+        return job
+
+
+class JobQueue:
+    """
+    Bounded worker pool with duplicate-request coalescing & queue metrics.
+
+    :param max_workers: jobs run concurrently
+    :param max_finished: finished jobs kept for status/result lookups before the oldest are dropped
+    :param status_store: optional store (get / put) shared with the other worker processes
+    """
+
+    def __init__(self, max_workers=2, max_finished=200, status_store=None):
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # job id -> Job
+        self._in_flight = {}  # coalescing key -> Job
+        self.coalesced = 0
+        self.progress = ProgressBus()
+        self.status_store = status_store
+        self._share_lock = threading.Lock()
+
+    def submit(self, kind, key, fn, *args, params=None, report_progress=False, on_done=None, share_result=False,
+               **kwargs):
+        """
+        Queues fn(*args, **kwargs); returns the already-queued Job if one with the same key is in flight.
+        With report_progress=True, fn is also passed a progress=callback that publishes to the job's channel.
+        on_done(job) is called once fn has returned, before the job is marked done (eg to store its result
+        where other worker processes can read it); if it raises, the job fails. share_result=True also writes
+        the result to the status store.
+
+        :return: Job
+        """
+        with self._lock:
+            existing = self._in_flight.get(key)
+            if existing is not None:
+                self.coalesced += 1
+                return existing
+
+            job = Job(kind, key, params, share_result=share_result)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+            self._trim()
+
+        self._publish(job, {"event": "status", "status": job.status})
+        if report_progress:
+            kwargs["progress"] = lambda **event: self._publish(job, event)
+        self._executor.submit(self._run, job, fn, args, kwargs, on_done)
+        return job
+
+    def _run(self, job, fn, args, kwargs, on_done=None):
+        job.status = "running"
+        job.started_at = time.time()
+        self._publish(job, {"event": "status", "status": job.status})
+        try:
+            job.result = fn(*args, **kwargs)
+            if on_done is not None:
+                on_done(job)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.error_type = type(e).__name__
+            job.status = "failed"
+            print(f"Job {job.kind} {job.params} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._in_flight.get(job.key) is job:
+                    del self._in_flight[job.key]
+            self._publish(job, {"event": "status", "status": job.status, "error": job.error})
+            self.progress.close(job.id)
+
+    def _publish(self, job, event):
+        # to this process's subscribers, then to the status store for the other workers
+        self.progress.publish(job.id, event)
+        if self.status_store is None:
+            return
+        # one writer at a time, so an older status can't land after a newer one
+        with self._share_lock:
+            record = job.to_dict()
+            record["events"] = list(self.progress.channel(job.id).events)
+            if job.share_result:
+                record["result"] = job.result
+            try:
+                self.status_store.put(job.id, record)
+            except Exception as e:
+                print(f"Couldn't share status of job {job.id}: {e}")
+
+    def _trim(self):
+        # drop the oldest finished jobs once there are too many (caller holds the lock)
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _shared(self, job_id):
+        if self.status_store is None:
+            return None
+        return self.status_store.get(job_id)
+
+    def lookup(self, job_id):
+        """
+        Returns the job from this process, or as last written to the status store by another worker.
+
+        :return: Job, or None if no worker knows it
+        """
+        job = self.get(job_id)
+        if job is not None:
+            return job
+        record = self._shared(job_id)
+        return Job.from_dict(record) if record is not None else None
+
+    def status(self, job_id):
+        """
+        :return: the job's status dict with its latest progress event, or None if no worker knows it
+        """
+        job = self.get(job_id)
+        if job is not None:
+            return {**job.to_dict(), "progress": self.progress.latest(job.id)}
+        record = self._shared(job_id)
+        if record is None:
+            return None
+        events = record.pop("events", [])
+        record.pop("result", None)
+        return {**record, "progress": events[-1] if events else None}
+
+    def events(self, job_id, since=0, keepalive=15, poll=1.0):
+        """
+        Yields a job's progress events like ProgressBus.subscribe, wherever the job runs; one running on
+        another worker is followed by re-reading the status store every `poll` seconds.
+        """
+        if self.get(job_id) is not None:
+            yield from self.progress.subscribe(job_id, since=since, keepalive=keepalive)
+            return
+        idle_since = time.time()
+        while True:
+            record = self._shared(job_id)
+            if record is None:
+                return
+            events = record.get("events", [])[since:]
+            for event in events:
+                yield event
+            since += len(events)
+            if record["status"] in ("done", "failed"):
+                return
+            if events:
+                idle_since = time.time()
+            elif time.time() - idle_since >= keepalive:
+                idle_since = time.time()
+                yield None
+            time.sleep(poll)
+
+    def metrics(self):
+        """
+        :return: dict of queue depth & job counts by status
+        """
+        with self._lock:
+            counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {
+            "queue_depth": counts["queued"],
+            "running": counts["running"],
+            "done": counts["done"],
+            "failed": counts["failed"],
+            "max_workers": self.max_workers,
+            "coalesced": self.coalesced,
+        }
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """
+    Returns the process-wide job queue; JOB_WORKERS sets how many jobs run at once.
+    Job statuses are shared through the preview store's "jobs" table (PREVIEW_STORE=sqlite across workers).
+    """
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(max_workers=int(os.getenv("JOB_WORKERS", 2)), status_store=get_preview_store(table="jobs"))
+        return _job_queue
@@ -1,37 +1,65 @@
-import Soundtrack_Scraper_tv
-import Soundtrack_Scraper_film
+import sys
 import Soundtrack_Builder
+import Soundtrack_Batch
+import Soundtrack_Metrics
 
 def build_playlist(tv_show, season_num):
     playlist_url = Soundtrack_Builder.run_soundtrack_builder(tv_show, season_num)
     return playlist_url
 
-if __name__ == "__main__":
-    tv_show = input('Please enter a TV Show to search... \n')
-    season_num = input('Create playlist for which season? \n')
-
-    try:
-        playlist = Soundtrack_Scraper_tv.scrape_soundtrack_tv(tv_show, season_num) # returns a dict
-        #output_file = Soundtrack_Scraper_tv.scrape_soundtrack_tv(tv_show, season_num) # returns a filepath
-    except ValueError as e:
-        print(e)
-        exit()
-
-    Soundtrack_Builder.run_soundtrack_builder(tv_show, season_num)
+def build_playlist_series(tv_show, first_season=None, last_season=None):
+    playlist_url = Soundtrack_Builder.run_soundtrack_builder_series(tv_show, first_season, last_season)
+    return playlist_url
 
 def build_playlist_film(film_name, film_year):
-    playlist_url = Soundtrack_Builder.run_soundtrack_builder(film_name, film_year)
+    playlist_url = Soundtrack_Builder.run_soundtrack_builder_film(film_name, film_year)
     return playlist_url
 
+# interactive: python Soundtrack_Main.py
+# batch:       python Soundtrack_Main.py manifest.csv [options]  (see Soundtrack_Batch.py)
 if __name__ == "__main__":
-    film_name = input('Please enter a film to search... \n')
-    film_year = input('Please enter the year of release... \n')
+    if len(sys.argv) > 1:
+        raise SystemExit(Soundtrack_Batch.main(sys.argv[1:]))
+
+    # the scrapers are only needed for an interactive run; app.py imports this module just for build_playlist
+    import Soundtrack_Scraper_tv
+    import Soundtrack_Scraper_film
+
+    option = input("enter A for tv\nenter B for film\n")
+
+    if option in ("A", "a"):
+        tv_show = input('Please enter a TV Show to search... \n')
+        season_num = input('Create playlist for which season? (a number, a range eg 2-4, or all) \n')
+
+        try:
+            # "all" / "2-4" scrape several seasons into one combined playlist
+            media = Soundtrack_Batch.parse_entry({"kind": "tv", "title": tv_show, "season": season_num})
+            if media.kind == "series":
+                seasons = None if media.season_num is None else range(media.season_num, media.last_season + 1)
+                Soundtrack_Scraper_tv.scrape_soundtrack_tv_series(tv_show, seasons)
+            else:
+                playlist = Soundtrack_Scraper_tv.scrape_soundtrack_tv(tv_show, season_num) # returns a dict
+            #output_file = Soundtrack_Scraper_tv.scrape_soundtrack_tv(tv_show, season_num) # returns a filepath
+        except ValueError as e:
+            print(e)
+            exit()
+
+        if media.kind == "series":
+            build_playlist_series(tv_show, media.season_num, media.last_season)
+        else:
+            build_playlist(tv_show, season_num)
+
+    elif option in ("B", "b"):
+        film_name = input('Please enter a film to search... \n')
+        film_year = input('Please enter the year of release... \n')
+
+        try:
+            playlist = Soundtrack_Scraper_film.scrape_soundtrack_film(film_name, film_year) # returns a dict
+        except ValueError as e:
+            print(e)
+            exit()
 
-    try:
-        playlist = Soundtrack_Scraper_film.scrape_soundtrack_film(film_name, film_year) # returns a dict
-        #output_file = Soundtrack_Scraper_tv.scrape_soundtrack_tv(tv_show, season_num) # returns a filepath
-    except ValueError as e:
-        print(e)
-        exit()
+        build_playlist_film(film_name, film_year)
 
-    Soundtrack_Builder.run_soundtrack_builder(tv_show, season_num)
+    # where the time went: page loads, Spotify searches, retries & cache hits (see Soundtrack_Metrics.py)
+    Soundtrack_Metrics.print_summary()
@@ -0,0 +1,92 @@
+# script to describe the tv season / film a playlist is built for
+# usage: Soundtrack_Builder.py, Soundtrack_Cache.py & Soundtrack_Scraper_utils.py
+
+
+# Soundtrack_Media.py
+"""
+Media descriptors: one object that knows the file, playlist & cache naming conventions for a tv
+season, a run of seasons or a film, so the scraper, builder and cache don't each rebuild them
+from strings.
+"""
+
+from pathlib import Path
+
+
+class Media:
+    """
+    A tv season, a run of seasons (a "series" playlist) or a film.
+
+    :param kind: "tv", "series" or "film"
+    :param title: show / film name as entered by the user
+    :param season_num: season number (tv) or first season (series; None = every season)
+    :param year: year of release (film only; some films omit it)
+    :param last_season: last season (series only; None = every season)
+    """
+
+    def __init__(self, kind, title, season_num=None, year="", last_season=None):
+        if kind not in ("tv", "series", "film"):
+            raise ValueError(f"Unknown media kind '{kind}'")
+        if kind == "tv" and season_num is None:
+            raise ValueError("A tv season needs a season number")
+        if kind == "series" and (season_num is None) != (last_season is None):
+            raise ValueError("A season range needs both a first & last season")
+        if kind == "series" and season_num is not None and int(season_num) > int(last_season):
+            raise ValueError(f"Season range {season_num}-{last_season} is reversed (use {last_season}-{season_num})")
+        self.kind = kind
+        self.title = title
+        self.season_num = int(season_num) if season_num is not None else None
+        self.last_season = int(last_season) if last_season is not None else None
+        self.year = str(year or "")
+
+    @classmethod
+    def tv(cls, tv_show, season_num):
+        return cls("tv", tv_show, season_num=season_num)
+
+    @classmethod
+    def series(cls, tv_show, first_season=None, last_season=None):
+        return cls("series", tv_show, season_num=first_season, last_season=last_season)
+
+    @classmethod
+    def film(cls, film_name, film_year=""):
+        return cls("film", film_name, year=film_year)
+
+    def __repr__(self):
+        if self.kind == "series":
+            return f"Media('series', {self.title!r}, season_num={self.season_num!r}, last_season={self.last_season!r})"
+        return f"Media({self.kind!r}, {self.title!r}, season_num={self.season_num!r}, year={self.year!r})"
+
+    @property
+    def file_stem(self):
+        # standardised filename prefix, eg "Game_Of_Thrones_Season_1", "Game_Of_Thrones_Seasons_2-4",
+        # "Game_Of_Thrones_All_Seasons" or "The_Hangover_2009"
+        stem = '_'.join(word.capitalize() for word in self.title.split())
+        if self.kind == "tv":
+            return f"{stem}_Season_{self.season_num}"
+        if self.kind == "series":
+            if self.season_num is None:
+                return f"{stem}_All_Seasons"
+            return f"{stem}_Seasons_{self.season_num}-{self.last_season}"
+        return f"{stem}_{self.year}" if self.year else stem
+
+    @property
+    def playlist_name(self):
+        # Spotify playlist name, eg "Game Of Thrones Season 1" or "The Hangover 2009"
+        return self.file_stem.replace('_', ' ')
+
+    @property
+    def key(self):
+        # normalised key used by the caches, eg "tv:game-of-thrones:season-1" or "film:the-hangover:2009"
+        slug = '-'.join(self.title.lower().split())
+        if self.kind == "tv":
+            return f"tv:{slug}:season-{self.season_num}"
+        if self.kind == "series":
+            if self.season_num is None:
+                return f"series:{slug}:all"
+            return f"series:{slug}:seasons-{self.season_num}-{self.last_season}"
+        return f"film:{slug}:{self.year}" if self.year else f"film:{slug}"
+
+    def csv_path(self, csv_dir="Playlist CSV Files"):
+        return Path(csv_dir) / f"{self.file_stem}_Playlist.csv"
+
+    def missing_log_path(self, csv_dir="Playlist CSV Files", timestamp=""):
+        return Path(csv_dir) / f"{self.file_stem}_missing_tracks_log_{timestamp}.txt"
@@ -0,0 +1,130 @@
+# script to time & count the hot paths of the scraper, builder & web-app
+# usage: Soundtrack_Browser_Pool.py, Soundtrack_Scraper_*.py, Soundtrack_Extractor.py, Soundtrack_Builder.py,
+#        Soundtrack_Resolver.py, Soundtrack_Cache.py, Soundtrack_Main.py, Soundtrack_Batch.py & app.py (/metrics)
+
+
+# Soundtrack_Metrics.py
+"""
+Process-wide timing spans & counters.
+A span times one step (a page load, a Spotify search, a playlist write) and keeps the count, total,
+max, error count & recent durations (for p50 / p95) per span name; a counter is a plain running
+total (WebDriver calls, retries, cache hits, skipped episodes). Both are cheap enough for the hot
+paths, are thread-safe, and are read through summary(): from the /metrics endpoint of app.py, and
+as the JSON summary printed at the end of CLI & batch runs.
+
+Spans: page_load, page_fetch, cookie_handling, modal_probe, show_all_click, track_extraction,
+spotify_search, playlist_read, playlist_write. Page-ready waits, which also probe for the login
+modal, are timed per page type by Soundtrack_Readiness.py and included in summary().
+Counters: webdriver_calls, retries.spotify_rate_limit, retries.browser_fallback,
+retries.per_element_extraction, cache.<table>.hit / .stale / .miss,
+episodes.scraped / .skipped / .from_checkpoint.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import Soundtrack_Readiness
+import Soundtrack_Blocking
+
+# durations kept per span for the percentiles
+RECENT_SAMPLES = 500
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Metrics:
+    """
+    Named timing spans & counters.
+    """
+
+    def __init__(self):
+        self._spans = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    @contextmanager
+    def span(self, name):
+        """
+        Times the body of a `with` block under `name`; an exception is counted as an error & re-raised.
+        """
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, failed)
+
+    def record(self, name, seconds, failed=False):
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = {"count": 0, "errors": 0, "total": 0.0, "max": 0.0,
+                                             "recent": deque(maxlen=RECENT_SAMPLES)}
+            stats["count"] += 1
+            stats["errors"] += failed
+            stats["total"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            stats["recent"].append(seconds)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """
+        :return: dict of spans (name -> count, errors, total / avg / p50 / p95 / max seconds) & counters
+        """
+        with self._lock:
+            spans = {
+                name: {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "total": round(stats["total"], 3),
+                    "avg": round(stats["total"] / stats["count"], 4),
+                    "p50": round(_percentile(stats["recent"], 0.5), 4),
+                    "p95": round(_percentile(stats["recent"], 0.95), 4),
+                    "max": round(stats["max"], 4),
+                }
+                for name, stats in sorted(self._spans.items())
+            }
+            return {
+                "uptime": round(time.time() - self.started_at, 1),
+                "spans": spans,
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+
+metrics = Metrics()
+
+
+def summary():
+    """
+    The full metrics picture: spans & counters, plus the browser readiness waits (Soundtrack_Readiness.py)
+    and page weight by blocking profile (Soundtrack_Blocking.py).
+    """
+    return {**metrics.snapshot(), "readiness": Soundtrack_Readiness.readiness_stats.snapshot(),
+            "page_weight": Soundtrack_Blocking.page_weight_stats.snapshot()}
+
+
+def print_summary():
+    """
+    Prints summary() as JSON; called at the end of CLI & batch runs.
+    """
+    print("📊 Metrics:")
+    print(json.dumps(summary(), indent=2))
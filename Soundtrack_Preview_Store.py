@@ -0,0 +1,101 @@
+# script to hold scraped playlists between the preview page & /confirm, & job statuses between workers
+# usage: app.py
+
+
+# Soundtrack_Preview_Store.py
+"""
+Keyed, size-bounded, TTL-evicting store for playlist previews.
+Each preview is stored under its own id (the scrape job id), so concurrent users no longer
+overwrite each other. The in-memory backend is per process; the SQLite backend lets several
+gunicorn workers share previews, so /confirm never has to re-scrape on a different worker.
+The same stores, in their own table, hold each background job's status & progress so any worker
+can answer a status poll (see Soundtrack_Jobs.py).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from Soundtrack_Cache import SQLiteCache
+
+
+class MemoryPreviewStore:
+    """
+    In-process store; the least recently used previews are dropped past `max_entries`.
+
+    :param ttl: seconds a preview is kept
+    :param max_entries: size bound
+    """
+
+    def __init__(self, ttl=3600, max_entries=500):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLitePreviewStore:
+    """
+    Store backed by an SQLite file shared by every worker process on the machine.
+
+    :param path: SQLite database file
+    :param ttl: seconds a preview is kept
+    :param max_entries: size bound
+    :param table: table the entries are kept in
+    """
+
+    def __init__(self, path, ttl=3600, max_entries=500, table="previews"):
+        self._cache = SQLiteCache(path, table=table, ttl=ttl, stale_ttl=0, max_entries=max_entries)
+
+    def get(self, key):
+        value, state = self._cache.get(key)
+        return value if state is not None else None
+
+    def put(self, key, value):
+        self._cache.set(key, value)
+
+    def delete(self, key):
+        self._cache.delete(key)
+
+
+def get_preview_store(table="previews"):
+    """
+    Builds the preview store from env settings:
+    PREVIEW_STORE=memory (default) or sqlite, PREVIEW_STORE_PATH, PREVIEW_TTL & PREVIEW_MAX_ENTRIES.
+    Set PREVIEW_STORE=sqlite whenever the web-app runs more than one worker process.
+
+    :param table: SQLite table, eg "jobs" for the shared job statuses
+    """
+    ttl = int(os.getenv("PREVIEW_TTL", 3600))
+    max_entries = int(os.getenv("PREVIEW_MAX_ENTRIES", 500))
+    backend = os.getenv("PREVIEW_STORE", "memory").lower()
+    if backend == "sqlite":
+        return SQLitePreviewStore(os.getenv("PREVIEW_STORE_PATH", "previews.sqlite3"), ttl=ttl, max_entries=max_entries,
+                                  table=table)
+    if backend != "memory":
+        raise ValueError(f"Unknown PREVIEW_STORE '{backend}'. Choose from: memory, sqlite")
+    return MemoryPreviewStore(ttl=ttl, max_entries=max_entries)
@@ -0,0 +1,102 @@
+# script to pass scrape progress from the scrapers to the web-app
+# usage: Soundtrack_Jobs.py, Soundtrack_Scraper_tv.py & app.py
+
+
+# Soundtrack_Progress.py
+"""
+In-memory progress event bus.
+Each job gets its own channel; the scrapers publish events to it (episode index, track counts,
+elapsed time) through a plain callback and the web-app streams them to the browser with
+server-sent events. Nothing touches the disk, and concurrent scrapes can't overwrite each other.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ProgressChannel:
+    """
+    Ordered list of events for one job; readers block until a new event arrives or the channel closes.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def publish(self, event):
+        with self.condition:
+            event = dict(event, seq=len(self.events), time=time.time())
+            self.events.append(event)
+            self.condition.notify_all()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def wait(self, since, timeout):
+        """
+        Returns the events after index `since`, waiting up to `timeout` seconds for one to arrive.
+
+        :return: (events, closed)
+        """
+        with self.condition:
+            if len(self.events) <= since and not self.closed:
+                self.condition.wait(timeout)
+            return self.events[since:], self.closed
+
+
+class ProgressBus:
+    """
+    Progress channels keyed by job id; the oldest channels are dropped once there are `max_channels`.
+    """
+
+    def __init__(self, max_channels=200):
+        self.max_channels = max_channels
+        self._channels = OrderedDict()
+        self._lock = threading.Lock()
+
+    def channel(self, job_id, create=True):
+        with self._lock:
+            channel = self._channels.get(job_id)
+            if channel is None and create:
+                channel = self._channels[job_id] = ProgressChannel()
+                while len(self._channels) > self.max_channels:
+                    self._channels.popitem(last=False)
+            return channel
+
+    def publish(self, job_id, event):
+        self.channel(job_id).publish(event)
+
+    def publisher(self, job_id):
+        """
+        Returns a callback the scrapers can call with keyword arguments, eg progress(event="episode", ...).
+        """
+        return lambda **event: self.publish(job_id, event)
+
+    def close(self, job_id):
+        self.channel(job_id).close()
+
+    def latest(self, job_id):
+        channel = self.channel(job_id, create=False)
+        if channel is None or not channel.events:
+            return None
+        return channel.events[-1]
+
+    def subscribe(self, job_id, since=0, keepalive=15):
+        """
+        Yields each event for a job as it is published, until the channel closes.
+        Yields None every `keepalive` seconds without an event so callers can keep the connection open.
+        """
+        channel = self.channel(job_id)
+        while True:
+            events, closed = channel.wait(since, keepalive)
+            if not events and not closed:
+                yield None
+            for event in events:
+                yield event
+            since += len(events)
+            if closed and since >= len(channel.events):
+                return
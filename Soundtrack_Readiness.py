@@ -0,0 +1,130 @@
+# script to wait for a Tunefind page to be ready in a Selenium browser
+# usage: Soundtrack_Browser_Pool.py, Soundtrack_Scraper_utils.py, Soundtrack_Scraper_tv.py & Soundtrack_Scraper_film.py
+
+
+# Soundtrack_Readiness.py
+"""
+Event-driven page readiness.
+Rather than a fixed WebDriverWait per element (10 s for a cookie banner that isn't there, 5 s for a
+login modal that never appears), one async script watches the DOM with a MutationObserver and
+returns as soon as any of the expected outcomes shows up: the track container, a login modal, an
+empty-state message or a 404 page. It also reports whether the cookie banner is showing, so no
+separate wait is needed for it, and the page weight loaded so far. Each wait is timed and recorded
+per page type.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from selenium.common.exceptions import TimeoutException
+
+# arguments: [[outcome, xpath], ...] in priority order, cookie banner xpath (or null), timeout in ms, callback
+READINESS_SCRIPT = """
+const [outcomes, cookieXpath, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const exists = xpath => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== null;
+const check = () => {
+    if (/page not found|\\b404\\b/i.test(document.title)) return "not_found";
+    for (const [name, xpath] of outcomes) {
+        if (exists(xpath)) return name;
+    }
+    return null;
+};
+let settled = false;
+let observer, timer, poll;
+const finish = outcome => {
+    if (settled) return;
+    settled = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    clearInterval(poll);
+    // page weight so far, for the resource-blocking stats (see Soundtrack_Blocking.py)
+    const nav = performance.getEntriesByType("navigation")[0];
+    const resources = performance.getEntriesByType("resource");
+    const bytes = resources.reduce((total, r) => total + (r.transferSize || 0), nav ? nav.transferSize || 0 : 0);
+    done({
+        outcome: outcome,
+        cookie_banner: cookieXpath ? exists(cookieXpath) : false,
+        weight: {requests: resources.length + 1, bytes: bytes}
+    });
+};
+const attempt = () => {
+    const outcome = check();
+    if (outcome) finish(outcome);
+};
+observer = new MutationObserver(attempt);
+observer.observe(document.documentElement, {childList: true, subtree: true});
+timer = setTimeout(() => finish(null), timeoutMs);
+poll = setInterval(attempt, 250);  // title changes aren't always DOM mutations
+attempt();
+"""
+
+PageState = namedtuple("PageState", ["outcome", "cookie_banner", "waited", "weight"])
+
+
+class ReadinessStats:
+    """
+    Per-page-type wait times & outcome counts, eg {"episode": {"count": 10, "avg_wait": 0.41, ...}}.
+    """
+
+    def __init__(self):
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def record(self, page, outcome, waited):
+        with self._lock:
+            stats = self._pages.setdefault(page, {"count": 0, "total_wait": 0.0, "max_wait": 0.0, "outcomes": {}})
+            stats["count"] += 1
+            stats["total_wait"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+            stats["outcomes"][outcome] = stats["outcomes"].get(outcome, 0) + 1
+
+    def snapshot(self):
+        """
+        :return: dict of page type -> count, total/avg/max wait (seconds) & outcome counts
+        """
+        with self._lock:
+            return {
+                page: {
+                    "count": stats["count"],
+                    "total_wait": round(stats["total_wait"], 3),
+                    "avg_wait": round(stats["total_wait"] / stats["count"], 3),
+                    "max_wait": round(stats["max_wait"], 3),
+                    "outcomes": dict(stats["outcomes"]),
+                }
+                for page, stats in self._pages.items()
+            }
+
+
+readiness_stats = ReadinessStats()
+
+
+def wait_for_page(browser, outcomes, page="page", cookie_xpath=None, timeout=10):
+    """
+    Waits for whichever expected outcome appears first, in one WebDriver call.
+
+    :param browser: Selenium WebDriver instance
+    :param outcomes: dict of outcome name -> xpath, in priority order (eg login_modal before tracks)
+    :param page: page type the wait time is recorded under, eg "episode"
+    :param cookie_xpath: cookie banner xpath to report on, or None
+    :param timeout: seconds before giving up
+    :return: PageState(outcome, cookie_banner, waited, weight); outcome is one of the keys of `outcomes`,
+             "not_found" or "timeout"; weight is {"requests", "bytes"} loaded so far (None if the script never returned)
+    """
+    started = time.monotonic()
+    result = None
+    try:
+        browser.set_script_timeout(timeout + 5)
+        result = browser.execute_async_script(
+            READINESS_SCRIPT, [[name, xpath] for name, xpath in outcomes.items()], cookie_xpath, int(timeout * 1000)
+        )
+    except TimeoutException:
+        pass
+    waited = time.monotonic() - started
+
+    result = result if isinstance(result, dict) else {}
+    outcome = result.get("outcome") or "timeout"
+    readiness_stats.record(page, outcome, waited)
+    return PageState(outcome, bool(result.get("cookie_banner")), waited, result.get("weight"))
@@ -0,0 +1,97 @@
+# script to resolve playlist rows to Spotify track uris concurrently
+# usage: Soundtrack_Builder.py
+
+
+# Soundtrack_Resolver.py
+"""
+Concurrent Spotify search resolution.
+Rows are resolved on a bounded thread pool sharing the builder's pooled Spotify session. When
+Spotify answers 429 Too Many Requests, every worker backs off for the Retry-After period (not
+just the one that was throttled) before the request is retried. Results come back in row order.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Soundtrack_Metrics import metrics
+
+
+class RateLimiter:
+    """
+    Backoff window shared by every resolver worker.
+    """
+
+    def __init__(self):
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.throttled = 0  # number of 429 responses seen
+
+    def wait(self):
+        # sleep until any active backoff window has passed
+        while True:
+            with self._lock:
+                remaining = self._blocked_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def backoff(self, seconds):
+        with self._lock:
+            self.throttled += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class RateLimitedSpotify:
+    """
+    Wraps a spotipy client so search() waits out shared backoff windows & retries 429 responses.
+    Every other attribute is passed straight through to the wrapped client.
+
+    :param sp: spotipy.Spotify client
+    :param limiter: RateLimiter shared by the workers
+    :param max_retries: 429 retries per search before giving up
+    """
+
+    def __init__(self, sp, limiter, max_retries=5):
+        self._sp = sp
+        self._limiter = limiter
+        self._max_retries = max_retries
+
+    def __getattr__(self, name):
+        return getattr(self._sp, name)
+
+    def search(self, *args, **kwargs):
+        # spotipy is imported on first use (see Soundtrack_Builder.get_spotify_client); by now it's already loaded
+        from spotipy.exceptions import SpotifyException
+
+        for attempt in range(self._max_retries + 1):
+            self._limiter.wait()
+            try:
+                return self._sp.search(*args, **kwargs)
+            except SpotifyException as e:
+                if e.http_status != 429 or attempt == self._max_retries:
+                    raise
+                retry_after = (e.headers or {}).get("Retry-After", 1)
+                try:
+                    retry_after = float(retry_after)
+                except (TypeError, ValueError):
+                    retry_after = 1.0
+                print(f"⏳ Spotify rate limit hit — backing off {retry_after:g}s")
+                metrics.count("retries.spotify_rate_limit")
+                self._limiter.backoff(retry_after)
+
+
+def resolve_tracks(sp, rows, resolve_one, max_workers=8):
+    """
+    Resolves (song, artist) rows concurrently.
+
+    :param sp: spotipy.Spotify client
+    :param rows: list of (song, artist) tuples
+    :param resolve_one: callable(sp, song, artist) -> uri or None (eg the builder's cached resolve_track)
+    :param max_workers: maximum number of searches in flight
+    :return: list of uri-or-None, in the same order as rows
+    """
+    limited_sp = RateLimitedSpotify(sp, RateLimiter())
+    workers = max(1, min(max_workers, len(rows) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda row: resolve_one(limited_sp, row[0], row[1]), rows))
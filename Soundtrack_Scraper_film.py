@@ -1,101 +1,74 @@
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-import pandas as pd
-from pathlib import Path
 import os
 import Soundtrack_Scraper_utils
-
-def scrape_soundtrack_film(film_name, film_year=""):
+import Soundtrack_Browser_Pool
+import Soundtrack_Extractor
+import Soundtrack_Slugs
+import Soundtrack_Track_Store
+from Soundtrack_Media import Media
+
+# pool defaults to the shared warm browser pool (see Soundtrack_Browser_Pool.py)
+def scrape_soundtrack_film(film_name, film_year="", pool=None):
     
     playlist = {}  # dict to hold each artist:song kv pair
-    selectors = { # dict to hold the xpath strings 
-        "cookies_agree_button": '//button[span[text()="AGREE"]]',
-        "login_modal": '//div[contains(@class, "modal")]//h1[contains(text(), "Log in")]',
-        "show_all_button": './/button[.//p[text()="Show all tracks"]]',
-        "parent_container": '//div[contains(@class, "scroll-mt-20")]', # holds various track_containers
-        "track_container": './/div[contains(@class, "flex flex-col")]', # song/artist container (within parent_container)
-        "song": './/p[contains(@class, "font-bold") and contains(@class, "text-[1rem]")]',
-        "artist": './/a[@data-discover="true" and contains(@href, "/artist/")]/small'
-    }
-    
-    # Headless Firefox configuration
-    options = Options()
-    options.headless = False  # Enable headless mode / True = don't show browser   
-    
-    baseURL = "https://www.tunefind.com/movie/"
-    film_name = film_name.split()
-    film_name_clean = '-'.join(film_name)
-    # some films omit the release year in the url (example: the hangover)
-    if film_year != "":
-        builtURL = baseURL + film_name_clean + '-' + film_year
-    else:
-        builtURL = baseURL + film_name_clean
+    selectors = Soundtrack_Scraper_utils.FILM_SELECTORS # dict to hold the xpath strings
     
-    # set browser object & open url
-    browser = webdriver.Firefox(options = options) # Use options when initializing the WebDriver
-    browser.get(builtURL)
-    Soundtrack_Scraper_utils.handle_cookies(browser, selectors)
+    # browsers are leased from the shared warm pool rather than started per scrape
+    if pool is None:
+        pool = Soundtrack_Browser_Pool.get_browser_pool()
+
+    baseURL = Soundtrack_Scraper_utils.TUNEFIND_BASE_URL + "/movie/"
+    # normalised & checked over HTTP, trying with & without the year since some films omit it (example: the hangover)
+    # raises ValueError if the film isn't on Tunefind, before any browser is leased
+    builtURL = baseURL + Soundtrack_Slugs.resolve_film_slug(film_name, film_year)
     
-    soundtrack_container = selectors["parent_container"]
-    # Locate the parent div element
-    parent_div = browser.find_element(By.XPATH, soundtrack_container)
-
-    # the "show all tracks" button is located within the parent_div, hence why we pass the parent_div as an argument
-    # this function call is inconsistent when we don't use the parent_div, ie we just search for the "show all tracks" button xpath
-    Soundtrack_Scraper_utils.click_show_all(browser, selectors,parent_div) # Click "Show All" if present
-
-    track_containers = parent_div.find_elements(By.XPATH, selectors["track_container"])
-    for track in track_containers:
-        try:
-            # Extract song title
-            song = track.find_element(By.XPATH, selectors["song"]).text.strip()
-
-            # Extract all artist names within this track container
-            artist_links = track.find_elements(By.XPATH, selectors["artist"])
-            artists = ', '.join(artist.text.replace('\n', '').strip().rstrip(',') for artist in artist_links if artist.text.strip()) # handles multiple contributing artists (ie as one collection)
-
-            playlist[song] = artists
-        except Exception as e:
-            print(f"Issue extracting track info: {e}")
+    # Selenium path; only used if the page can't be parsed over plain HTTP (see Soundtrack_Extractor.py)
+    def scrapeWithPooledBrowser():
+        # lease a browser & open url
+        with pool.browser() as pooled:
+            browser = pooled.driver
+            pooled.load(builtURL)
+
+            # wait for whichever comes first: the track list, a login modal, an empty soundtrack or a 404
+            outcome = pooled.wait_ready(selectors, Soundtrack_Scraper_utils.page_outcomes(selectors, "parent_container"), page="film")
+            if outcome == "empty":
+                print("No tracks listed.")
+                return []
+            if outcome != "tracks":
+                raise TimeoutException(f"Soundtrack not found ({outcome})")
+
+            soundtrack_container = selectors["parent_container"]
+            # Locate the parent div element
+            parent_div = browser.find_element(By.XPATH, soundtrack_container)
+
+            # the "show all tracks" button is located within the parent_div, hence why we pass the parent_div as an argument
+            # this function call is inconsistent when we don't use the parent_div, ie we just search for the "show all tracks" button xpath
+            Soundtrack_Scraper_utils.click_show_all(browser, selectors,parent_div) # Click "Show All" if present
+
+            # all song & artist text within the parent div comes back from one injected script
+            return Soundtrack_Scraper_utils.collect_tracks(browser, selectors, parent_div)
+
+    tracks = Soundtrack_Extractor.extract_tracks(builtURL, selectors, "parent_container", fallback=scrapeWithPooledBrowser)
+    for song, artists in tracks:
+        playlist[song] = artists
+
+    # the film is stored as a single "episode", keeping every track in page order (see Soundtrack_Track_Store.py)
+    media = Media.film(film_name, film_year)
+    track_writer = Soundtrack_Track_Store.get_track_store().writer(media)
+    track_writer.write_episode({"index": 0, "title": film_name, "url": builtURL}, tracks)
+    track_writer.finish()
 
     for k,v in playlist.items():
         print(f'{k}: {v}')
     print(f'playlist length: {len(playlist)}')
 
-    # placeholder filename
-    words = film_name_clean.split("-")
-    output_filename = '_'.join(word.capitalize() for word in words)
-    if film_year != "":
-        output_filename += f"_{film_year}_Playlist.csv"
-    else:
-        output_filename += f"_Playlist.csv" 
-
-    # using Path, create a dir to hold playlist csv files in the cwd
-    # create dir if it doesn't exist; it won't crash if dir already exists
-    output_dir = Path("Playlist CSV Files")
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_file = output_dir / output_filename
-    # print(input(output_file))
-
-    # use pandas module to create a dataframe of the playlist
-    df_playlist = pd.DataFrame(list(playlist.items()), columns=["Song", "Artist"])
-    df_playlist.to_csv(output_file, index=False)
+    # export the playlist as a csv in a standardised format, eg "The_Hangover_2009_Playlist.csv"
+    output_file = Soundtrack_Scraper_utils.film_playlist_csv_path(film_name, film_year)
+    track_writer.store.export_csv(media, output_file)
     print()
 
-    # Check if the file was created successfully
-    if output_file.exists():
-        print(f"Playlist saved successfully to: {output_file}")
-    else:
-        print(f"Error: Failed to save playlist to {output_file}") 
-
-    # close browser
-    browser.quit()
-
     return playlist # dict
 
 
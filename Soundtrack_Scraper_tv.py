@@ -5,32 +5,27 @@
 # A Ridyard 
 
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-import pandas as pd
-from pathlib import Path
-import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import Soundtrack_Scraper_utils
+import Soundtrack_Browser_Pool
+import Soundtrack_Extractor
+import Soundtrack_Checkpoint
+import Soundtrack_Slugs
+import Soundtrack_Track_Store
+from Soundtrack_Media import Media
+from Soundtrack_Metrics import metrics
 
 def handleCookies(browser, selectors):
-    # Called when navigating to new browser instance or web page; clear the "cookies" pop-up
-    # Wait for the cookies "AGREE" button to be present and clickable
-    agree_button_xpath = selectors["cookies_agree_button"]
-    try:
-        agree_button = WebDriverWait(browser, 10).until(
-            EC.element_to_be_clickable((By.XPATH, agree_button_xpath)))
-        agree_button.click()  # Click the "AGREE" button
-    except:
-        print("No cookies popup found.")
+    # Called when navigating to new browser instance or web page; clear the "cookies" pop-up if it is showing
+    Soundtrack_Scraper_utils.handle_cookies(browser, selectors)
 
 
 def findGivenElements(browser, xpath_in):
-    # accepts an xpath argument & returns a list of corresponding elements 
-    WebDriverWait(browser, 10).until(EC.presence_of_element_located((By.XPATH, xpath_in)))
-    return browser.find_elements(By.XPATH, xpath_in)
+    # accepts an xpath argument & returns a list of corresponding elements, as soon as they appear (or the page 404s)
+    return Soundtrack_Scraper_utils.find_given_elements(browser, xpath_in)
 
 
 def showAllClick(browser, selectors, parent_div_in):
@@ -40,8 +35,9 @@ def showAllClick(browser, selectors, parent_div_in):
         showAllButtons = parent_div_in.find_elements(By.XPATH, showAllButt_xpath)
         if showAllButtons:
             showAllButt = showAllButtons[0]
-            browser.execute_script("arguments[0].scrollIntoView(true);", showAllButt)
-            browser.execute_script("arguments[0].click();", showAllButt)
+            with metrics.span("show_all_click"):
+                browser.execute_script("arguments[0].scrollIntoView(true);", showAllButt)
+                browser.execute_script("arguments[0].click();", showAllButt)
         # debugging line
         # else:
         #     print("No 'Show All' button present — skipping expansion.")
@@ -50,105 +46,18 @@ def showAllClick(browser, selectors, parent_div_in):
 
 
 # occasionally the website will throw a "please log in" page; this function handles such events
+# checks the current page only; page loads wait for a modal as one of their readiness outcomes instead
 def isLoginModalPresent(browser, selectors):
-    try:
-        modal_xpath = selectors["login_modal"]
-        WebDriverWait(browser, 5).until(EC.presence_of_element_located((By.XPATH, modal_xpath)))
-        return True
-    except:
-        return False
+    return Soundtrack_Scraper_utils.is_login_modal_present(browser, selectors)
 
 
-# the main scraping function; this function will call other functions in this script
-def scrape_soundtrack_tv(tv_show, season_num):
-
-    season_num = int(season_num)
-    playlist = {}  # dict to hold each artist:song kv pair
-    selectors = { # dict to hold the xpath strings 
-        "cookies_agree_button": '//button[span[text()="AGREE"]]',
-        "season_links": '//a[contains(@href, "/show/") and contains(@href, "/season-")]',
-        "episode_cards": '//a[contains(@class, "card-border") and @data-discover="true"]',
-        "login_modal": '//div[contains(@class, "modal")]//h1[contains(text(), "Log in")]',
-        "episode_div": '//div[contains(@class, "scroll-mt-20")]', # holds various track containers
-        "show_all_button": './/button[.//p[text()="Show all tracks"]]',
-        "track_container": './/div[contains(@class, "flex flex-col")]',  # song/artist container (within the parent episode_div) 
-        "song": './/p[contains(@class, "font-bold") and contains(@class, "text-[1rem]")]',
-        "artist": './/a[@data-discover="true" and contains(@href, "/artist/")]/small'
-    }
-
-
-    # Headless Firefox configuration
-    options = Options()
-    options.headless = True  # Enable headless mode / True = don't show browser
-
-    # build the url from which we will scrape the soundtrack list
-    baseURL = 'https://www.tunefind.com/show/'
-    #tv_show = input('Please enter a TV Show to search...').split()
-    tv_show = tv_show.split()
-    tvShowClean = '-'.join(tv_show)  # replace whitespaces with '-' in url
-    builtUrl = baseURL + tvShowClean
-
-    # set browser object & open url
-    browser = webdriver.Firefox(options = options) # Use options when initializing the WebDriver
-    browser.get(builtUrl)
-    handleCookies(browser, selectors)
-
-    ###################################################
-
-    # xpath of the show's seasons
-    season_element_xpath = selectors["season_links"]
-    season_elements = findGivenElements(browser, season_element_xpath)
-    # for season in season_elements:
-    #     print(season.text.strip())
-    # print(input("here"))
-
-    # amended the way we collect season_num (passed in as an function argument)
-    # # choose the season to pull track listing from
-    # if len(season_elements) > 1:
-    #     currChoice = int(input(f'Scrape the soundtrack for which season?\n1-{str(len(season_elements))} \n'))
-    # else:
-    #     print(f'scraping soundtrack for {" ".join(tv_show)} season 1')
-    #     currChoice = 1
-
-    if season_num <1 or  season_num > len(season_elements):
-        browser.quit()
-        raise ValueError(f"Season {season_num} is out of range. Available: 1-{len(season_elements)}")
-
-    else:
-        currChoice = season_num
-
-
-    # Click into the corresponding season link
-    browser.execute_script("arguments[0].click();", season_elements[currChoice-1])
-
-
-    ###################################################
-
-    # xpath of "episode" elements within each season
-    episode_element_xpath = selectors["episode_cards"]
-    episode_elements = findGivenElements(browser, episode_element_xpath)
-
-    #print(f"🔍 Found {len(episode_elements)} episodes.")
-    # for j in range(len(episode_elements)):
-
-    #     # Re-fetch the elements after each navigation to avoid stale element exception
-    #     episode_elements = findGivenElements(browser, episode_element_xpath)
-    #     episode = episode_elements[j]
-
-
-    ##############################
-    num_episodes = len(findGivenElements(browser, episode_element_xpath))
-    for j in range(num_episodes):
-        episode_elements = findGivenElements(browser, episode_element_xpath)
-        if j >= len(episode_elements):
-            print(f"❌ Episode index {j} out of range after re-fetch.")
-            break
-
-        episode = episode_elements[j]
-
-    ###################################
-
-        # Capture episode metadata BEFORE clicking
+# reads every episode card on the season page in one pass; returns a list of dicts (index, title, date, url, track_count)
+# the urls let each episode be loaded directly, so we never need browser.back() or a stale-element re-fetch
+def collectEpisodes(browser, selectors):
+    episodes = []
+    episode_elements = findGivenElements(browser, selectors["episode_cards"])
+    for j, episode in enumerate(episode_elements):
+        # Capture episode metadata
         try:
             episode_title = episode.find_element(By.XPATH, './/h4').text.strip()
             episode_date = episode.find_element(By.XPATH, './/p[not(contains(text(), "Tracks")) and not(contains(text(), "Questions"))]').text.strip()
@@ -157,99 +66,230 @@ def scrape_soundtrack_tv(tv_show, season_num):
             episode_date = "Unknown"
             print(f"[{j+1}] Issue extracting episode info: {e}")
 
+        episodes.append({
+            "index": j,
+            "title": episode_title,
+            "date": episode_date,
+            "url": episode.get_attribute("href"),
+            "track_count": Soundtrack_Scraper_utils.parse_track_count(episode.text), # eg "12 Tracks"
+        })
+    return episodes
 
-        ###########################################################################    
-
-
-        print(f"Navigating to episode: {episode_title} ({episode_date})")
-
-        # used in displaying the current episode on index.html when scraping
-        with open("current_episode.txt", "w", encoding="utf-8") as f:
-            f.write(episode_title)
-        
-        # Try to click the episode link
-        try:
-            browser.execute_script("arguments[0].click();", episode)  # click into each episode
-
-            # Wait briefly for page to load
-            WebDriverWait(browser, 5).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-
-            # Check for login modal
-            if isLoginModalPresent(browser, selectors):
-                print("Login modal detected — skipping episode.") # TODO check this; we don't want to skip 
-                browser.back()
-                continue
-            
-            # pull song / artist elements from within a specific div element
-            # avoids pulling additional / not required tracks that are duplicated around the page
-            div_xpath = selectors["episode_div"]
-            try:
-                WebDriverWait(browser, 10).until(EC.presence_of_element_located((By.XPATH, div_xpath)))
-            except TimeoutException:
-                print(f"{episode_title}: Episode div not found — skipping.")
-                browser.back()
-                continue
-
-
-
-            # Locate the parent div element
-            parent_div = browser.find_element(By.XPATH, div_xpath)
-
-            # the "show all tracks" button is located within the parent_div, hence why we pass the parent_div as an argument
-            # this function call is inconsistent when we don't use the parent_div, ie we just search for the "show all tracks" button xpath
-            showAllClick(browser, selectors, parent_div)  # Click "Show All" if present
 
-            # once inside the episode page, scrape the tracks
-            # Now find a specific song(p) & artist elements within the parent div
-            # scrape song & artist
-            track_containers = parent_div.find_elements(By.XPATH, selectors["track_container"])
+# loads a single episode page in a pooled browser & returns its tracks as a list of (song, artists) tuples, in page order
+# returns None if the episode was skipped (login modal, missing track div or navigation error)
+def scrapeEpisode(pooled, selectors, episode):
+    browser = pooled.driver
+    episode_title = episode["title"]
 
-            for track in track_containers:
-                try:
-                    # Extract song title
-                    song = track.find_element(By.XPATH, selectors["song"]).text.strip()
+    try:
+        pooled.load(episode["url"])  # load the episode page directly
+
+        # wait for whichever comes first: the track div, a login modal, an empty episode or a 404
+        # pull song / artist elements from within a specific div element
+        # avoids pulling additional / not required tracks that are duplicated around the page
+        div_xpath = selectors["episode_div"]
+        outcome = pooled.wait_ready(selectors, Soundtrack_Scraper_utils.page_outcomes(selectors, "episode_div"), page="episode")
+
+        if outcome == "login_modal":
+            print("Login modal detected — skipping episode.") # TODO check this; we don't want to skip 
+            return None
+        if outcome == "empty":
+            print(f"{episode_title}: No tracks listed.")
+            return []
+        if outcome != "tracks":
+            print(f"{episode_title}: Episode div not found ({outcome}) — skipping.")
+            return None
+
+        # Locate the parent div element
+        parent_div = browser.find_element(By.XPATH, div_xpath)
+
+        # the "show all tracks" button is located within the parent_div, hence why we pass the parent_div as an argument
+        # this function call is inconsistent when we don't use the parent_div, ie we just search for the "show all tracks" button xpath
+        showAllClick(browser, selectors, parent_div)  # Click "Show All" if present
+
+        # once inside the episode page, scrape the tracks
+        # all song & artist text within the parent div comes back from one injected script
+        tracks = Soundtrack_Scraper_utils.collect_tracks(browser, selectors, parent_div)
 
-                    # Extract all artist names within this track container
-                    artist_links = track.find_elements(By.XPATH, selectors["artist"])
-                    artists = ', '.join(artist.text.replace('\n', '').strip().rstrip(',') for artist in artist_links if artist.text.strip()) # handles multiple contributing artists (ie as one collection)
+    except Exception as e:
+        print(f"{episode_title}: Could not navigate or scrape — error: {str(e)}")
+        return None
 
-                    playlist[song] = artists
-                except Exception as e:
-                    print(f"Issue extracting track info: {e}")
+    return tracks
 
-            # After scraping, navigate back to the season episode list
-            browser.back()
 
-        except Exception as e:
-            print(f"{episode_title}: Could not navigate or scrape — error: {str(e)}")
+# returns an episode's tracks; the page is fetched & parsed without a browser where possible (Soundtrack_Extractor.py)
+# and a pooled browser is only leased if that fast path fails
+def fetchEpisodeTracks(pool, selectors, episode):
+    print(f"Navigating to episode: {episode['title']} ({episode['date']})")
 
+    def scrapeWithPooledBrowser():
+        with pool.browser() as worker:
+            return scrapeEpisode(worker, selectors, episode)
 
+    try:
+        return Soundtrack_Extractor.extract_tracks(episode["url"], selectors, "episode_div", fallback=scrapeWithPooledBrowser)
+    except Exception as e:
+        print(f"{episode['title']}: Could not navigate or scrape — error: {str(e)}")
+        return None
 
-    # placeholder for the csv filename, in a standardised format
-    words = tvShowClean.split('-')
-    output_filename = '_'.join(word.capitalize() for word in words) # eg will output as "Game_Of_Thrones"
 
-    # using Path, create a dir to hold playlist csv files in the cwd
-    # create dir if it doesn't exist; it won't crash if dir already exists
-    output_dir = Path("Playlist CSV Files")
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_file = output_dir / f'{output_filename}_Season_{currChoice}_Playlist.csv'
+# the main scraping function; this function will call other functions in this script
+# direct=True builds the season url (/show/<slug>/season-<n>) and loads it straight away;
+# direct=False keeps the original behaviour of clicking through from the show page
+# max_workers sets how many pooled browsers scrape episodes in parallel (1 = sequential)
+# pool defaults to the shared warm browser pool (see Soundtrack_Browser_Pool.py)
+# each finished episode is checkpointed (see Soundtrack_Checkpoint.py) & written to the track store with its episode
+# & position (see Soundtrack_Track_Store.py); resume=True skips episodes that already
+# have a checkpoint & refresh=True only re-scrapes episodes whose Tunefind track count has changed
+# progress is an optional callback, called with keyword arguments as each episode starts & finishes
+# (used to show the current episode on index.html; see Soundtrack_Progress.py)
+def scrape_soundtrack_tv(tv_show, season_num, direct=True, max_workers=4, pool=None, resume=False, refresh=False, progress=None):
+    started = time.monotonic()
+    if progress is None:
+        progress = lambda **event: None
 
-    # use pandas module to create a dataframe of the playlist
-    df_playlist = pd.DataFrame(list(playlist.items()), columns=["Song", "Artist"])
-    df_playlist.to_csv(output_file, index=False)
-    print()
+    season_num = int(season_num)
+    playlist = {}  # dict to hold each artist:song kv pair
+    selectors = Soundtrack_Scraper_utils.TV_SELECTORS # dict to hold the xpath strings
 
 
-    # Check if the file was created successfully
-    if output_file.exists():
-        print(f"Playlist saved successfully to: {output_file}")
-    else:
-        print(f"Error: Failed to save playlist to {output_file}")
+    # browsers are leased from the shared warm pool rather than started per scrape
+    if pool is None:
+        pool = Soundtrack_Browser_Pool.get_browser_pool()
 
+    # build the url from which we will scrape the soundtrack list
+    baseURL = Soundtrack_Scraper_utils.TUNEFIND_BASE_URL + '/show/'
+    #tv_show = input('Please enter a TV Show to search...').split()
+    # normalised & checked over HTTP (punctuation, accents, "the", year); raises ValueError if the show isn't on Tunefind
+    tvShowClean = Soundtrack_Slugs.resolve_show_slug(tv_show)
+    builtUrl = baseURL + tvShowClean
 
-    # Close the browser once scraping is complete
-    browser.quit()
+    if direct:
+        # check the season page exists over plain HTTP before paying for a browser; the html is kept for the episode list
+        # a page that couldn't be fetched (rate limit, block, outage) isn't a missing season: the browser tries it instead
+        season_url = Soundtrack_Scraper_utils.build_season_url(tvShowClean, season_num)
+        season_html = None
+        season_missing = season_num < 1
+        if not season_missing:
+            try:
+                season_html = Soundtrack_Scraper_utils.fetch_existing_page(season_url)
+                season_missing = season_html is None
+            except Soundtrack_Scraper_utils.PageUnavailable as e:
+                print(f"Couldn't fetch season page ({e}) — falling back to browser.")
+        if season_missing:
+            try:
+                season_count = Soundtrack_Scraper_utils.get_season_count(tvShowClean)
+            except Soundtrack_Scraper_utils.PageUnavailable:
+                season_count = None
+            if season_count == 0:
+                raise ValueError(f"No seasons found for {tv_show}")
+            available = f" Available: 1-{season_count}" if season_count else ""
+            raise ValueError(f"Season {season_num} is out of range.{available}")
+
+    currChoice = season_num
+
+    # read every episode card once (title, date & url) rather than re-fetching the card list after each episode
+    # in direct mode the season page is parsed over plain HTTP first; the browser is only used if that fails
+    episodes = None
+    if direct and season_html is not None:
+        try:
+            episodes = Soundtrack_Extractor.extract_episodes(season_url, selectors, html=season_html)
+        except Exception as e:
+            print(f"Fast path failed for season page ({e}) — falling back to browser.")
+
+    if episodes is None:
+        with pool.browser() as pooled:
+            browser = pooled.driver
+
+            if direct:
+                # go straight to the season page
+                pooled.load(season_url)
+                pooled.wait_ready(selectors, {"login_modal": selectors["login_modal"], "episodes": selectors["episode_cards"]}, page="season")
+
+            else:
+                # open the show page
+                pooled.load(builtUrl)
+                pooled.wait_ready(selectors, {"seasons": selectors["season_links"]}, page="show")
+
+                ###################################################
+
+                # xpath of the show's seasons
+                season_element_xpath = selectors["season_links"]
+                season_elements = findGivenElements(browser, season_element_xpath)
+
+                if season_num <1 or  season_num > len(season_elements):
+                    raise ValueError(f"Season {season_num} is out of range. Available: 1-{len(season_elements)}")
+
+                # Click into the corresponding season link
+                browser.execute_script("arguments[0].click();", season_elements[currChoice-1])
+
+
+            ###################################################
+
+            # xpath of "episode" elements within each season
+            episodes = collectEpisodes(browser, selectors)
+
+    print(f"🔍 Found {len(episodes)} episodes.")
+
+    # episodes already in the checkpoint (resume / unchanged track count) are taken from it instead of re-scraped
+    checkpoint = Soundtrack_Checkpoint.SeasonCheckpoint(tv_show, currChoice)
+    media = Media.tv(tv_show, currChoice)
+    track_writer = Soundtrack_Track_Store.get_track_store().writer(media)
+    episode_tracks = [None] * len(episodes)
+    to_scrape = []
+    for episode in episodes:
+        if checkpoint.should_skip(episode, resume=resume, refresh=refresh):
+            episode_tracks[episode["index"]] = checkpoint.tracks_for(episode)
+            track_writer.write_episode(episode, episode_tracks[episode["index"]])
+        else:
+            to_scrape.append(episode)
+    if len(to_scrape) < len(episodes):
+        print(f"Using checkpoint for {len(episodes) - len(to_scrape)} episodes; scraping {len(to_scrape)}.")
+        metrics.count("episodes.from_checkpoint", len(episodes) - len(to_scrape))
+
+    episode_total = len(episodes)
+    progress(event="episodes", episode_total=episode_total, episodes_to_scrape=len(to_scrape),
+             elapsed=round(time.monotonic() - started, 1))
+
+    def scrapeAndReport(episode):
+        progress(event="episode_started", episode_index=episode["index"] + 1, episode_total=episode_total,
+                 episode_title=episode["title"], elapsed=round(time.monotonic() - started, 1))
+        return fetchEpisodeTracks(pool, selectors, episode)
+
+    # scrape the episodes in parallel; any worker that needs a browser leases its own from the pool
+    # results are stored by episode index so the playlist keeps the same order as a sequential run
+    workers = max(1, min(int(max_workers), len(to_scrape) or 1))
+    episodes_done = len(episodes) - len(to_scrape)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(scrapeAndReport, episode): episode for episode in to_scrape}
+        for future in as_completed(futures):
+            episode = futures[future]
+            tracks = future.result()
+            episode_tracks[episode["index"]] = tracks
+            if tracks is not None:
+                checkpoint.save_episode(episode, tracks)  # saved as soon as the episode finishes
+                track_writer.write_episode(episode, tracks)
+            metrics.count("episodes.scraped" if tracks is not None else "episodes.skipped")
+            episodes_done += 1
+            progress(event="episode_done", episode_index=episode["index"] + 1, episode_total=episode_total,
+                     episode_title=episode["title"], episodes_done=episodes_done,
+                     track_count=len(tracks) if tracks is not None else None,
+                     elapsed=round(time.monotonic() - started, 1))
+
+    # merge the episodes, in order, into the playlist dict
+    for tracks in episode_tracks:
+        for song, artists in tracks or []:
+            playlist[song] = artists
+
+
+    # mark the stored scrape complete (episodes skipped this time are dropped from it), then export it
+    # as a csv in a standardised format, eg "Game_Of_Thrones_Season_1_Playlist.csv"
+    track_writer.finish()
+    output_file = Soundtrack_Scraper_utils.tv_playlist_csv_path(tv_show, currChoice)
+    track_writer.store.export_csv(media, output_file)
 
     print()
     for k,v in playlist.items():
@@ -257,19 +297,112 @@ def scrape_soundtrack_tv(tv_show, season_num):
     print(f"playlist length: {len(playlist)}")
     print()
 
-    # clean up & delete "current_episode.txt" once we're finished with it 
-    if os.path.exists("current_episode.txt"):
-        os.remove("current_episode.txt")
-    
+    progress(event="scrape_done", track_count=len(playlist), elapsed=round(time.monotonic() - started, 1))
+
     return playlist # dict
     
 
+# returns the show's season numbers; read from the show page over plain HTTP where possible,
+# otherwise from the season links in a pooled browser (one show-page load for the whole series)
+def discoverSeasons(pool, selectors, show_slug):
+    try:
+        seasons = Soundtrack_Scraper_utils.get_season_numbers(show_slug)
+        if seasons:
+            return seasons
+    except Exception as e:
+        print(f"Fast path failed for show page ({e}) — falling back to browser.")
+
+    with pool.browser() as pooled:
+        pooled.load(Soundtrack_Scraper_utils.TUNEFIND_BASE_URL + '/show/' + show_slug)
+        pooled.wait_ready(selectors, {"seasons": selectors["season_links"]}, page="show")
+        hrefs = [element.get_attribute("href") or "" for element in findGivenElements(pooled.driver, selectors["season_links"])]
+    return sorted({int(match.group(1)) for match in (re.search(r'/season-(\d+)', href) for href in hrefs) if match})
+
+
+# scrapes every season of a show (or the seasons in `seasons`, eg range(2, 5)) & builds a combined playlist
+# seasons are discovered once & scraped concurrently (max_seasons at a time); each season still writes its own csv,
+# and the combined, de-duplicated playlist (in season order) is saved as eg "Game_Of_Thrones_All_Seasons_Playlist.csv"
+# (or "Game_Of_Thrones_Seasons_2-4_Playlist.csv" for a range)
+# scrape_season defaults to scrape_soundtrack_tv; Soundtrack_Cache passes its cached version
+# returns a dict: {"seasons": {season_num: playlist}, "playlist": combined playlist, "failed": {season_num: error}}
+def scrape_soundtrack_tv_series(tv_show, seasons=None, max_seasons=2, pool=None, progress=None, scrape_season=None, **scrape_kwargs):
+    started = time.monotonic()
+    if progress is None:
+        progress = lambda **event: None
+    if scrape_season is None:
+        scrape_season = scrape_soundtrack_tv
+    if pool is None:
+        pool = Soundtrack_Browser_Pool.get_browser_pool()
+    selectors = Soundtrack_Scraper_utils.TV_SELECTORS
+
+    show_slug = Soundtrack_Slugs.resolve_show_slug(tv_show)
+    available = discoverSeasons(pool, selectors, show_slug)
+    if not available:
+        raise ValueError(f"No seasons found for {tv_show}")
+
+    if seasons is None:
+        wanted = available
+    else:
+        wanted = sorted({int(n) for n in seasons})
+        if not wanted:
+            raise ValueError(f"No seasons requested for {tv_show}")
+        missing = [n for n in wanted if n not in available]
+        if missing:
+            raise ValueError(f"Season {missing[0]} is out of range. Available: {available[0]}-{available[-1]}")
+
+    print(f"📺 Scraping {len(wanted)} seasons of {tv_show}: {wanted[0]}-{wanted[-1]}")
+    progress(event="seasons", seasons=wanted, elapsed=round(time.monotonic() - started, 1))
+
+    def scrapeSeason(season_num):
+        # tag each season's progress events with its season number
+        season_progress = lambda **event: progress(season=season_num, **event)
+        return scrape_season(tv_show, season_num, pool=pool, progress=season_progress, **scrape_kwargs)
+
+    season_playlists = {}
+    failed = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_seasons), len(wanted)))) as executor:
+        futures = {executor.submit(scrapeSeason, season_num): season_num for season_num in wanted}
+        for future in as_completed(futures):
+            season_num = futures[future]
+            try:
+                season_playlists[season_num] = future.result() or {}
+            except Exception as e:
+                failed[season_num] = str(e)
+                print(f"❌ Season {season_num} failed: {e}")
+            progress(event="season_done", season=season_num, failed=season_num in failed,
+                     track_count=len(season_playlists.get(season_num, {})), elapsed=round(time.monotonic() - started, 1))
+
+    # merge the seasons in order; a song already used by an earlier season isn't repeated
+    playlist = {}
+    for season_num in wanted:
+        for song, artists in season_playlists.get(season_num, {}).items():
+            playlist.setdefault(song, artists)
+
+    # the series rows in the track store are the stored rows of each season that finished, with their season & episode
+    if seasons is None:
+        media = Media.series(tv_show)
+        output_file = Soundtrack_Scraper_utils.series_playlist_csv_path(tv_show)
+    else:
+        media = Media.series(tv_show, wanted[0], wanted[-1])
+        output_file = Soundtrack_Scraper_utils.series_playlist_csv_path(tv_show, wanted[0], wanted[-1])
+    store = Soundtrack_Track_Store.get_track_store()
+    store.copy_from(media, [Media.tv(tv_show, season_num) for season_num in wanted if season_num in season_playlists])
+    Soundtrack_Scraper_utils.save_playlist_csv(playlist, output_file)
+    print(f"series playlist length: {len(playlist)} ({sum(len(p) for p in season_playlists.values())} before de-duplication)")
+
+    progress(event="series_done", track_count=len(playlist), failed=sorted(failed), elapsed=round(time.monotonic() - started, 1))
+    return {"seasons": season_playlists, "playlist": playlist, "failed": failed}
+
+
 # tester function call - test any amendments to Soundtrack_Scraper_tv.py
 # this will only run if this script is executed natively (ie not when imported into soundtrack_main.py)
 if __name__ == "__main__":
     tv_show = input("Enter a tv show: ")
-    season_num = input("Enter a season number: ")
-    scrape_soundtrack_tv(tv_show, season_num)
+    season_num = input("Enter a season number (or 'all'): ")
+    if season_num.strip().lower() == "all":
+        scrape_soundtrack_tv_series(tv_show)
+    else:
+        scrape_soundtrack_tv(tv_show, season_num)
 
     
 
@@ -10,10 +10,18 @@ These helpers handle common page interactions like cookie banners, element findi
 expanding track lists, and detecting login modals.
 """
 
+import os
+import re
+import requests
+from requests.adapters import HTTPAdapter
+from Soundtrack_Media import Media
+import Soundtrack_Readiness
+import Soundtrack_Track_Store
+from Soundtrack_Metrics import metrics
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+# selenium's WebDriverWait (which pulls in the whole webdriver package) is imported where it's used,
+# so importing this module for its http helpers & selectors stays fast
 
 # Optional: if you need these in future helpers
 # from selenium import webdriver
@@ -23,39 +31,267 @@ from selenium.common.exceptions import TimeoutException
 # import os
 
 
-def handle_cookies(browser, selectors, timeout=10):
+# TUNEFIND_BASE_URL points the scrapers at a local stand-in (eg the benchmark fixture server, see Soundtrack_Benchmark.py)
+TUNEFIND_BASE_URL = os.getenv("TUNEFIND_BASE_URL", "https://www.tunefind.com").rstrip('/')
+
+# xpath strings shared by the Selenium scrapers & the browserless extractor (Soundtrack_Extractor.py)
+TV_SELECTORS = {
+    "cookies_agree_button": '//button[span[text()="AGREE"]]',
+    "season_links": '//a[contains(@href, "/show/") and contains(@href, "/season-")]',
+    "episode_cards": '//a[contains(@class, "card-border") and @data-discover="true"]',
+    "login_modal": '//div[contains(@class, "modal")]//h1[contains(text(), "Log in")]',
+    "episode_div": '//div[contains(@class, "scroll-mt-20")]', # holds various track containers
+    "empty_state": '//*[contains(text(), "No songs") or contains(text(), "no songs")]', # episode with no tracks listed
+    "show_all_button": './/button[.//p[text()="Show all tracks"]]',
+    "track_container": './/div[contains(@class, "flex flex-col")]',  # song/artist container (within the parent episode_div)
+    "song": './/p[contains(@class, "font-bold") and contains(@class, "text-[1rem]")]',
+    "artist": './/a[@data-discover="true" and contains(@href, "/artist/")]/small'
+}
+
+FILM_SELECTORS = {
+    "cookies_agree_button": '//button[span[text()="AGREE"]]',
+    "login_modal": '//div[contains(@class, "modal")]//h1[contains(text(), "Log in")]',
+    "show_all_button": './/button[.//p[text()="Show all tracks"]]',
+    "parent_container": '//div[contains(@class, "scroll-mt-20")]', # holds various track_containers
+    "empty_state": '//*[contains(text(), "No songs") or contains(text(), "no songs")]', # film with no tracks listed
+    "track_container": './/div[contains(@class, "flex flex-col")]', # song/artist container (within parent_container)
+    "song": './/p[contains(@class, "font-bold") and contains(@class, "text-[1rem]")]',
+    "artist": './/a[@data-discover="true" and contains(@href, "/artist/")]/small'
+}
+
+# plain HTTP session used for requests that don't need a browser (season counts, url checks, page html)
+# Tunefind rejects the default python-requests user agent, so present as a regular browser
+http_session = requests.Session()
+http_session.headers.update({
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0",
+    "Accept-Language": "en-US,en;q=0.9",
+})
+# keep connections alive for the parallel episode workers
+http_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+http_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# statuses that mean the page doesn't exist; anything else that isn't a 200 (rate limits, blocks, outages)
+# says nothing about whether it exists
+MISSING_STATUSES = (404, 410)
+
+
+class PageUnavailable(Exception):
+    """Raised when a Tunefind page couldn't be fetched (network error, 429, 403, 5xx), as opposed to not existing."""
+
+
+def join_artists(artist_names):
+    """
+    Joins the artist names of one track into a single string, eg "Artist A, Artist B".
+
+    :param artist_names: iterable of artist name strings (as scraped)
+    :return: comma separated string
+    """
+    return ', '.join(name.replace('\n', '').strip().rstrip(',') for name in artist_names if name.strip())
+
+
+def build_show_slug(tv_show):
+    """
+    Converts a typed show name into the Tunefind url slug, eg "game of thrones" -> "game-of-thrones".
+
+    :param tv_show: show name as entered by the user
+    :return: slug string
+    """
+    return '-'.join(tv_show.split())
+
+
+def tv_playlist_csv_path(tv_show, season_num, csv_dir="Playlist CSV Files"):
+    """
+    Returns the standardised csv path for a tv season, eg "Playlist CSV Files/Game_Of_Thrones_Season_1_Playlist.csv"
+
+    :param tv_show: show name as entered by the user
+    :param season_num: season number
+    :param csv_dir: directory holding the playlist csv files
+    :return: Path
+    """
+    return Media.tv(tv_show, season_num).csv_path(csv_dir)
+
+
+def film_playlist_csv_path(film_name, film_year="", csv_dir="Playlist CSV Files"):
+    """
+    Returns the standardised csv path for a film, eg "Playlist CSV Files/The_Hangover_2009_Playlist.csv"
+
+    :param film_name: film name as entered by the user
+    :param film_year: year of release; some films omit it
+    :param csv_dir: directory holding the playlist csv files
+    :return: Path
+    """
+    return Media.film(film_name, film_year).csv_path(csv_dir)
+
+
+def save_playlist_csv(playlist, output_file):
+    """
+    Writes a song:artist playlist dict to csv (Song, Artist columns).
+
+    :param playlist: dict of song -> artists
+    :param output_file: Path of the csv to write; the parent directory is created if needed
+    :return: True if the file was written
+    """
+    # same csv writer as the track store's export (creates the dir if it doesn't exist)
+    output_file = Soundtrack_Track_Store.write_playlist_csv(playlist, output_file)
+
+    # Check if the file was created successfully
+    if output_file.exists():
+        print(f"Playlist saved successfully to: {output_file}")
+        return True
+    print(f"Error: Failed to save playlist to {output_file}")
+    return False
+
+
+def parse_track_count(card_text):
+    """
+    Reads the track count from an episode card's text, eg "12 Tracks" -> 12
+
+    :param card_text: full text of the episode card
+    :return: int, or None if the card doesn't show a count
+    """
+    match = re.search(r'(\d+)\s+Tracks?', card_text or "")
+    return int(match.group(1)) if match else None
+
+
+def build_season_url(show_slug, season_num):
+    """
+    Builds the direct url of a season page, eg /show/game-of-thrones/season-1
+
+    :param show_slug: slug returned by build_show_slug
+    :param season_num: season number (int or numeric string)
+    :return: absolute url string
+    """
+    return f"{TUNEFIND_BASE_URL}/show/{show_slug}/season-{int(season_num)}"
+
+
+def get_season_numbers(tv_show, timeout=10):
+    """
+    Returns the season numbers listed on a show page, using a plain HTTP request (no browser).
+
+    :param tv_show: show name or slug
+    :param timeout: seconds to wait for the response
+    :return: sorted list of season numbers; [] if the show page doesn't exist
+    :raises PageUnavailable: if the show page couldn't be fetched
+    """
+    show_slug = build_show_slug(tv_show)
+    html = fetch_existing_page(f"{TUNEFIND_BASE_URL}/show/{show_slug}", timeout=timeout)
+    if html is None:
+        return []
+
+    # season links look like href="/show/<slug>/season-<n>"; collect the distinct season numbers
+    pattern = rf'href="/show/{re.escape(show_slug)}/season-(\d+)"'
+    return sorted({int(n) for n in re.findall(pattern, html)})
+
+
+def get_season_count(tv_show, timeout=10):
+    """
+    Returns the number of seasons listed on a show page, using a plain HTTP request (no browser).
+
+    :param tv_show: show name or slug
+    :param timeout: seconds to wait for the response
+    :return: number of seasons; 0 if the show page doesn't exist
+    :raises PageUnavailable: if the show page couldn't be fetched
+    """
+    return len(get_season_numbers(tv_show, timeout))
+
+
+def series_playlist_csv_path(tv_show, first_season=None, last_season=None, csv_dir="Playlist CSV Files"):
+    """
+    Returns the csv path of a combined series playlist, eg "Playlist CSV Files/Game_Of_Thrones_Seasons_2-4_Playlist.csv"
+    or, for every season, "Playlist CSV Files/Game_Of_Thrones_All_Seasons_Playlist.csv"
+
+    :param tv_show: show name as entered by the user
+    :param first_season: first season in the playlist (None = every season)
+    :param last_season: last season in the playlist (None = every season)
+    :param csv_dir: directory holding the playlist csv files
+    :return: Path
+    """
+    return Media.series(tv_show, first_season, last_season).csv_path(csv_dir)
+
+
+def fetch_existing_page(url, timeout=10):
+    """
+    Fetches a Tunefind page without launching a browser, if it exists.
+    Tunefind redirects unknown seasons back to the show page, so a redirect away from the
+    requested path is treated as "not found", like a 404.
+
+    :param url: absolute url to fetch
+    :param timeout: seconds to wait for the response
+    :return: html string, or None if the page doesn't exist
+    :raises PageUnavailable: if the page couldn't be fetched, so it isn't known whether it exists
+    """
+    try:
+        with metrics.span("page_fetch"):
+            response = http_session.get(url, timeout=timeout, allow_redirects=True)
+    except requests.RequestException as e:
+        raise PageUnavailable(f"{url}: {e}") from e
+    if response.status_code in MISSING_STATUSES:
+        return None
+    if response.status_code != 200:
+        raise PageUnavailable(f"{url} returned HTTP {response.status_code}")
+    if not response.url.rstrip('/').endswith(url.split(TUNEFIND_BASE_URL, 1)[-1].rstrip('/')):
+        return None
+    return response.text
+
+
+def url_exists(url, timeout=10):
+    """
+    Checks whether a Tunefind page exists without launching a browser (see fetch_existing_page).
+
+    :param url: absolute url to check
+    :param timeout: seconds to wait for the response
+    :return: True if the page exists, False otherwise
+    :raises PageUnavailable: if the page couldn't be fetched
+    """
+    return fetch_existing_page(url, timeout) is not None
+
+
+def handle_cookies(browser, selectors, timeout=0):
     """
     Clicks the 'Agree' button on a cookie consent popup if present.
+    By default only the current page is checked (no waiting); call it once the page is ready
+    (see Soundtrack_Readiness.py), which also reports whether the banner is showing.
 
     :param browser: Selenium WebDriver instance
     :param selectors: dict containing 'cookies_agree_button' XPath
-    :param timeout: seconds to wait for the button (optional)
+    :param timeout: seconds to wait for the button to appear (optional)
+    :return: True if the button was clicked
     """
     agree_button_xpath = selectors.get("cookies_agree_button")
     if not agree_button_xpath:
-        return
+        return False
 
-    try:
-        agree_button = WebDriverWait(browser, timeout).until(
-            EC.element_to_be_clickable((By.XPATH, agree_button_xpath))
-        )
-        agree_button.click()
-    except TimeoutException:
-        print("No cookies popup found.")
+    buttons = browser.find_elements(By.XPATH, agree_button_xpath)
+    if not buttons and timeout:
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        try:
+            buttons = [WebDriverWait(browser, timeout).until(
+                EC.element_to_be_clickable((By.XPATH, agree_button_xpath))
+            )]
+        except TimeoutException:
+            pass
+    if not buttons:
+        return False
+    browser.execute_script("arguments[0].click();", buttons[0])
+    return True
 
 
-def find_given_elements(browser, xpath_in, timeout=10):
+def find_given_elements(browser, xpath_in, timeout=10, page="elements"):
     """
     Waits for and returns all elements matching the given XPath.
+    Returns as soon as they appear, or as soon as the page turns out to be a 404.
 
     :param browser: Selenium WebDriver instance
     :param xpath_in: XPath string to locate elements
     :param timeout: seconds to wait for presence
+    :param page: page type the wait time is recorded under
     :return: list of WebElement objects
+    :raises TimeoutException: if no element appears
     """
-    WebDriverWait(browser, timeout).until(
-        EC.presence_of_element_located((By.XPATH, xpath_in))
-    )
+    state = Soundtrack_Readiness.wait_for_page(browser, {"found": xpath_in}, page=page, timeout=timeout)
+    if state.outcome != "found":
+        raise TimeoutException(f"No elements matching {xpath_in} ({state.outcome})")
     return browser.find_elements(By.XPATH, xpath_in)
 
 
@@ -72,32 +308,154 @@ def click_show_all(browser, selectors, parent_div_in):
         if not show_all_xpath:
             return
 
-        buttons = parent_div_in.find_elements(By.XPATH, show_all_xpath)
-        if buttons:
-            button = buttons[0]
-            browser.execute_script("arguments[0].scrollIntoView(true);", button)
-            browser.execute_script("arguments[0].click();", button)
+        with metrics.span("show_all_click"):
+            buttons = parent_div_in.find_elements(By.XPATH, show_all_xpath)
+            if buttons:
+                button = buttons[0]
+                browser.execute_script("arguments[0].scrollIntoView(true);", button)
+                browser.execute_script("arguments[0].click();", button)
     except Exception as e:
         print(f"Issue with clicking 'Show All': {e}")
 
 
-def is_login_modal_present(browser, selectors, timeout=5):
+def is_login_modal_present(browser, selectors, timeout=0):
     """
     Checks if a login modal is present on the page.
+    By default only the current page is checked; the readiness wait already reports a modal as
+    one of its outcomes, so there's no need to wait for one that never appears.
 
     :param browser: Selenium WebDriver instance
     :param selectors: dict containing 'login_modal' XPath
-    :param timeout: seconds to wait for modal
+    :param timeout: seconds to wait for modal (optional)
     :return: True if modal is found, False otherwise
     """
     modal_xpath = selectors.get("login_modal")
     if not modal_xpath:
         return False
 
-    try:
-        WebDriverWait(browser, timeout).until(
-            EC.presence_of_element_located((By.XPATH, modal_xpath))
-        )
-        return True
-    except TimeoutException:
-        return False
\ No newline at end of file
+    with metrics.span("modal_probe"):
+        if browser.find_elements(By.XPATH, modal_xpath):
+            return True
+        if not timeout:
+            return False
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        try:
+            WebDriverWait(browser, timeout).until(
+                EC.presence_of_element_located((By.XPATH, modal_xpath))
+            )
+            return True
+        except TimeoutException:
+            return False
+
+
+def page_outcomes(selectors, container_key):
+    """
+    The readiness outcomes of a track page, in priority order (a modal can sit over the tracks).
+
+    :param selectors: TV_SELECTORS or FILM_SELECTORS
+    :param container_key: key of the track container xpath, eg "episode_div"
+    :return: dict of outcome -> xpath for Soundtrack_Readiness.wait_for_page
+    """
+    return {
+        "login_modal": selectors["login_modal"],
+        "tracks": selectors[container_key],
+        "empty": selectors["empty_state"],
+    }
+
+# evaluates the track xpaths inside the page so a whole track list comes back in one WebDriver call
+# arguments: parent element, track_container xpath, song xpath, artist xpath
+BULK_EXTRACT_SCRIPT = """
+const [parent, containerXpath, songXpath, artistXpath] = arguments;
+const select = (xpath, node) => {
+    const result = document.evaluate(xpath, node, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+    return nodes;
+};
+const containers = select(containerXpath, parent);
+return {
+    count: containers.length,
+    tracks: containers.map(container => {
+        const song = select(songXpath, container)[0];
+        if (!song) return null;
+        return {song: song.innerText, artists: select(artistXpath, container).map(a => a.innerText)};
+    })
+};
+"""
+
+
+def bulk_extract_tracks(browser, selectors, parent_div_in):
+    """
+    Extracts every song & artist list inside the parent element with a single execute_script call.
+
+    :param browser: Selenium WebDriver instance
+    :param selectors: dict containing 'track_container', 'song' & 'artist' XPaths
+    :param parent_div_in: WebElement representing the parent container
+    :return: list of (song, artists) tuples, in page order
+    :raises ValueError: if the script result doesn't have the expected shape
+    """
+    result = browser.execute_script(
+        BULK_EXTRACT_SCRIPT, parent_div_in,
+        selectors["track_container"], selectors["song"], selectors["artist"]
+    )
+
+    # verify the result before trusting it; anything unexpected falls back to the per-element path
+    if not isinstance(result, dict) or not isinstance(result.get("tracks"), list):
+        raise ValueError(f"Unexpected bulk extraction result: {result!r}")
+    if len(result["tracks"]) != result.get("count"):
+        raise ValueError("Bulk extraction returned a partial track list")
+
+    tracks = []
+    for track in result["tracks"]:
+        if track is None:
+            continue  # container without a song title, eg a header row
+        if not isinstance(track.get("song"), str) or not isinstance(track.get("artists"), list):
+            raise ValueError(f"Unexpected track in bulk extraction result: {track!r}")
+        tracks.append((track["song"].strip(), join_artists(track["artists"])))
+
+    if result["count"] and not tracks:
+        raise ValueError("Bulk extraction found track containers but no songs")
+    return tracks
+
+
+def extract_tracks_per_element(selectors, parent_div_in):
+    """
+    Extracts tracks with one WebDriver call per song/artist element (the original, slower path).
+
+    :param selectors: dict containing 'track_container', 'song' & 'artist' XPaths
+    :param parent_div_in: WebElement representing the parent container
+    :return: list of (song, artists) tuples, in page order
+    """
+    tracks = []
+    for track in parent_div_in.find_elements(By.XPATH, selectors["track_container"]):
+        try:
+            # Extract song title
+            song = track.find_element(By.XPATH, selectors["song"]).text.strip()
+
+            # Extract all artist names within this track container
+            artist_links = track.find_elements(By.XPATH, selectors["artist"])
+            artists = join_artists(artist.text for artist in artist_links) # handles multiple contributing artists (ie as one collection)
+
+            tracks.append((song, artists))
+        except Exception as e:
+            print(f"Issue extracting track info: {e}")
+    return tracks
+
+
+def collect_tracks(browser, selectors, parent_div_in):
+    """
+    Extracts the tracks inside the parent element, using the bulk script where possible.
+
+    :param browser: Selenium WebDriver instance
+    :param selectors: dict containing 'track_container', 'song' & 'artist' XPaths
+    :param parent_div_in: WebElement representing the parent container
+    :return: list of (song, artists) tuples, in page order
+    """
+    with metrics.span("track_extraction"):
+        try:
+            return bulk_extract_tracks(browser, selectors, parent_div_in)
+        except Exception as e:
+            print(f"Bulk track extraction failed ({e}) — extracting per element.")
+            metrics.count("retries.per_element_extraction")
+            return extract_tracks_per_element(selectors, parent_div_in)
@@ -0,0 +1,160 @@
+# script to turn a typed show / film title into the Tunefind url slug
+# usage: Soundtrack_Scraper_tv.py & Soundtrack_Scraper_film.py
+
+
+# Soundtrack_Slugs.py
+"""
+Tunefind slug resolution.
+Joining the typed words with '-' breaks on apostrophes, punctuation, accents, a leading "the" and
+year suffixes, and we only found out after a browser launch & a page-load timeout. Here a title is
+normalised into a short list of likely slugs, each is checked with a plain HTTP request, and the
+first that exists is cached (misses are cached for a day), so the scrapers only open a browser on
+a url known to exist. Only a 404 (or a redirect away from the candidate) counts as a miss; if
+Tunefind can't be reached or is rate-limiting, the likeliest unchecked slug is used uncached and
+the scrapers' browser fallback takes over.
+"""
+
+import os
+import re
+import threading
+import unicodedata
+
+import Soundtrack_Scraper_utils
+from Soundtrack_Cache import SQLiteCache
+
+SLUG_CACHE_TTL = 30 * 24 * 3600        # resolved slugs rarely change
+SLUG_CACHE_NEGATIVE_TTL = 24 * 3600    # retry unknown titles daily, in case Tunefind adds them
+
+YEAR_SUFFIX = re.compile(r"^(.*?)[\s\-]*\(?((?:19|20)\d{2})\)?$")
+
+
+def split_year(title):
+    """
+    Splits a trailing year off a title, eg "Dune (2021)" -> ("Dune", "2021").
+    A title that is only a year (eg "1917") is left alone.
+
+    :return: (title, year) where year is "" if there isn't one
+    """
+    match = YEAR_SUFFIX.match((title or "").strip())
+    if match and match.group(1).strip():
+        return match.group(1).strip(), match.group(2)
+    return (title or "").strip(), ""
+
+
+def slug_words(title, split_apostrophes=False):
+    """
+    Normalises a title into lower-case ascii words, eg "Pokémon: Grey's & Co." -> ["pokemon", "greys", "and", "co"].
+
+    :param title: title as typed
+    :param split_apostrophes: treat apostrophes as word breaks ("grey-s") rather than dropping them ("greys")
+    :return: list of words
+    """
+    title = unicodedata.normalize("NFKD", title or "")
+    title = ''.join(c for c in title if not unicodedata.combining(c)).lower()
+    title = title.replace('&', ' and ')
+    title = re.sub(r"['’`]", ' ' if split_apostrophes else '', title)
+    return re.sub(r"[^a-z0-9]+", ' ', title).split()
+
+
+def slug_candidates(title, year=""):
+    """
+    Likely Tunefind slugs for a title, most likely first.
+
+    :param title: show / film title as typed
+    :param year: year of release, if known; a year typed after the title is also picked up
+    :return: list of slug strings
+    """
+    title, title_year = split_year(title)
+    year = str(year or title_year or "")
+
+    variants = []
+    for words in (slug_words(title), slug_words(title, split_apostrophes=True)):
+        variants.append(words)
+        if words[:1] == ["the"]:
+            variants.append(words[1:])  # "The Hangover" is sometimes listed as hangover
+        else:
+            variants.append(["the"] + words)
+        if "and" in words and '&' in title:
+            variants.append([w for w in words if w != "and"])
+
+    slugs = []
+    for words in variants:
+        slug = '-'.join(words)
+        if slug and slug not in slugs:
+            slugs.append(slug)
+    if year:
+        # some films omit the release year in the url (example: the hangover)
+        return [f"{slug}-{year}" for slug in slugs] + slugs
+    return slugs
+
+
+_slug_cache = None
+_slug_cache_lock = threading.Lock()
+
+
+def get_slug_cache():
+    """
+    Returns the process-wide slug cache (SLUG_CACHE_PATH, defaults to the scrape cache file).
+    """
+    global _slug_cache
+    with _slug_cache_lock:
+        if _slug_cache is None:
+            _slug_cache = SQLiteCache(
+                os.getenv("SLUG_CACHE_PATH", os.getenv("SCRAPE_CACHE_PATH", "scrape_cache.sqlite3")),
+                table="slugs", ttl=SLUG_CACHE_TTL, stale_ttl=0, max_entries=5000
+            )
+        return _slug_cache
+
+
+def resolve_slug(section, title, year="", cache=None):
+    """
+    Finds the Tunefind slug for a title by checking candidate urls over HTTP.
+
+    :param section: "show" or "movie"
+    :param title: title as typed
+    :param year: year of release (films)
+    :param cache: SQLiteCache (defaults to get_slug_cache())
+    :return: slug string, eg "greys-anatomy"; unchecked (and not cached) if Tunefind couldn't be reached
+    :raises ValueError: if no candidate exists on Tunefind
+    """
+    cache = cache or get_slug_cache()
+    candidates = slug_candidates(title, year)
+    if not candidates:
+        raise ValueError(f"'{title}' isn't a valid title")
+
+    key = f"{section}:{candidates[0]}"
+    cached, state = cache.get(key)
+    if state is not None:
+        if cached["slug"] is None:
+            raise ValueError(f"Couldn't find '{title}' on Tunefind")
+        return cached["slug"]
+
+    for slug in candidates:
+        try:
+            exists = Soundtrack_Scraper_utils.url_exists(f"{Soundtrack_Scraper_utils.TUNEFIND_BASE_URL}/{section}/{slug}")
+        except Soundtrack_Scraper_utils.PageUnavailable as e:
+            # not a miss: the earlier candidates don't exist, so this is the likeliest slug left
+            print(f"Couldn't check /{section}/{slug} ({e}) — using it unchecked.")
+            return slug
+        if exists:
+            if slug != candidates[0]:
+                print(f"🔎 Resolved '{title}' to /{section}/{slug}")
+            cache.set(key, {"slug": slug})
+            return slug
+
+    cache.set(key, {"slug": None}, ttl=SLUG_CACHE_NEGATIVE_TTL)
+    raise ValueError(f"Couldn't find '{title}' on Tunefind")
+
+
+def resolve_show_slug(tv_show, cache=None):
+    """
+    :return: the Tunefind slug of a show, eg "Grey's Anatomy" -> "greys-anatomy"
+    """
+    return resolve_slug("show", tv_show, cache=cache)
+
+
+def resolve_film_slug(film_name, film_year="", cache=None):
+    """
+    :return: the Tunefind slug of a film, eg ("The Hangover", "2009") -> "the-hangover-2009"
+    """
+    return resolve_slug("movie", film_name, film_year, cache=cache)
@@ -0,0 +1,187 @@
+# script to query TMDB for show / film titles
+# usage: app.py (/search autocomplete & /film)
+
+
+# Soundtrack_TMDB.py
+"""
+Pooled, caching TMDB search client.
+Autocomplete sends a request per debounced keystroke, so results are kept in an LRU+TTL cache keyed
+by the normalised query. A longer query is answered from a cached shorter prefix when that prefix's
+results already contain enough matches (or were the complete result set), and identical requests
+in flight at the same time share one upstream call. Prefix reuse is for autocomplete only; a full
+search (allow_prefix=False) always gets TMDB's own ranking for the exact query. TMDB_API_URL points the client at a local
+stand-in for tests.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def normalize_query(query):
+    """
+    Lower-cases a query & strips punctuation, eg " Game of  Thr" -> "game of thr".
+    """
+    return ' '.join(re.sub(r"[^\w\s]", " ", (query or "").lower()).split())
+
+
+def _title(result):
+    return result.get("name") or result.get("title") or result.get("original_name") or result.get("original_title") or ""
+
+
+def matches_query(result, normalized_query):
+    # true if the query appears at a word boundary in the title, eg "game of thr" in "game of thrones"
+    title = normalize_query(_title(result))
+    return f" {title}".find(f" {normalized_query}") != -1
+
+
+class TMDBClient:
+    """
+    :param api_key: TMDB api key
+    :param base_url: API root (defaults to TMDB_API_URL, then the public API)
+    :param ttl: seconds a cached search stays valid
+    :param max_entries: LRU size bound
+    :param timeout: seconds to wait for TMDB
+    """
+
+    def __init__(self, api_key, base_url=None, ttl=3600, max_entries=1000, timeout=5):
+        self.api_key = api_key
+        self.base_url = (base_url or os.getenv("TMDB_API_URL") or "https://api.themoviedb.org/3").rstrip('/')
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=10))
+        self.session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=10))
+        self._cache = OrderedDict()  # (endpoint, query) -> (expires_at, results, complete, from_prefix)
+        self._in_flight = {}  # (endpoint, query) -> threading.Event
+        self._lock = threading.Lock()
+        self.stats = {"upstream_calls": 0, "hits": 0, "prefix_hits": 0, "coalesced": 0}
+
+    def _cache_get(self, key, allow_prefix=True):
+        # caller holds the lock; allow_prefix=False skips entries filtered from a shorter query's results
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[3] and not allow_prefix:
+            return None
+        if time.time() >= entry[0]:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry
+
+    def _cache_put(self, key, results, complete, from_prefix=False):
+        # caller holds the lock
+        self._cache[key] = (time.time() + self.ttl, results, complete, from_prefix)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _from_prefix(self, endpoint, query, min_results):
+        # answer from the longest cached prefix of this query, if its results are good enough (caller holds the lock)
+        for end in range(len(query) - 1, 0, -1):
+            entry = self._cache_get((endpoint, query[:end]))
+            if entry is None:
+                continue
+            _, results, complete, _ = entry
+            filtered = [r for r in results if matches_query(r, query)]
+            if complete or len(filtered) >= min_results:
+                return filtered, complete
+            return None  # the closest prefix isn't enough; shorter ones won't be either
+        return None
+
+    def search(self, media_type, query, min_results=3, allow_prefix=True):
+        """
+        Searches TMDB for shows ("tv") or films ("movie"/"film").
+
+        :param media_type: "tv" or "movie"/"film"
+        :param query: the text typed so far
+        :param min_results: a cached prefix is reused if it has at least this many matches
+        :param allow_prefix: answer from a cached shorter query's results (autocomplete); False for a full search,
+                             which only uses results TMDB returned for this exact query
+        :return: list of TMDB result dicts (copies; safe to modify)
+        """
+        endpoint = "tv" if media_type == "tv" else "movie"
+        normalized = normalize_query(query)
+        if not normalized:
+            return []
+        key = (endpoint, normalized)
+
+        while True:
+            with self._lock:
+                entry = self._cache_get(key, allow_prefix)
+                if entry is not None:
+                    self.stats["hits"] += 1
+                    return [dict(r) for r in entry[1]]
+
+                reused = self._from_prefix(endpoint, normalized, min_results) if allow_prefix else None
+                if reused is not None:
+                    self.stats["prefix_hits"] += 1
+                    self._cache_put(key, *reused, from_prefix=True)
+                    return [dict(r) for r in reused[0]]
+
+                waiting_on = self._in_flight.get(key)
+                if waiting_on is None:
+                    done = self._in_flight[key] = threading.Event()
+                    break
+                self.stats["coalesced"] += 1
+
+            # someone else is already fetching this query; wait for it then read the cache
+            waiting_on.wait(self.timeout + 1)
+            with self._lock:
+                entry = self._cache_get(key, allow_prefix)
+            if entry is not None:
+                return [dict(r) for r in entry[1]]
+            # their request failed; loop round and try ourselves
+
+        try:
+            data = self._fetch(endpoint, query)
+            results = data.get("results", [])
+            complete = data.get("total_results", len(results)) <= len(results)
+            with self._lock:
+                self._cache_put(key, results, complete)
+            return [dict(r) for r in results]
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            done.set()
+
+    def _fetch(self, endpoint, query):
+        with self._lock:
+            self.stats["upstream_calls"] += 1
+        params = {
+            "api_key": self.api_key,
+            "query": query,
+            "language": "en-US",
+            "include_adult": False
+        }
+        response = self.session.get(f"{self.base_url}/search/{endpoint}", params=params, timeout=self.timeout)
+        response.raise_for_status()  # raises HTTPError for 4xx/5xx
+        return response.json()
+
+
+_tmdb_client = None
+_tmdb_client_lock = threading.Lock()
+
+
+def get_tmdb_client():
+    """
+    Returns the process-wide TMDB client, built from TMDB_API_KEY, TMDB_API_URL,
+    TMDB_CACHE_TTL, TMDB_CACHE_MAX_ENTRIES & TMDB_TIMEOUT.
+    """
+    global _tmdb_client
+    with _tmdb_client_lock:
+        if _tmdb_client is None:
+            _tmdb_client = TMDBClient(
+                os.getenv("TMDB_API_KEY"),
+                ttl=int(os.getenv("TMDB_CACHE_TTL", 3600)),
+                max_entries=int(os.getenv("TMDB_CACHE_MAX_ENTRIES", 1000)),
+                timeout=float(os.getenv("TMDB_TIMEOUT", 5)),
+            )
+        return _tmdb_client
@@ -0,0 +1,355 @@
+# script to build & query an offline show / film title index
+# usage: python Soundtrack_Title_Index.py titles.idx --tv tv_series_ids.json.gz --movie movie_ids.json.gz [--tv-slugs slugs.txt]
+#        app.py (/search reads the index named by TITLE_INDEX_PATH)
+
+
+# Soundtrack_Title_Index.py
+"""
+Offline title index for autocomplete.
+Titles from a TMDB daily id export (or a list of Tunefind slugs) are written to one binary file:
+a table of titles, and a sorted array of search keys (the normalised title & each later word of it,
+so "thrones" also finds "Game of Thrones"). Lookups binary-search the key array for the query prefix,
+so they take well under a millisecond. One- & two-character prefixes match too many keys to rank at
+query time, so their most popular titles are precomputed into posting lists; a longer prefix that
+matches more keys than can be scanned is left to TMDB. The file is memory-mapped read-only, so every
+gunicorn worker shares the same pages. When nothing matches the prefix, single-typo corrections (a
+missing, extra, wrong or swapped character) are tried, costing a few milliseconds, before the caller
+falls back to the live TMDB API. Air / release dates & poster paths are kept when the input has them
+(TMDB API result dumps do; the daily id exports don't), so the dropdown can show the year & poster.
+"""
+
+import argparse
+import gzip
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+
+MAGIC = b"STIDX002"
+# magic, titles, keys, prefixes, titles offset, keys offset, prefixes offset, postings offset, strings offset
+HEADER = struct.Struct("<8sIIIIIIII")
+# title string offset, length, kind, popularity, tmdb id, date offset, length, poster path offset, length
+TITLE = struct.Struct("<IHBxfIIHIH")
+KEY = struct.Struct("<IHxxI")       # key string offset, length, title number
+PREFIX = struct.Struct("<8sBxHI")   # prefix (utf-8, null-padded), kind, posting count, first posting
+POSTING = struct.Struct("<I")       # title number
+
+SHORT_PREFIX = 2        # prefixes up to this many characters are answered from posting lists
+POSTINGS_PER_PREFIX = 50  # most popular titles kept per short prefix
+
+KINDS = {"tv": 0, "movie": 1}
+STOPWORDS = {"the", "a", "an", "of", "and"}
+FUZZY_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789 "
+
+
+def normalize_title(title):
+    """
+    Strips accents & punctuation and lower-cases, eg "Pokémon: The Series" -> "pokemon the series".
+    """
+    title = unicodedata.normalize("NFKD", title or "")
+    title = ''.join(c for c in title if not unicodedata.combining(c))
+    return ' '.join(re.sub(r"[^\w\s]", " ", title.lower()).split())
+
+
+def load_tmdb_export(path, kind):
+    """
+    Reads a TMDB daily id export (gzipped JSON lines, eg tv_series_ids_MM_DD_YYYY.json.gz).
+
+    Lines in the shape of TMDB API results (name / title, first_air_date / release_date, poster_path)
+    are read too, keeping the date & poster.
+
+    :return: iterator of (kind, title, popularity, tmdb_id, date, poster_path)
+    """
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            title = item.get("name") or item.get("title") or item.get("original_name") or item.get("original_title")
+            if title and not item.get("adult"):
+                date = item.get("first_air_date") or item.get("release_date") or ""
+                yield kind, title, float(item.get("popularity") or 0), int(item.get("id") or 0), date, item.get("poster_path") or ""
+
+
+def load_slug_list(path, kind):
+    """
+    Reads a list of Tunefind slugs, one per line, eg "game-of-thrones".
+
+    :return: iterator of (kind, title, popularity, tmdb_id, date, poster_path)
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            slug = line.strip().strip('/').split('/')[-1]
+            if slug:
+                yield kind, slug.replace('-', ' ').title(), 0.0, 0, "", ""
+
+
+def build_title_index(entries, path):
+    """
+    Writes an index file from (kind, title, popularity, tmdb_id[, date, poster_path]) entries.
+    The file is written alongside & swapped in, so workers with the old file mapped are unaffected.
+
+    :param entries: iterable of (kind, title, popularity, tmdb_id[, date, poster_path]); kind is "tv" or "movie"
+    :param path: index file to write
+    :return: number of titles indexed
+    """
+    strings = bytearray()
+    titles = []
+    keys = []
+    short = {}  # (prefix, kind) -> title numbers whose keys start with it
+
+    def add_string(text):
+        data = (text or "").encode("utf-8")[:0xffff]
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    for kind, title, popularity, tmdb_id, *details in entries:
+        date, poster_path = (list(details) + ["", ""])[:2]
+        normalized = normalize_title(title)
+        if not normalized:
+            continue
+        title_off, title_len = add_string(title)
+        key_off, key_len = add_string(normalized)
+        key_bytes = normalized.encode("utf-8")[:0xffff]
+
+        number = len(titles)
+        titles.append((title_off, title_len, KINDS[kind], popularity, tmdb_id, *add_string(date), *add_string(poster_path)))
+
+        # the whole title, then each later word that isn't a stopword ("thrones" -> Game of Thrones)
+        start = 0
+        for word in normalized.split(' '):
+            if start == 0 or word not in STOPWORDS:
+                keys.append((key_bytes[start:], key_off + start, key_len - start, number))
+                key_text = normalized[len(normalized.encode("utf-8")[:start].decode("utf-8")):]
+                for length in range(1, SHORT_PREFIX + 1):
+                    if len(key_text) >= length:
+                        short.setdefault((key_text[:length], KINDS[kind]), set()).add(number)
+            start += len(word.encode("utf-8")) + 1
+
+    keys.sort(key=lambda k: k[0])
+
+    # the most popular titles for each short prefix, sorted by prefix for binary search
+    prefixes = []
+    postings = []
+    for (prefix, kind), numbers in sorted(short.items(), key=lambda item: (item[0][0].encode("utf-8"), item[0][1])):
+        ranked = sorted(numbers, key=lambda n: -titles[n][3])[:POSTINGS_PER_PREFIX]
+        prefixes.append((prefix.encode("utf-8"), kind, len(ranked), len(postings)))
+        postings.extend(ranked)
+
+    titles_off = HEADER.size
+    keys_off = titles_off + TITLE.size * len(titles)
+    prefixes_off = keys_off + KEY.size * len(keys)
+    postings_off = prefixes_off + PREFIX.size * len(prefixes)
+    strings_off = postings_off + POSTING.size * len(postings)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(titles), len(keys), len(prefixes),
+                            titles_off, keys_off, prefixes_off, postings_off, strings_off))
+        for entry in titles:
+            f.write(TITLE.pack(*entry))
+        for _, off, length, number in keys:
+            f.write(KEY.pack(off, length, number))
+        for entry in prefixes:
+            f.write(PREFIX.pack(*entry))
+        for number in postings:
+            f.write(POSTING.pack(number))
+        f.write(strings)
+    os.replace(tmp_path, path)
+    return len(titles)
+
+
+class TitleIndex:
+    """
+    Read-only, memory-mapped view of an index file.
+
+    :param path: index file written by build_title_index
+    :param max_scan: most keys looked at per query; a prefix matching more is left to TMDB
+    """
+
+    def __init__(self, path, max_scan=5000):
+        self.path = path
+        self.max_scan = max_scan
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.title_count, self.key_count, self._prefix_count, self._titles_off, self._keys_off,
+         self._prefixes_off, self._postings_off, self._strings_off) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a title index (or was built by an older version; rebuild it)")
+
+    def __len__(self):
+        return self.title_count
+
+    def _key(self, i):
+        off, length, number = KEY.unpack_from(self._mm, self._keys_off + KEY.size * i)
+        start = self._strings_off + off
+        return self._mm[start:start + length], number
+
+    def _bisect(self, target):
+        # first key >= target
+        lo, hi = 0, self.key_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid)[0] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _prefix_range(self, prefix):
+        prefix = prefix.encode("utf-8")
+        return self._bisect(prefix), self._bisect(prefix + b"\xff")  # 0xff never occurs in utf-8
+
+    def _string(self, off, length):
+        start = self._strings_off + off
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _title(self, number):
+        off, length, kind, popularity, tmdb_id, date_off, date_len, poster_off, poster_len = \
+            TITLE.unpack_from(self._mm, self._titles_off + TITLE.size * number)
+        return (self._string(off, length), kind, popularity, tmdb_id,
+                self._string(date_off, date_len), self._string(poster_off, poster_len))
+
+    def _result(self, title):
+        # in the shape of a TMDB search result, so /search treats index & API hits alike
+        name, kind, popularity, tmdb_id, date, poster_path = title
+        if kind == KINDS["tv"]:
+            return {"id": tmdb_id, "name": name, "popularity": popularity, "first_air_date": date, "poster_path": poster_path or None}
+        return {"id": tmdb_id, "title": name, "popularity": popularity, "release_date": date, "poster_path": poster_path or None}
+
+    def _postings(self, prefix, kind):
+        # the precomputed most-popular titles for a short prefix (see build_title_index)
+        target = (prefix.encode("utf-8"), kind)
+        lo, hi = 0, self._prefix_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key, entry_kind, count, first = PREFIX.unpack_from(self._mm, self._prefixes_off + PREFIX.size * mid)
+            if (key.rstrip(b"\0"), entry_kind) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._prefix_count:
+            return []
+        key, entry_kind, count, first = PREFIX.unpack_from(self._mm, self._prefixes_off + PREFIX.size * lo)
+        if (key.rstrip(b"\0"), entry_kind) != target:
+            return []
+        return [POSTING.unpack_from(self._mm, self._postings_off + POSTING.size * (first + i))[0] for i in range(count)]
+
+    def _collect(self, prefixes, kind, limit):
+        # returns (results, complete); complete is False if a prefix matched more keys than max_scan
+        found = {}
+        complete = True
+        for prefix in prefixes:
+            lo, hi = self._prefix_range(prefix)
+            if hi - lo > self.max_scan:
+                complete = False
+            for i in range(lo, min(hi, lo + self.max_scan)):
+                number = self._key(i)[1]
+                if number not in found:
+                    title = self._title(number)
+                    if title[1] == kind:
+                        found[number] = title
+        ranked = sorted(found.values(), key=lambda t: -t[2])[:limit]
+        return [self._result(title) for title in ranked], complete
+
+    def _has_prefix(self, prefix):
+        prefix = prefix.encode("utf-8")
+        i = self._bisect(prefix)
+        return i < self.key_count and self._key(i)[0].startswith(prefix)
+
+    def _typo_variants(self, query):
+        # the typo is at or just before where the longest matching prefix stops, so only edit around there
+        lo, hi = 0, len(query)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._has_prefix(query[:mid]):
+                lo = mid
+            else:
+                hi = mid - 1
+
+        variants = set()
+        for at in range(max(0, lo - 3), lo + 1):
+            head, tail = query[:at], query[at:]
+            variants.add(head + tail[1:])  # extra character
+            variants.update(head + c + tail for c in FUZZY_ALPHABET)  # missing character
+            variants.update(head + c + tail[1:] for c in FUZZY_ALPHABET if tail)  # wrong character
+            if len(tail) > 1:
+                variants.add(head + tail[1] + tail[0] + tail[2:])  # swapped characters
+        variants.discard(query)
+        return [v for v in variants if v.strip() and self._has_prefix(v)]
+
+    def search(self, media_type, query, limit=3, fuzzy=True):
+        """
+        Looks up titles starting with (a word starting with) `query`, most popular first.
+
+        :param media_type: "tv" or "movie"/"film"
+        :param query: the text typed so far
+        :param limit: most results returned
+        :param fuzzy: try single-typo corrections when nothing matches exactly
+        :return: list of TMDB-style result dicts (empty on a miss, or if the prefix is too common to rank here)
+        """
+        kind = KINDS["tv"] if media_type == "tv" else KINDS["movie"]
+        normalized = normalize_title(query)
+        if not normalized:
+            return []
+        if len(normalized) <= SHORT_PREFIX:
+            return [self._result(self._title(number)) for number in self._postings(normalized, kind)[:limit]]
+        results, complete = self._collect([normalized], kind, limit)
+        if not complete:
+            return []  # only part of the matches were ranked; the caller asks TMDB instead
+        if not results and fuzzy and len(normalized) >= 3:
+            results, complete = self._collect(self._typo_variants(normalized), kind, limit)
+            if not complete:
+                return []
+        return results
+
+    def close(self):
+        self._mm.close()
+
+
+_title_index = None
+_title_index_lock = threading.Lock()
+
+
+def get_title_index():
+    """
+    Returns the process-wide title index named by TITLE_INDEX_PATH, or None if none is configured.
+    """
+    global _title_index
+    path = os.getenv("TITLE_INDEX_PATH")
+    if not path or not os.path.exists(path):
+        return None
+    with _title_index_lock:
+        if _title_index is None:
+            _title_index = TitleIndex(path, max_scan=int(os.getenv("TITLE_INDEX_MAX_SCAN", 5000)))
+        return _title_index
+
+
+#####################################################
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the offline title index used by /search")
+    parser.add_argument("output", help="index file to write, eg titles.idx")
+    parser.add_argument("--tv", action="append", default=[], help="TMDB tv_series_ids export (.json.gz)")
+    parser.add_argument("--movie", action="append", default=[], help="TMDB movie_ids export (.json.gz)")
+    parser.add_argument("--tv-slugs", action="append", default=[], help="Tunefind tv slug list, one per line")
+    parser.add_argument("--movie-slugs", action="append", default=[], help="Tunefind film slug list, one per line")
+    args = parser.parse_args()
+
+    def entries():
+        for path in args.tv:
+            yield from load_tmdb_export(path, "tv")
+        for path in args.movie:
+            yield from load_tmdb_export(path, "movie")
+        for path in args.tv_slugs:
+            yield from load_slug_list(path, "tv")
+        for path in args.movie_slugs:
+            yield from load_slug_list(path, "movie")
+
+    count = build_title_index(entries(), args.output)
+    print(f"✅ Indexed {count} titles into {args.output}")
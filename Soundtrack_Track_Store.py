@@ -0,0 +1,253 @@
+# script to store scraped tracks with their episode, position & scrape time
+# usage: Soundtrack_Scraper_tv.py, Soundtrack_Scraper_film.py, Soundtrack_Cache.py, Soundtrack_Builder.py & app.py
+
+
+# Soundtrack_Track_Store.py
+"""
+Structured scrape output.
+The song -> artist dict the scrapers return keeps one entry per song, so duplicates across episodes,
+the episode a track came from and its position on the page are lost before the csv is written.
+Here every scraped track is a row (song, artist list, season, episode, position, scrape time) in a
+SQLite table. Rows are written episode-by-episode as a scrape runs, so a finished episode is stored
+even if a later one fails, and the builder & web-app read them with the standard library only.
+The playlist csv is still written, as an export of the stored rows.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+def write_playlist_csv(playlist, output_file):
+    """
+    Writes a song -> artists dict as a Song, Artist csv (the format the builder & users have always had).
+    The one csv writer for playlists: export_csv & Soundtrack_Scraper_utils.save_playlist_csv both use it.
+
+    :param playlist: dict of song -> artists
+    :param output_file: Path of the csv; the parent directory is created if needed
+    :return: Path written
+    """
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["Song", "Artist"])
+        writer.writerows(playlist.items())
+    return output_file
+
+
+def split_artists(artists):
+    """
+    Splits a joined artist string back into names, eg "Artist A, Artist B" -> ["Artist A", "Artist B"]
+    (the inverse of Soundtrack_Scraper_utils.join_artists). A name that itself contains ", " (eg "Earth, Wind & Fire")
+    comes back as two names, but joining them again gives the scraped string back unchanged.
+
+    :param artists: comma separated string, or a list of names
+    :return: list of name strings
+    """
+    if isinstance(artists, (list, tuple)):
+        return [str(name).strip() for name in artists if str(name).strip()]
+    return [name.strip() for name in (artists or "").split(', ') if name.strip()]
+
+
+class TrackStore:
+    """
+    Scraped tracks, one row per track, keyed by media key (see Soundtrack_Media.py).
+
+    Tables:
+        scrapes (media_key, kind, title, scraped_at, episodes, tracks) - one row per finished scrape
+        tracks (media_key, season, episode, position, episode_title, episode_url, song, artists, scraped_at)
+
+    :param path: SQLite database file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrapes ("
+            "media_key TEXT PRIMARY KEY, kind TEXT, title TEXT, scraped_at REAL, episodes INTEGER, tracks INTEGER)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tracks ("
+            "media_key TEXT, season INTEGER, episode INTEGER, position INTEGER, episode_title TEXT, "
+            "episode_url TEXT, song TEXT, artists TEXT, scraped_at REAL, "
+            "PRIMARY KEY (media_key, season, episode, position)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def writer(self, media):
+        """
+        :return: TrackWriter that stores `media`'s tracks episode-by-episode
+        """
+        return TrackWriter(self, media)
+
+    def write_episode(self, media, episode, tracks, season=None, scraped_at=None):
+        """
+        Replaces the stored tracks of one episode, in a single transaction.
+
+        :param media: Media descriptor
+        :param episode: episode dict from the season page (index, title, url); a film is one episode {"index": 0}
+        :param tracks: list of (song, artists) tuples, in page order
+        :param season: season number the episode belongs to (defaults to the media's season; 0 for films)
+        :param scraped_at: epoch seconds (defaults to now)
+        """
+        season = (media.season_num or 0) if season is None else season
+        scraped_at = time.time() if scraped_at is None else scraped_at
+        rows = [
+            (media.key, season, episode["index"], position, episode.get("title"), episode.get("url"),
+             song, json.dumps(split_artists(artists)), scraped_at)
+            for position, (song, artists) in enumerate(tracks)
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tracks WHERE media_key = ? AND season = ? AND episode = ?",
+                               (media.key, season, episode["index"]))
+            self._conn.executemany("INSERT INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def finish(self, media, episodes):
+        """
+        Marks a scrape as complete & drops rows of episodes that weren't part of it (eg a re-cut season).
+
+        :param media: Media descriptor
+        :param episodes: iterable of (season, episode index) pairs written by this scrape
+        """
+        keep = set(episodes)
+        with self._lock, self._conn:
+            stored = self._conn.execute("SELECT DISTINCT season, episode FROM tracks WHERE media_key = ?",
+                                        (media.key,)).fetchall()
+            stale = [(media.key, season, episode) for season, episode in stored if (season, episode) not in keep]
+            self._conn.executemany("DELETE FROM tracks WHERE media_key = ? AND season = ? AND episode = ?", stale)
+            count = self._conn.execute("SELECT COUNT(*) FROM tracks WHERE media_key = ?", (media.key,)).fetchone()[0]
+            self._conn.execute("INSERT OR REPLACE INTO scrapes VALUES (?, ?, ?, ?, ?, ?)",
+                               (media.key, media.kind, media.title, time.time(), len(keep), count))
+
+    def copy_from(self, media, sources):
+        """
+        Stores a combined (series) scrape from already-stored seasons, keeping each row's season & episode.
+
+        :param media: the series Media descriptor
+        :param sources: list of season Media descriptors, all previously stored
+        """
+        keys = [source.key for source in sources]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tracks WHERE media_key = ?", (media.key,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tracks SELECT ?, season, episode, position, episode_title, episode_url, "
+                f"song, artists, scraped_at FROM tracks WHERE media_key IN ({', '.join('?' * len(keys))})",
+                (media.key, *keys)
+            )
+        self.finish(media, self.episodes(media))
+
+    def has(self, media):
+        """
+        :return: True if a complete scrape of `media` is stored
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM scrapes WHERE media_key = ?", (media.key,)).fetchone()
+        return row is not None
+
+    def episodes(self, media):
+        """
+        :return: list of stored (season, episode index) pairs, in order
+        """
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(
+                "SELECT DISTINCT season, episode FROM tracks WHERE media_key = ? ORDER BY season, episode", (media.key,)
+            )]
+
+    def tracks(self, media):
+        """
+        Every stored track of `media`, duplicates included, in season / episode / page order.
+
+        :return: list of dicts: song, artists (list), season, episode, episode_title, episode_url, position, scraped_at
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT song, artists, season, episode, episode_title, episode_url, position, scraped_at FROM tracks "
+                "WHERE media_key = ? ORDER BY season, episode, position", (media.key,)
+            ).fetchall()
+        return [
+            {"song": song, "artists": json.loads(artists), "season": season, "episode": episode,
+             "episode_title": episode_title, "episode_url": episode_url, "position": position, "scraped_at": scraped_at}
+            for song, artists, season, episode, episode_title, episode_url, position, scraped_at in rows
+        ]
+
+    def rows(self, media):
+        """
+        :return: list of (song, artists) tuples, duplicates included, in order; artists joined as in the csv
+        """
+        return [(track["song"], ', '.join(track["artists"])) for track in self.tracks(media)]
+
+    def playlist(self, media):
+        """
+        :return: song -> artists dict, as the scrapers return it (one entry per song)
+        """
+        playlist = {}
+        for song, artists in self.rows(media):
+            playlist[song] = artists
+        return playlist
+
+    def first_episodes(self, media):
+        """
+        :return: song -> title of the first episode it appears in (songs without an episode title are left out)
+        """
+        episodes = {}
+        for track in self.tracks(media):
+            if track["episode_title"]:
+                episodes.setdefault(track["song"], track["episode_title"])
+        return episodes
+
+    def export_csv(self, media, output_file):
+        """
+        Writes the stored playlist as a Song, Artist csv (the format the builder & users have always had).
+
+        :param media: Media descriptor
+        :param output_file: Path of the csv; the parent directory is created if needed
+        :return: Path written
+        """
+        output_file = write_playlist_csv(self.playlist(media), output_file)
+        print(f"Playlist saved successfully to: {output_file}")
+        return output_file
+
+
+class TrackWriter:
+    """
+    Streams one scrape into the store: each episode is written as soon as it finishes, and finish()
+    marks the scrape complete once every episode is in.
+    """
+
+    def __init__(self, store, media):
+        self.store = store
+        self.media = media
+        self.written = set()
+
+    def write_episode(self, episode, tracks, season=None):
+        season = (self.media.season_num or 0) if season is None else season
+        self.store.write_episode(self.media, episode, tracks, season=season)
+        self.written.add((season, episode["index"]))
+
+    def finish(self):
+        self.store.finish(self.media, self.written)
+
+
+_track_store = None
+_track_store_lock = threading.Lock()
+
+
+def get_track_store(path=None):
+    """
+    Returns the process-wide track store, creating it on first use.
+
+    :param path: SQLite file, used if the store is created by this call
+                 (defaults to TRACK_STORE_PATH, then "track_store.sqlite3")
+    """
+    global _track_store
+    with _track_store_lock:
+        if _track_store is None:
+            _track_store = TrackStore(path or os.getenv("TRACK_STORE_PATH", "track_store.sqlite3"))
+        return _track_store
@@ -1,86 +1,254 @@
 
 # script to launch the soundtrack scraper web-app
 
-from flask import Flask, render_template, request, redirect, url_for, jsonify
-import requests, os
+from flask import Flask, render_template, request, redirect, url_for, jsonify, Response, stream_with_context, session
+import requests, os, json, threading
 from dotenv import load_dotenv
-from Soundtrack_Scraper_tv import scrape_soundtrack_tv
+from Soundtrack_Cache import scrape_soundtrack_tv_cached
 from Soundtrack_Builder import run_soundtrack_builder
 from Soundtrack_Main import build_playlist
-from selenium.common.exceptions import TimeoutException
+from Soundtrack_Browser_Pool import get_browser_pool
+from Soundtrack_Jobs import get_job_queue
+from Soundtrack_Media import Media
+from Soundtrack_Preview_Store import get_preview_store
+from Soundtrack_Track_Store import get_track_store
+from Soundtrack_TMDB import get_tmdb_client
+from Soundtrack_Title_Index import get_title_index
+from Soundtrack_Readiness import readiness_stats
+from Soundtrack_Blocking import page_weight_stats
+import Soundtrack_Metrics
+
+load_dotenv()  # Loads from .env file
 
 app = Flask(__name__)
-playlist_cache = {}  # temporary in-memory store
+# signs the session cookie; every worker process must share the same key, so it has to be configured
+# (the development server below, a single process, falls back to a random one)
+app.secret_key = os.getenv("FLASK_SECRET_KEY")
+if not app.secret_key and __name__ != "__main__":
+    raise RuntimeError("Set FLASK_SECRET_KEY (eg in .env) so every worker process signs sessions with the same key.")
+
+# TRACK_STORE_PATH: the SQLite file of scraped tracks; BROWSER_POOL_WARM: browsers started ahead of the first scrape
+app.config.from_mapping(
+    TRACK_STORE_PATH=os.getenv("TRACK_STORE_PATH", "track_store.sqlite3"),
+    BROWSER_POOL_WARM=int(os.getenv("BROWSER_POOL_WARM", 1)),
+)
+
+# scraped playlists waiting for /confirm, keyed by scrape job id (see Soundtrack_Preview_Store.py)
+preview_store = get_preview_store()
+
+# long-lived Firefox pool shared by every scrape request (see Soundtrack_Browser_Pool.py); no browser starts until used
+browser_pool = get_browser_pool()
+
+# scrapes & builds run in the background so requests return straight away (see Soundtrack_Jobs.py)
+job_queue = get_job_queue()
+
+# pooled, caching TMDB client for autocomplete & /film (see Soundtrack_TMDB.py)
+tmdb = get_tmdb_client()
+
+# optional offline title index, memory-mapped & shared by every worker (see Soundtrack_Title_Index.py)
+title_index = get_title_index()
+
+_worker_started = False
+_worker_started_lock = threading.Lock()
 
-load_dotenv()  # Loads from .env file
 
-TMDB_API_KEY = os.getenv("TMDB_API_KEY")
+# per-process set-up, run on the first request rather than at import, so importing app (tooling, the gunicorn
+# master) neither starts Firefox nor creates files: opens the track store at its configured path &
+# warms the browser pool in the background (BROWSER_POOL_WARM=0 to skip)
+@app.before_request
+def start_worker():
+    global _worker_started
+    if _worker_started:
+        return
+    with _worker_started_lock:
+        if _worker_started:
+            return
+        _worker_started = True
+    get_track_store(app.config["TRACK_STORE_PATH"])
+    if app.config["BROWSER_POOL_WARM"]:
+        browser_pool.warm_in_background(app.config["BROWSER_POOL_WARM"])
+
+
+# stores a finished scrape's playlist under its job id, so whichever worker serves /jobs/<id>/view & /confirm can read it
+def store_preview(job):
+    preview_store.put(job.id, {"data": job.result, "tv_show": job.params.get("tv_show"),
+                               "season_num": job.params.get("season_num")})
+
 
 # used when the user selects "tv show
+# the scrape runs as a background job; the page then polls the job until it finishes
 @app.route("/", methods=["GET", "POST"])
 def tv_builder():
     success = request.args.get("success")
     track_count = request.args.get("tracks", default=0, type=int)
     playlist_url = request.args.get("playlist_url")
     error_message = request.args.get("error") 
+    job_id = request.args.get("job_id")
 
     if request.method == "POST":
         tv_show = request.form["tv_show"]
         season_num = int(request.form["season_num"])
 
-        try:
-            playlist = scrape_soundtrack_tv(tv_show, season_num)
-        except TimeoutException:
-            # No soundtrack found or page element missing
-            return redirect(url_for(
-                "tv_builder",
-                error=f"No soundtrack found for {tv_show} season {season_num}"
-            ))
-        except Exception as e:
-            # Catch-all for unexpected errors
-            app.logger.error(f"Unexpected error scraping {tv_show}: {e}")
-            return redirect(url_for(
-                "tv_builder",
-                error="An unexpected error occurred while scraping the soundtrack."
-            ))
-
-        playlist_cache["data"] = playlist
-        playlist_cache["tv_show"] = tv_show
-        playlist_cache["season_num"] = season_num
-
-        return render_template(
-            "preview.html",
-            playlist=playlist,
-            tv_show=tv_show,
-            season_num=season_num
+        job = job_queue.submit(
+            "scrape", "scrape:" + Media.tv(tv_show, season_num).key,
+            scrape_soundtrack_tv_cached, tv_show, season_num, pool=browser_pool,
+            params={"tv_show": tv_show, "season_num": season_num}, report_progress=True, on_done=store_preview
         )
+        return redirect(url_for("tv_builder", job_id=job.id))
+
+    # the job may be running on another worker process; its status is in the shared store
+    job = job_queue.lookup(job_id) if job_id else None
 
     return render_template(
         "index.html",
         success=success,
         track_count=track_count,
         playlist_url=playlist_url,
-        error_message=error_message
+        error_message=error_message,
+        job_id=job.id if job else None,
+        job_kind=job.kind if job else None
     )
 
 
-@app.route("/current-episode")
-def current_episode():
-    try:
-        with open("current_episode.txt", "r", encoding="utf-8") as f:
-            title = f.read().strip()
-        return {"episode": title}
-    except FileNotFoundError:
-        return {"episode": "Loading..."}
-    
-
 @app.route("/confirm", methods=["POST"])
 def confirm():
-    tv_show = playlist_cache.get("tv_show")
-    season_num = playlist_cache.get("season_num")
-    playlist_url = build_playlist(tv_show, season_num)
+    # the preview page posts its own id; fall back to the last preview shown in this session
+    preview_id = request.form.get("preview_id") or session.get("preview_id")
+    preview = preview_store.get(preview_id) if preview_id else None
+    if preview is None:
+        return redirect(url_for("tv_builder", error="That preview has expired — please search again."))
+
+    tv_show = preview["tv_show"]
+    season_num = preview["season_num"]
+    job = job_queue.submit(
+        "build", "build:" + Media.tv(tv_show, season_num).key,
+        build_playlist, tv_show, season_num,
+        params={"tv_show": tv_show, "season_num": season_num, "tracks": len(preview["data"])},
+        share_result=True  # the playlist url, for whichever worker serves /jobs/<id>/view
+    )
     # run_soundtrack_builder(tv_show, season_num)
-    return redirect(url_for("tv_builder", success="true", tracks=len(playlist_cache["data"]), playlist_url=playlist_url))
+    return redirect(url_for("tv_builder", job_id=job.id))
+
+
+# job status (polled by index.html) & result endpoints
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    # from this process or, for a job on another worker, the shared status store
+    status = job_queue.status(job_id)
+    if status is None:
+        # a scrape that finished on another worker process has left its preview behind
+        if preview_store.get(job_id) is not None:
+            return jsonify({"id": job_id, "kind": "scrape", "status": "done"})
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(status)
+
+
+# server-sent events stream of a job's progress (current episode, track counts, elapsed time)
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    if job_queue.lookup(job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
+    since = request.args.get("since", default=0, type=int)
+
+    def stream():
+        for event in job_queue.events(job_id, since=since):
+            if event is None:
+                yield ": keepalive\n\n"  # comment line; keeps proxies from closing an idle stream
+            else:
+                yield f"id: {event['seq']}\ndata: {json.dumps(event)}\n\n"
+
+    return Response(stream_with_context(stream()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/jobs/<job_id>/result")
+def job_result(job_id):
+    job = job_queue.lookup(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if not job.finished:
+        return jsonify(job.to_dict()), 202
+    if job.status == "failed":
+        return jsonify(job.to_dict()), 500
+    result = job.result
+    if result is None and job.kind == "scrape":
+        # a scrape from another worker process; its playlist is in the shared preview store
+        preview = preview_store.get(job.id)
+        result = preview["data"] if preview else None
+    return jsonify({**job.to_dict(), "result": result})
+
+
+@app.route("/jobs/metrics")
+def job_metrics():
+    # readiness: per-page-type browser wait times (see Soundtrack_Readiness.py)
+    # page_weight: requests & bytes per page by blocking profile, with savings against the baseline saved by
+    # `python Soundtrack_Blocking.py` (see Soundtrack_Blocking.py)
+    return jsonify({**job_queue.metrics(), "readiness": readiness_stats.snapshot(),
+                    "page_weight": page_weight_stats.snapshot()})
+
+
+@app.route("/metrics")
+def metrics_summary():
+    # spans & counters for the scrape / build hot paths (see Soundtrack_Metrics.py), plus the job queue & TMDB cache
+    return jsonify({**Soundtrack_Metrics.summary(), "jobs": job_queue.metrics(), "tmdb": tmdb.stats})
+
+
+# where the browser goes once a job has finished: the preview page for scrapes, the success toast for builds
+@app.route("/jobs/<job_id>/view")
+def job_view(job_id):
+    job = job_queue.lookup(job_id)
+    if job is None:
+        # the scrape may have run on another worker process; its preview is in the shared store
+        preview = preview_store.get(job_id)
+        if preview is None:
+            return redirect(url_for("tv_builder", error="That request has expired — please try again."))
+        return render_preview(job_id, preview)
+    if not job.finished:
+        return redirect(url_for("tv_builder", job_id=job.id))
+
+    tv_show = job.params.get("tv_show")
+    season_num = job.params.get("season_num")
+
+    if job.status == "failed":
+        if job.error_type == "TimeoutException":
+            # No soundtrack found or page element missing
+            error = f"No soundtrack found for {tv_show} season {season_num}"
+        elif job.error_type == "ValueError":
+            error = job.error
+        elif job.kind == "scrape":
+            error = "An unexpected error occurred while scraping the soundtrack."
+        else:
+            error = "An unexpected error occurred while creating the playlist."
+        return redirect(url_for("tv_builder", error=error))
+
+    if job.kind == "build":
+        return redirect(url_for("tv_builder", success="true", tracks=job.params.get("tracks", 0), playlist_url=job.result))
+
+    preview = preview_store.get(job.id)
+    if preview is None:
+        if job.result is None:
+            # finished on another worker & the preview has expired since
+            return redirect(url_for("tv_builder", error="That request has expired — please try again."))
+        # expired since the job finished; stored again so /confirm can read it
+        store_preview(job)
+        preview = preview_store.get(job.id)
+    return render_preview(job.id, preview)
+
+
+def render_preview(preview_id, preview):
+    session["preview_id"] = preview_id
+
+    # the episode each song first appears in, from the track store (scraped tracks with their episode & position)
+    episodes = get_track_store().first_episodes(Media.tv(preview["tv_show"], preview["season_num"]))
+
+    return render_template(
+        "preview.html",
+        playlist=preview["data"],
+        episodes=episodes,
+        tv_show=preview["tv_show"],
+        season_num=preview["season_num"],
+        preview_id=preview_id
+    )
 
 
 
@@ -106,20 +274,11 @@ def autocomplete_search():
     query = request.args.get("q")
     media_type = request.args.get("type", "tv")
 
-    endpoint = "tv" if media_type == "tv" else "movie"
-    url = f"https://api.themoviedb.org/3/search/{endpoint}"
-
-    params = {
-        "api_key": TMDB_API_KEY,
-        "query": query,
-        "language": "en-US",
-        "include_adult": False
-    }
-
+    # the local index answers in-process; only a miss goes to TMDB
+    results = title_index.search(media_type, query, limit=3) if title_index else []
     try:
-        response = requests.get(url, params=params, timeout=5)
-        response.raise_for_status()  # raises HTTPError for 4xx/5xx
-        data = response.json()
+        # served from the cache (or a cached shorter prefix) where possible
+        results = results or tmdb.search(media_type, query, min_results=3)
     except requests.RequestException as e:
         app.logger.error(f"TMDB API request failed: {e}")
         return jsonify([])  # return empty list on error
@@ -127,7 +286,7 @@ def autocomplete_search():
         app.logger.error(f"TMDB JSON decode failed: {e}")
         return jsonify([])
 
-    results = data.get("results", [])[:3]  # limit to 3 results
+    results = results[:3]  # limit to 3 results
 
     for r in results:
         # Add year field for display
@@ -150,18 +309,12 @@ def film_search():
         query = request.form.get("tv_show")
         season_num = request.form.get("season_num")  # May be None for films
 
-        endpoint = "tv" if media_type == "tv" else "movie"
-        url = f"https://api.themoviedb.org/3/search/{endpoint}"
-
-        params = {
-            "api_key": TMDB_API_KEY,
-            "query": query,
-            "language": "en-US",
-            "include_adult": False
-        }
-
-        response = requests.get(url, params=params)
-        raw_results = response.json().get("results", [])
+        try:
+            # a full search: TMDB's results for exactly this title, never a filtered autocomplete prefix
+            raw_results = tmdb.search(media_type, query, allow_prefix=False)
+        except (requests.RequestException, ValueError) as e:
+            app.logger.error(f"TMDB search failed: {e}")
+            raw_results = []
 
         playlist = []
         for item in raw_results:
@@ -184,4 +337,5 @@ def film_search():
 
 if __name__ == "__main__":
     print("Starting Flask app...")
+    app.secret_key = app.secret_key or os.urandom(24)
     app.run(debug=True)
\ No newline at end of file